@@ -4,20 +4,20 @@ Script para analizar la calidad de la ruta encontrada
 Verifica coherencia geográfica y calcula métricas detalladas
 """
 
-import sys
 import numpy as np
 import pandas as pd
-from pathlib import Path
 
-# Agregar src al path
-sys.path.insert(0, str(Path(__file__).parent / 'src'))
+from src.distance_calculator import load_cached_matrix
+from src.time_windows import RouteTimeCalculator
 
-from time_windows import RouteTimeCalculator
 
-
-def analyze_route_quality(route_file, coords_file, time_matrix_file):
+def analyze_route_quality(route_file, coords_file, time_matrix_file=None):
     """
     Analizar la calidad y coherencia de una ruta
+    
+    time_matrix_file está obsoleto: la matriz de tiempos se carga desde la
+    caché binaria (load_cached_matrix). Si se indica, se sigue leyendo ese
+    CSV como antes.
     """
     print("="*70)
     print("ANÁLISIS DETALLADO DE LA MEJOR RUTA")
@@ -26,7 +26,11 @@ def analyze_route_quality(route_file, coords_file, time_matrix_file):
     # Cargar datos
     route_df = pd.read_csv(route_file)
     coords_df = pd.read_csv(coords_file)
-    time_matrix = pd.read_csv(time_matrix_file, index_col=0).values
+    if time_matrix_file is not None:
+        print("⚠ time_matrix_file está obsoleto; omítalo para usar la caché de matrices")
+        time_matrix = pd.read_csv(time_matrix_file, index_col=0).values
+    else:
+        time_matrix = load_cached_matrix(coords_df, kind='time', avg_speed_kmh=60)
     distance_matrix = time_matrix * 60  # Convertir de vuelta a km
     
     route = route_df['ciudad_index'].values
@@ -201,8 +205,7 @@ if __name__ == "__main__":
     
     metrics = analyze_route_quality(
         f"{results_dir}/mejor_ruta.csv",
-        "data/processed/coordenadas_capitales.csv",
-        "data/processed/matriz_tiempos.csv"
+        "data/processed/coordenadas_capitales.csv"
     )
     
     print(f"\n{'='*70}")
@@ -5,7 +5,8 @@ Análisis comparativo de la ruta optimizada
 
 import pandas as pd
 import numpy as np
-from pathlib import Path
+
+from src.distance_calculator import load_cached_matrix
 
 def compare_routes():
     print("="*70)
@@ -16,7 +17,7 @@ def compare_routes():
     original = pd.read_csv('results/run_20251231_210451/mejor_ruta.csv')
     optimized = pd.read_csv('results/optimized_20251231_211719/mejor_ruta_optimizada.csv')
     coords = pd.read_csv('data/processed/coordenadas_capitales.csv')
-    time_matrix = pd.read_csv('data/processed/matriz_tiempos.csv', index_col=0).values
+    time_matrix = load_cached_matrix(coords, kind='time', avg_speed_kmh=60)
     
     print("\n📍 RUTA ORIGINAL (251.51 horas):")
     print("-" * 70)
@@ -4,14 +4,10 @@ Script para generar datos procesados del TSP-TW
 Extrae coordenadas de capitales y genera matrices de distancias y tiempos
 """
 
-import sys
-from pathlib import Path
+import numpy as np
 
-# Agregar src al path
-sys.path.insert(0, str(Path(__file__).parent / 'src'))
-
-from data_loader import DataLoader
-from distance_calculator import DistanceCalculator
+from src.data_loader import DataLoader
+from src.distance_calculator import DistanceCalculator, load_cached_matrix
 
 
 def main():
@@ -24,8 +20,8 @@ def main():
     loader = DataLoader()
     
     try:
-        estados_gdf = loader.load_shapefile('México_Estados.shp')
-        ciudades_gdf = loader.load_shapefile('México_Ciudades.shp')
+        estados_gdf = loader.load_shapefile('México_Estados.shp', columns=['ESTADO'])
+        ciudades_gdf = loader.load_shapefile('México_Ciudades.shp', columns=DataLoader.CITY_COLUMNS)
         print(f"   ✓ {len(estados_gdf)} estados cargados")
         print(f"   ✓ {len(ciudades_gdf)} ciudades cargadas")
     except Exception as e:
@@ -50,11 +46,12 @@ def main():
         print(f"   ✗ Error al guardar coordenadas: {e}")
         return 1
     
-    # 4. Calcular matriz de distancias
+    # 4. Calcular matriz de distancias (se reutiliza la caché .npy si las coordenadas no cambiaron)
     print("\n4. Calculando matriz de distancias geodésicas...")
     try:
         calc = DistanceCalculator(capitales_df)
-        distance_matrix = calc.build_distance_matrix()
+        distance_matrix = np.asarray(load_cached_matrix(capitales_df, kind='distance', method='ellipsoidal'))
+        calc.distance_matrix = distance_matrix
         print(f"   ✓ Matriz de distancias: {distance_matrix.shape}")
         print(f"   ✓ Distancia promedio: {distance_matrix[distance_matrix > 0].mean():.2f} km")
         print(f"   ✓ Distancia máxima: {distance_matrix.max():.2f} km")
@@ -73,7 +70,7 @@ def main():
     # 6. Generar matriz de tiempos (60 km/h)
     print("\n6. Generando matriz de tiempos (60 km/h)...")
     try:
-        time_matrix = calc.build_time_matrix(avg_speed_kmh=60)
+        time_matrix = load_cached_matrix(capitales_df, kind='time', avg_speed_kmh=60)
         print(f"   ✓ Matriz de tiempos: {time_matrix.shape}")
         print(f"   ✓ Tiempo promedio: {time_matrix[time_matrix > 0].mean():.2f} horas")
         print(f"   ✓ Tiempo máximo: {time_matrix.max():.2f} horas")
@@ -9,11 +9,9 @@ from pathlib import Path
 import json
 from datetime import datetime
 
-from src.data_loader import DataLoader
 from src.distance_calculator import DistanceCalculator
 from src.genetic_algorithm import GeneticAlgorithm
 from src.local_search import LocalSearch
-from src.visualizer import Visualizer
 from config import (GA_CONFIG, EXPERIMENT_CONFIG, LOCAL_SEARCH_CONFIG, 
                    PATHS, PLOT_CONFIG)
 
@@ -49,20 +47,20 @@ def run_single_experiment(distance_matrix, coordinates_df, run_number):
     
     # Aplicar búsqueda local 2-opt si está habilitada
     if LOCAL_SEARCH_CONFIG['apply_2opt']:
-        print("\nAplicando optimización 2-opt...")
-        local_search = LocalSearch(distance_matrix)
-        optimized_route, optimized_distance = local_search.optimize(
+        print("\nAplicando optimización 2-opt (con ventanas de tiempo)...")
+        local_search = LocalSearch(distance_matrix, fitness_function=ga.fitness_func)
+        optimized_route, optimized_fitness = local_search.optimize_time_windows(
             best_route, 
             max_iterations=LOCAL_SEARCH_CONFIG['max_iterations']
         )
         
-        print(f"Distancia antes de 2-opt: {best_fitness:.2f} km")
-        print(f"Distancia después de 2-opt: {optimized_distance:.2f} km")
-        print(f"Mejora: {best_fitness - optimized_distance:.2f} km "
-              f"({((best_fitness - optimized_distance) / best_fitness * 100):.2f}%)")
+        print(f"Fitness antes de 2-opt: {best_fitness:.2f} horas")
+        print(f"Fitness después de 2-opt: {optimized_fitness:.2f} horas")
+        print(f"Mejora: {best_fitness - optimized_fitness:.2f} horas "
+              f"({((best_fitness - optimized_fitness) / best_fitness * 100):.2f}%)")
         
         best_route = optimized_route
-        best_fitness = optimized_distance
+        best_fitness = optimized_fitness
     
     return {
         'run_number': run_number,
@@ -153,7 +151,9 @@ def run_experiments():
     # 6. Visualizar resultados
     print("\n5. Generando visualizaciones...")
     
-    visualizer = Visualizer(coordinates_df)
+    # matplotlib se carga solo aquí, no al arrancar
+    from src.visualizer import TSPTWVisualizer
+    visualizer = TSPTWVisualizer(coordinates_df, output_dir=PATHS['results_plots'])
     
     # Encontrar mejor resultado
     best_result = min(all_results, key=lambda x: x['best_fitness'])
@@ -164,7 +164,7 @@ def run_experiments():
         best_route,
         title="Mejor Ruta Encontrada",
         filename=f"mejor_ruta_{timestamp}.png",
-        distance=best_result['best_fitness']
+        time_hours=best_result['best_fitness']
     )
     
     # Plotear convergencia de todas las ejecuciones
@@ -175,11 +175,12 @@ def run_experiments():
     )
     
     # Guardar mejor ruta en archivo de texto
-    visualizer.save_route_to_file(
-        best_route,
-        best_result['best_fitness'],
-        filename=f"mejor_ruta_{timestamp}.txt"
-    )
+    routes_dir = Path(PATHS['results_routes'])
+    routes_dir.mkdir(parents=True, exist_ok=True)
+    with open(routes_dir / f"mejor_ruta_{timestamp}.txt", 'w') as f:
+        f.write(f"Tiempo total: {best_result['best_fitness']:.2f} horas\n")
+        for i, idx in enumerate(best_route):
+            f.write(f"{i + 1:2d}. {coordinates_df.iloc[idx]['ciudad']}\n")
     
     print("\n" + "="*60)
     print("PROCESO COMPLETADO")
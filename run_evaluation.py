@@ -4,17 +4,16 @@ Sistema de Evaluación Multi-Run para TSP-TW
 Ejecuta el algoritmo genético 10 veces y calcula estadísticas
 """
 
-import sys
 import numpy as np
 import pandas as pd
 from pathlib import Path
 import json
 from datetime import datetime
 
-# Agregar src al path
-sys.path.insert(0, str(Path(__file__).parent / 'src'))
-
-from genetic_algorithm import GeneticAlgorithm
+from src.convergence_history import ConvergenceHistory
+from src.distance_calculator import load_cached_matrix
+from src.genetic_algorithm import GeneticAlgorithm
+from src.tabu_search import TabuSearch
 
 
 def run_experiment(time_matrix, start_city_index, run_number, config):
@@ -37,20 +36,36 @@ def run_experiment(time_matrix, start_city_index, run_number, config):
     # Configurar seed para reproducibilidad
     np.random.seed(run_number * 42)
     
-    # Crear y ejecutar AG
-    ga = GeneticAlgorithm(
-        time_matrix=time_matrix,
-        start_city_index=start_city_index,
-        population_size=config['population_size'],
-        generations=config['generations'],
-        mutation_rate=config['mutation_rate'],
-        crossover_rate=config['crossover_rate'],
-        elitism_rate=config['elitism_rate'],
-        start_time=9.0,
-        penalty_weight=config['penalty_weight']
-    )
-    
-    best_route, best_fitness, history = ga.evolve(verbose=False)
+    if config.get('solver', 'ga') == 'tabu':
+        # Crear y ejecutar búsqueda tabú
+        tabu = TabuSearch(
+            time_matrix=time_matrix,
+            start_city_index=start_city_index,
+            iterations=config['tabu_iterations'],
+            tenure=config.get('tabu_tenure'),
+            start_time=9.0,
+            penalty_weight=config['penalty_weight']
+        )
+        
+        best_route, best_fitness, history = tabu.solve(verbose=False)
+        generation_stats = None
+    else:
+        # Crear y ejecutar AG
+        ga = GeneticAlgorithm(
+            time_matrix=time_matrix,
+            start_city_index=start_city_index,
+            population_size=config['population_size'],
+            generations=config['generations'],
+            mutation_rate=config['mutation_rate'],
+            crossover_rate=config['crossover_rate'],
+            elitism_rate=config['elitism_rate'],
+            start_time=9.0,
+            penalty_weight=config['penalty_weight'],
+            track_stats=True
+        )
+        
+        best_route, best_fitness, history = ga.evolve(verbose=False)
+        generation_stats = ga.generation_stats
     
     print(f"✓ Completado - Mejor tiempo: {best_fitness:.2f} horas ({best_fitness/24:.2f} días)")
     
@@ -59,6 +74,7 @@ def run_experiment(time_matrix, start_city_index, run_number, config):
         'best_fitness': best_fitness,
         'best_route': best_route.tolist(),
         'convergence_history': history,
+        'generation_stats': generation_stats,
         'seed': run_number * 42
     }
 
@@ -130,17 +146,17 @@ def save_results(results, stats, coords_df, config):
     route_df.to_csv(route_file, index=False)
     print(f"✓ Mejor ruta guardada en: {route_file}")
     
-    # 3. Guardar todas las convergencias
-    convergence_file = results_dir / "convergencias.csv"
-    convergence_data = []
-    for r in results:
-        for gen, fitness in enumerate(r['convergence_history']):
-            convergence_data.append({
-                'run': r['run'],
-                'generation': gen + 1,
-                'best_fitness': fitness
-            })
-    pd.DataFrame(convergence_data).to_csv(convergence_file, index=False)
+    # 3. Guardar todas las convergencias (ejecuciones x generaciones)
+    convergence_file = results_dir / "convergencias.npz"
+    generation_stats = None
+    if all(r.get('generation_stats') for r in results):
+        generation_stats = {name: [r['generation_stats'][name] for r in results]
+                            for name in results[0]['generation_stats']}
+    ConvergenceHistory.from_histories(
+        [r['convergence_history'] for r in results],
+        run_ids=[r['run'] for r in results],
+        stats=generation_stats
+    ).save(convergence_file)
     print(f"✓ Convergencias guardadas en: {convergence_file}")
     
     # 4. Guardar resumen de todas las ejecuciones
@@ -164,12 +180,14 @@ def main():
     
     # Configuración del experimento
     config = {
+        'solver': 'ga',              # 'ga' o 'tabu'
         'population_size': 100,
         'generations': 500,
         'mutation_rate': 0.02,
         'crossover_rate': 0.8,
         'elitism_rate': 0.1,
         'penalty_weight': 100.0,
+        'tabu_iterations': 1000,
         'num_runs': 10
     }
     
@@ -181,7 +199,7 @@ def main():
     print("\nCargando datos procesados...")
     try:
         coords_df = pd.read_csv('data/processed/coordenadas_capitales.csv')
-        time_matrix = pd.read_csv('data/processed/matriz_tiempos.csv', index_col=0).values
+        time_matrix = load_cached_matrix(coords_df, kind='time', avg_speed_kmh=60)
         cdmx_index = coords_df[coords_df['CIUDAD'] == 'Ciudad de México'].index[0]
         
         print(f"✓ {len(coords_df)} capitales cargadas")
@@ -227,7 +245,7 @@ def main():
     print(f"\nArchivos generados:")
     print(f"  - estadisticas.json")
     print(f"  - mejor_ruta.csv")
-    print(f"  - convergencias.csv")
+    print(f"  - convergencias.npz")
     print(f"  - resumen_ejecuciones.csv")
     
     return 0
@@ -4,17 +4,15 @@ Búsqueda Optimizada - TSP-TW México
 Configuración mejorada para encontrar mejores soluciones
 """
 
-import sys
 import numpy as np
 import pandas as pd
 from pathlib import Path
 import json
 from datetime import datetime
 
-# Agregar src al path
-sys.path.insert(0, str(Path(__file__).parent / 'src'))
-
-from genetic_algorithm import GeneticAlgorithm
+from src.convergence_history import ConvergenceHistory
+from src.distance_calculator import load_cached_matrix
+from src.genetic_algorithm import GeneticAlgorithm
 
 
 def run_optimized_search():
@@ -47,7 +45,7 @@ def run_optimized_search():
     # Cargar datos
     print("\nCargando datos procesados...")
     coords_df = pd.read_csv('data/processed/coordenadas_capitales.csv')
-    time_matrix = pd.read_csv('data/processed/matriz_tiempos.csv', index_col=0).values
+    time_matrix = load_cached_matrix(coords_df, kind='time', avg_speed_kmh=60)
     cdmx_index = coords_df[coords_df['CIUDAD'] == 'Ciudad de México'].index[0]
     
     print(f"✓ {len(coords_df)} capitales cargadas")
@@ -82,7 +80,8 @@ def run_optimized_search():
             crossover_rate=config['crossover_rate'],
             elitism_rate=config['elitism_rate'],
             start_time=9.0,
-            penalty_weight=config['penalty_weight']
+            penalty_weight=config['penalty_weight'],
+            track_stats=True
         )
         
         best_route, best_fitness, history = ga.evolve(verbose=True)
@@ -92,6 +91,7 @@ def run_optimized_search():
             'best_fitness': best_fitness,
             'best_route': best_route.tolist(),
             'convergence_history': history,
+            'generation_stats': ga.generation_stats,
             'seed': i * 123
         })
         
@@ -180,17 +180,14 @@ def run_optimized_search():
     })
     route_df.to_csv(route_file, index=False)
     
-    # Guardar convergencias
-    convergence_file = results_dir / "convergencias_optimizadas.csv"
-    convergence_data = []
-    for r in results:
-        for gen, fitness in enumerate(r['convergence_history']):
-            convergence_data.append({
-                'run': r['run'],
-                'generation': gen + 1,
-                'best_fitness': fitness
-            })
-    pd.DataFrame(convergence_data).to_csv(convergence_file, index=False)
+    # Guardar convergencias (ejecuciones x generaciones)
+    convergence_file = results_dir / "convergencias_optimizadas.npz"
+    ConvergenceHistory.from_histories(
+        [r['convergence_history'] for r in results],
+        run_ids=[r['run'] for r in results],
+        stats={name: [r['generation_stats'][name] for r in results]
+               for name in results[0]['generation_stats']}
+    ).save(convergence_file)
     
     print(f"\n{'='*70}")
     print("✓ BÚSQUEDA OPTIMIZADA COMPLETADA")
@@ -199,7 +196,7 @@ def run_optimized_search():
     print(f"\nArchivos generados:")
     print(f"  - estadisticas_optimizadas.json")
     print(f"  - mejor_ruta_optimizada.csv")
-    print(f"  - convergencias_optimizadas.csv")
+    print(f"  - convergencias_optimizadas.npz")
     
     return results_dir, stats
 
@@ -0,0 +1,10 @@
+"""
+Punto de entrada: python -m src <subcomando> [opciones] [+ <subcomando> ...]
+"""
+
+import sys
+
+from .cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
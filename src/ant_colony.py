@@ -0,0 +1,219 @@
+"""
+Ant Colony Module
+Optimización por Colonia de Hormigas (ACS/MMAS) vectorizada para TSP-TW
+Todas las hormigas construyen sus rutas en paralelo con NumPy
+"""
+
+import numpy as np
+from typing import List, Optional, Tuple
+from .fitness_function import FitnessFunction
+from .local_search import LocalSearch
+from .time_windows import static_matrix
+
+
+class AntColonyOptimization:
+    """Colonia de hormigas Max-Min con regla pseudo-aleatoria proporcional (ACS)"""
+    
+    def __init__(self,
+                 time_matrix: np.ndarray,
+                 start_city_index: int = 0,
+                 n_ants: int = 50,
+                 iterations: int = 200,
+                 alpha: float = 1.0,
+                 beta: float = 3.0,
+                 gamma: float = 1.0,
+                 rho: float = 0.1,
+                 q0: float = 0.2,
+                 n_best_ants: int = 1,
+                 apply_local_search: bool = False,
+                 start_time: float = 9.0,
+                 penalty_weight: float = 100.0):
+        """
+        Inicializar colonia de hormigas para TSP-TW
+        
+        Args:
+            time_matrix: Matriz de tiempos de viaje entre ciudades (en horas)
+                o TimeDependentTravelTimes
+            start_city_index: Índice de la ciudad de inicio (CDMX)
+            n_ants: Número de hormigas por iteración
+            iterations: Número de iteraciones
+            alpha: Peso de la feromona
+            beta: Peso de la visibilidad (1 / tiempo de viaje)
+            gamma: Peso de la urgencia de ventana (1 / (1 + espera))
+            rho: Tasa de evaporación
+            q0: Probabilidad de elegir la mejor ciudad (explotación ACS)
+            n_best_ants: Hormigas de la iteración que depositan feromona
+            apply_local_search: Si aplicar 2-opt con ventanas a la mejor hormiga
+            start_time: Hora de inicio del viaje (default: 9:00 AM)
+            penalty_weight: Peso de penalización por violación de ventanas
+        """
+        # Con tiempos dependientes de la hora, la visibilidad usa el promedio diario
+        self.time_matrix = static_matrix(time_matrix)
+        self.n_cities = len(time_matrix)
+        self.start_city_index = start_city_index
+        self.n_ants = n_ants
+        self.iterations = iterations
+        self.alpha = alpha
+        self.beta = beta
+        self.gamma = gamma
+        self.rho = rho
+        self.q0 = q0
+        self.n_best_ants = n_best_ants
+        self.start_time = start_time
+        
+        self.fitness_func = FitnessFunction(
+            time_matrix=time_matrix,
+            start_city_index=start_city_index,
+            start_time=start_time,
+            penalty_weight=penalty_weight
+        )
+        self.local_search = (LocalSearch(self.time_matrix, fitness_function=self.fitness_func)
+                             if apply_local_search else None)
+        
+        # Visibilidad: inversa del tiempo de viaje
+        with np.errstate(divide='ignore'):
+            self.visibility = np.where(self.time_matrix > 0, 1.0 / self.time_matrix, 0.0)
+        
+        self.pheromone = None
+        self.tau_min = None
+        self.tau_max = None
+        self.best_solution = None
+        self.best_fitness = float('inf')
+        self.fitness_history = []
+    
+    def initialize_pheromone(self) -> None:
+        """Inicializar feromona en tau_max (MMAS) usando una ruta de vecino más cercano"""
+        routes, fitness = self.construct_solutions(n_ants=1, greedy=True)
+        self.tau_max = 1.0 / (self.rho * fitness[0])
+        self.tau_min = self.tau_max / (2.0 * self.n_cities)
+        self.pheromone = np.full((self.n_cities, self.n_cities), self.tau_max)
+    
+    def construct_solutions(self, n_ants: Optional[int] = None,
+                            greedy: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Construir las rutas de todas las hormigas en paralelo
+        
+        En cada paso todas las hormigas eligen su siguiente ciudad a la vez:
+        se calcula para cada una la hora de llegada (con espera) a todas las
+        ciudades, se combinan feromona, visibilidad y urgencia de ventana, se
+        enmascaran las visitadas y se muestrea la ciudad siguiente.
+        
+        Args:
+            n_ants: Número de hormigas (default: self.n_ants)
+            greedy: Si elegir siempre la ciudad de mayor atractivo
+        
+        Returns:
+            Tupla (rutas (n_ants, n_cities), fitness (n_ants,))
+        """
+        n_ants = n_ants or self.n_ants
+        n = self.n_cities
+        calculator = self.fitness_func.route_calculator
+        ants = np.arange(n_ants)
+        
+        if self.pheromone is None:
+            attractiveness = self.visibility ** self.beta
+        else:
+            attractiveness = (self.pheromone ** self.alpha) * (self.visibility ** self.beta)
+        
+        routes = np.empty((n_ants, n), dtype=int)
+        routes[:, 0] = self.start_city_index
+        visited = np.zeros((n_ants, n), dtype=bool)
+        visited[:, self.start_city_index] = True
+        current = routes[:, 0].copy()
+        times = np.full(n_ants, self.start_time)
+        penalties = np.zeros(n_ants)
+        
+        cities = np.arange(n)
+        
+        for step in range(1, n):
+            travel = calculator.travel_time_batch(times[:, None], current[:, None], cities[None, :])
+            next_times, leg_penalties = calculator.arrive_batch(times[:, None] + travel)
+            waiting = next_times - (times[:, None] + travel)
+            
+            scores = attractiveness[current] * (1.0 / (1.0 + waiting)) ** self.gamma
+            scores[visited] = 0.0
+            # Evitar filas sin atractivo (p. ej. visibilidad nula)
+            scores[~visited & (scores.sum(axis=1, keepdims=True) <= 0)] = 1.0
+            
+            if greedy:
+                chosen = np.argmax(scores, axis=1)
+            else:
+                totals = np.cumsum(scores, axis=1)
+                thresholds = np.random.random(n_ants) * totals[:, -1]
+                chosen = np.argmax(totals > thresholds[:, None], axis=1)
+                
+                exploit = np.random.random(n_ants) < self.q0
+                chosen[exploit] = np.argmax(scores[exploit], axis=1)
+            
+            times = next_times[ants, chosen]
+            penalties += leg_penalties[ants, chosen]
+            visited[ants, chosen] = True
+            routes[:, step] = chosen
+            current = chosen
+        
+        fitness = times - self.start_time + penalties
+        return routes, fitness
+    
+    def update_pheromone(self, routes: np.ndarray, fitness: np.ndarray) -> None:
+        """
+        Evaporar y depositar feromona (vectorizado) con límites MMAS
+        
+        Args:
+            routes: Rutas que depositan feromona
+            fitness: Fitness de cada ruta
+        """
+        self.pheromone *= (1.0 - self.rho)
+        
+        deposit = np.repeat(1.0 / fitness, routes.shape[1] - 1)
+        origins = routes[:, :-1].ravel()
+        destinations = routes[:, 1:].ravel()
+        np.add.at(self.pheromone, (origins, destinations), deposit)
+        np.add.at(self.pheromone, (destinations, origins), deposit)
+        
+        self.tau_max = 1.0 / (self.rho * self.best_fitness)
+        self.tau_min = self.tau_max / (2.0 * self.n_cities)
+        np.clip(self.pheromone, self.tau_min, self.tau_max, out=self.pheromone)
+    
+    def solve(self, verbose: bool = True) -> Tuple[np.ndarray, float, List[float]]:
+        """
+        Ejecutar la colonia de hormigas
+        
+        Args:
+            verbose: Si mostrar progreso
+        
+        Returns:
+            Tupla con (mejor_ruta, mejor_fitness, historial_fitness)
+        """
+        self.initialize_pheromone()
+        
+        if verbose:
+            print(f"\n🐜 Iniciando Colonia de Hormigas para TSP-TW")
+            print(f"   Hormigas: {self.n_ants}")
+            print(f"   Iteraciones: {self.iterations}")
+            print(f"   Ciudad de inicio: índice {self.start_city_index}\n")
+        
+        for iteration in range(self.iterations):
+            routes, fitness = self.construct_solutions()
+            
+            order = np.argsort(fitness)[:self.n_best_ants]
+            if self.local_search is not None:
+                improved, value = self.local_search.optimize_time_windows(routes[order[0]])
+                routes[order[0]], fitness[order[0]] = improved, value
+            
+            best_idx = order[0]
+            if fitness[best_idx] < self.best_fitness:
+                self.best_fitness = fitness[best_idx]
+                self.best_solution = routes[best_idx].copy()
+            
+            self.update_pheromone(routes[order], fitness[order])
+            self.fitness_history.append(self.best_fitness)
+            
+            if verbose and (iteration + 1) % 50 == 0:
+                print(f"   Iteración {iteration + 1}/{self.iterations} - "
+                      f"Mejor tiempo: {self.best_fitness:.2f} horas")
+        
+        if verbose:
+            print(f"\n✓ Colonia completada")
+            print(f"   Mejor tiempo total: {self.best_fitness:.2f} horas")
+        
+        return self.best_solution, self.best_fitness, self.fitness_history
@@ -0,0 +1,510 @@
+"""
+CLI Module
+Punto de entrada único (python -m src) con subcomandos solve, evaluate,
+sweep, analyze y render. Varias etapas pueden encadenarse con '+' en una
+sola invocación; todas comparten los datos cargados una vez:
+    
+    python -m src evaluate --runs 5 + analyze + render
+"""
+
+import argparse
+import importlib
+import itertools
+import json
+import sys
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from .convergence_history import ConvergenceHistory
+from .distance_calculator import load_cached_matrix
+from .time_windows import RouteTimeCalculator
+
+START_CITY = 'Ciudad de México'
+STAGE_SEPARATOR = '+'
+
+# Solvers disponibles: (módulo, clase, parámetros por defecto). Se importan
+# solo al usarse.
+SOLVERS = {
+    'ga': ('genetic_algorithm', 'GeneticAlgorithm',
+           {'population_size': 100, 'generations': 500, 'mutation_rate': 0.02,
+            'crossover_rate': 0.8, 'elitism_rate': 0.1}),
+    'tabu': ('tabu_search', 'TabuSearch', {'iterations': 1000}),
+    'vns': ('vns', 'VariableNeighborhoodSearch', {}),
+    'lns': ('lns', 'LargeNeighborhoodSearch', {}),
+    'aco': ('ant_colony', 'AntColonyOptimization', {}),
+    'sa': ('simulated_annealing', 'ParallelTemperingSA', {}),
+}
+
+
+class Session:
+    """
+    Datos compartidos por las etapas de una invocación
+    
+    Las coordenadas y la matriz de tiempos se cargan la primera vez que una
+    etapa las pide (la matriz desde la caché binaria de load_cached_matrix)
+    y se reutilizan en las siguientes.
+    """
+    
+    def __init__(self, coords_file: str = "data/processed/coordenadas_capitales.csv",
+                 avg_speed_kmh: float = 60, dtype: str = 'float64',
+                 cache_dir: str = "data/processed", results_root: str = "results"):
+        """
+        Args:
+            coords_file: CSV de coordenadas (CIUDAD, ESTADO, lat, lon)
+            avg_speed_kmh: Velocidad de la matriz de tiempos
+            dtype: Precisión de la matriz en caché
+            cache_dir: Directorio de la caché de matrices
+            results_root: Directorio donde se crean los resultados
+        """
+        self.coords_file = coords_file
+        self.avg_speed_kmh = avg_speed_kmh
+        self.dtype = dtype
+        self.cache_dir = cache_dir
+        self.results_root = Path(results_root)
+        self.results_dir = None  # Último directorio escrito (para analyze/render)
+        self._coordinates = None
+        self._time_matrix = None
+    
+    @property
+    def coordinates(self) -> pd.DataFrame:
+        if self._coordinates is None:
+            self._coordinates = pd.read_csv(self.coords_file)
+            print(f"✓ {len(self._coordinates)} ciudades cargadas de {self.coords_file}")
+        return self._coordinates
+    
+    @property
+    def time_matrix(self) -> np.ndarray:
+        if self._time_matrix is None:
+            self._time_matrix = load_cached_matrix(self.coordinates, kind='time',
+                                                   avg_speed_kmh=self.avg_speed_kmh,
+                                                   cache_dir=self.cache_dir, dtype=self.dtype)
+            print(f"✓ Matriz de tiempos cargada ({self._time_matrix.shape[0]} ciudades)")
+        return self._time_matrix
+    
+    @property
+    def start_index(self) -> int:
+        matches = np.flatnonzero(self.coordinates['CIUDAD'] == START_CITY)
+        return int(matches[0]) if len(matches) else 0
+    
+    def new_results_dir(self, prefix: str, remember: bool = True) -> Path:
+        """
+        Crear results/<prefix>_<timestamp> (con sufijo _2, _3, ... si ya existe)
+        
+        Cada etapa obtiene su propio directorio aunque varias con el mismo
+        prefijo se ejecuten en el mismo segundo.
+        
+        Args:
+            prefix: Prefijo del directorio
+            remember: Si usarlo por defecto en analyze/render (solo para
+                directorios con mejor_ruta.csv y estadisticas.json)
+        
+        Returns:
+            Directorio creado
+        """
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        name = f"{prefix}_{timestamp}"
+        results_dir = self.results_root / name
+        suffix = 1
+        while True:
+            try:
+                results_dir.mkdir(parents=True, exist_ok=False)
+                break
+            except FileExistsError:
+                suffix += 1
+                results_dir = self.results_root / f"{name}_{suffix}"
+        if remember:
+            self.results_dir = results_dir
+        return results_dir
+    
+    def resolve_results_dir(self, results_dir: Optional[str]) -> Path:
+        """Directorio indicado o, si no, el escrito por una etapa anterior"""
+        if results_dir is not None:
+            path = Path(results_dir)
+        elif self.results_dir is not None:
+            path = self.results_dir
+        else:
+            raise ValueError("Indique un directorio de resultados o ejecute antes solve/evaluate")
+        if not path.exists():
+            raise ValueError(f"El directorio {path} no existe")
+        if not (path / "mejor_ruta.csv").exists():
+            raise ValueError(f"{path} no contiene mejor_ruta.csv")
+        return path
+
+
+def parse_params(items: Sequence[str]) -> Dict[str, object]:
+    """
+    Convertir ['clave=valor', ...] en un diccionario (valores como JSON si es posible)
+    
+    Args:
+        items: Parámetros en formato clave=valor
+    
+    Returns:
+        {clave: valor}
+    """
+    params = {}
+    for item in items:
+        key, sep, value = item.partition('=')
+        if not sep:
+            raise ValueError(f"Parámetro inválido: {item} (formato clave=valor)")
+        try:
+            params[key] = json.loads(value)
+        except json.JSONDecodeError:
+            params[key] = value
+    return params
+
+
+def run_solver(session: Session, solver: str, params: Dict[str, object], seed: int,
+               verbose: bool = False, track_stats: bool = False) -> Dict[str, object]:
+    """
+    Ejecutar un solver sobre la matriz de la sesión
+    
+    Args:
+        session: Sesión con los datos cargados
+        solver: Clave de SOLVERS
+        params: Parámetros del constructor (sobrescriben los de SOLVERS)
+        seed: Semilla de numpy
+        verbose: Si mostrar el progreso del solver
+        track_stats: Si registrar estadísticas por generación (solo AG)
+    
+    Returns:
+        Diccionario con best_fitness, best_route, convergence_history y seed
+    """
+    if solver not in SOLVERS:
+        raise ValueError(f"Solver desconocido: {solver} (opciones: {list(SOLVERS)})")
+    module_name, class_name, defaults = SOLVERS[solver]
+    solver_class = getattr(importlib.import_module(f".{module_name}", __package__), class_name)
+    
+    if solver == 'ga' and track_stats:
+        params = {'track_stats': True, **params}
+    
+    np.random.seed(seed)
+    instance = solver_class(time_matrix=session.time_matrix,
+                            start_city_index=session.start_index,
+                            **{**defaults, **params})
+    if solver == 'ga':
+        best_route, best_fitness, history = instance.evolve(verbose=verbose)
+    else:
+        best_route, best_fitness, history = instance.solve(verbose=verbose)
+    
+    return {
+        'best_fitness': float(best_fitness),
+        'best_route': np.asarray(best_route).tolist(),
+        'convergence_history': history,
+        'generation_stats': getattr(instance, 'generation_stats', None),
+        'seed': seed
+    }
+
+
+def calculate_statistics(results: List[Dict[str, object]]) -> Dict[str, object]:
+    """
+    Estadísticas de varias ejecuciones (mismo formato que run_evaluation.py)
+    
+    Args:
+        results: Resultados con 'run' y 'best_fitness'
+    
+    Returns:
+        Diccionario con estadísticas
+    """
+    fitness_values = [r['best_fitness'] for r in results]
+    return {
+        'best': min(fitness_values),
+        'worst': max(fitness_values),
+        'mean': float(np.mean(fitness_values)),
+        'median': float(np.median(fitness_values)),
+        'std': float(np.std(fitness_values)),
+        'best_run': results[int(np.argmin(fitness_values))]['run'],
+        'worst_run': results[int(np.argmax(fitness_values))]['run'],
+        'all_values': fitness_values
+    }
+
+
+def save_results(session: Session, results: List[Dict[str, object]], config: Dict[str, object],
+                 prefix: str, compress_history: bool = False) -> Path:
+    """
+    Guardar resultados con los nombres que lee TSPTWVisualizer.create_summary_report
+    
+    Args:
+        session: Sesión (coordenadas y directorio de resultados)
+        results: Resultados de run_solver con 'run'
+        config: Configuración usada
+        prefix: Prefijo del directorio (results/<prefix>_<timestamp>)
+        compress_history: Si guardar convergencias.npz con delta XOR
+            comprimido (para archivar; sin él se carga mapeado en memoria)
+    
+    Returns:
+        Directorio de resultados
+    """
+    results_dir = session.new_results_dir(prefix)
+    stats = calculate_statistics(results)
+    
+    with open(results_dir / "estadisticas.json", 'w') as f:
+        json.dump({
+            'statistics': {k: v for k, v in stats.items() if k != 'all_values'},
+            'all_fitness_values': stats['all_values'],
+            'configuration': config,
+            'timestamp': results_dir.name.split('_', 1)[1]
+        }, f, indent=2)
+    
+    best_route = next(r for r in results if r['run'] == stats['best_run'])['best_route']
+    coords = session.coordinates
+    pd.DataFrame({
+        'orden': range(1, len(best_route) + 1),
+        'ciudad_index': best_route,
+        'ciudad': coords['CIUDAD'].to_numpy()[best_route],
+        'estado': coords['ESTADO'].to_numpy()[best_route]
+    }).to_csv(results_dir / "mejor_ruta.csv", index=False)
+    
+    generation_stats = None
+    if all(r['generation_stats'] for r in results):
+        generation_stats = {name: [r['generation_stats'][name] for r in results]
+                            for name in results[0]['generation_stats']}
+    ConvergenceHistory.from_histories(
+        [r['convergence_history'] for r in results],
+        run_ids=[r['run'] for r in results],
+        stats=generation_stats
+    ).save(results_dir / "convergencias.npz", delta=compress_history)
+    
+    pd.DataFrame([{
+        'run': r['run'],
+        'best_fitness_hours': r['best_fitness'],
+        'best_fitness_days': r['best_fitness'] / 24,
+        'seed': r['seed']
+    } for r in results]).to_csv(results_dir / "resumen_ejecuciones.csv", index=False)
+    
+    print(f"✓ Resultados guardados en: {results_dir}")
+    return results_dir
+
+
+def run_many(session: Session, solver: str, params: Dict[str, object], runs: int,
+             seed: int, verbose: bool = False, track_stats: bool = False) -> List[Dict[str, object]]:
+    """Ejecutar `runs` repeticiones con semillas seed * run (como run_evaluation.py)"""
+    results = []
+    for run in range(1, runs + 1):
+        result = run_solver(session, solver, params, seed * run, verbose=verbose,
+                            track_stats=track_stats)
+        result['run'] = run
+        print(f"  Run {run}/{runs}: {result['best_fitness']:.2f} horas "
+              f"({result['best_fitness']/24:.2f} días)")
+        results.append(result)
+    return results
+
+
+def command_solve(session: Session, args: argparse.Namespace) -> Path:
+    """Una ejecución de un solver"""
+    print(f"\n🚀 Resolviendo con {args.solver}...")
+    params = parse_params(args.param)
+    result = run_solver(session, args.solver, params, args.seed, verbose=args.verbose,
+                        track_stats=True)
+    result['run'] = 1
+    print(f"✓ Solución completada - Mejor tiempo: {result['best_fitness']:.2f} horas "
+          f"({result['best_fitness']/24:.2f} días)")
+    config = {'solver': args.solver, 'seed': args.seed, **params}
+    return save_results(session, [result], config, prefix='solve',
+                        compress_history=args.compress_history)
+
+
+def command_evaluate(session: Session, args: argparse.Namespace) -> Path:
+    """Varias ejecuciones independientes y sus estadísticas"""
+    print(f"\n📊 Evaluando {args.solver} con {args.runs} ejecuciones...")
+    params = parse_params(args.param)
+    results = run_many(session, args.solver, params, args.runs, args.seed, verbose=args.verbose,
+                       track_stats=True)
+    stats = calculate_statistics(results)
+    print(f"✓ Evaluación completada - Mejor: {stats['best']:.2f} h (Run {stats['best_run']}), "
+          f"Media: {stats['mean']:.2f} h, Desv. estándar: {stats['std']:.2f} h")
+    config = {'solver': args.solver, 'num_runs': args.runs, 'seed': args.seed, **params}
+    return save_results(session, results, config, prefix='run',
+                        compress_history=args.compress_history)
+
+
+def command_sweep(session: Session, args: argparse.Namespace) -> Path:
+    """Barrido de parámetros: producto cartesiano de las listas de --grid"""
+    base = parse_params(args.param)
+    grid = {}
+    for item in args.grid:
+        key, sep, values = item.partition('=')
+        if not sep:
+            raise ValueError(f"Rejilla inválida: {item} (formato clave=v1,v2,...)")
+        grid[key] = [parse_params([f"{key}={value}"])[key] for value in values.split(',')]
+    
+    combinations = [dict(zip(grid, values)) for values in itertools.product(*grid.values())]
+    print(f"\n🔍 Barrido de {len(combinations)} configuraciones x {args.runs} ejecuciones...")
+    
+    rows = []
+    for combination in combinations:
+        print(f"\n  Configuración: {combination}")
+        results = run_many(session, args.solver, {**base, **combination}, args.runs, args.seed)
+        stats = calculate_statistics(results)
+        rows.append({**combination, 'best': stats['best'], 'mean': stats['mean'],
+                     'std': stats['std'], 'worst': stats['worst']})
+    
+    results_dir = session.new_results_dir('sweep', remember=False)
+    sweep_df = pd.DataFrame(rows).sort_values('mean')
+    sweep_df.to_csv(results_dir / "barrido.csv", index=False)
+    print(f"\n✓ Barrido completado - Mejor configuración: "
+          f"{sweep_df.iloc[0][list(grid)].to_dict()} ({sweep_df.iloc[0]['mean']:.2f} h de media)")
+    print(f"✓ Barrido guardado en: {results_dir / 'barrido.csv'}")
+    return results_dir
+
+
+def command_analyze(session: Session, args: argparse.Namespace) -> Dict[str, float]:
+    """Desglose de la mejor ruta de un directorio de resultados"""
+    results_dir = session.resolve_results_dir(args.results_dir)
+    route = pd.read_csv(results_dir / "mejor_ruta.csv")['ciudad_index'].to_numpy()
+    time_matrix = session.time_matrix
+    coords = session.coordinates
+    
+    legs = np.asarray(time_matrix[route[:-1], route[1:]])
+    calculator = RouteTimeCalculator(time_matrix, start_time=args.start_time)
+    total_time, waiting_time, penalty = calculator.calculate_route_time(route.tolist())
+    arrival_times = calculator.get_arrival_times(route.tolist())
+    
+    print(f"\n📍 Análisis de {results_dir / 'mejor_ruta.csv'} ({len(route)} ciudades)")
+    print(f"  Distancia total:      {legs.sum() * session.avg_speed_kmh:,.2f} km")
+    print(f"  Tiempo de viaje puro: {legs.sum():.2f} horas")
+    print(f"  Tiempo de espera:     {waiting_time:.2f} horas")
+    print(f"  Penalizaciones:       {penalty:.2f} horas")
+    print(f"  Tiempo total (TW):    {total_time:.2f} horas ({total_time/24:.2f} días)")
+    
+    print(f"\n  Tramos más largos:")
+    for leg in np.argsort(legs)[::-1][:args.top]:
+        print(f"    {coords['CIUDAD'].iloc[route[leg]]:20s} → "
+              f"{coords['CIUDAD'].iloc[route[leg + 1]]:20s}: {legs[leg]:5.2f} h")
+    
+    print(f"\n  Llegadas (primeras {args.top}):")
+    for position in range(min(args.top, len(route))):
+        print(f"    {coords['CIUDAD'].iloc[route[position]]:25s}: "
+              f"{calculator.format_time(arrival_times[position] - args.start_time)}")
+    
+    return {'travel_time': float(legs.sum()), 'waiting_time': waiting_time,
+            'penalty': penalty, 'total_time': total_time}
+
+
+def command_render(session: Session, args: argparse.Namespace) -> Path:
+    """Gráficas de un directorio de resultados (convergencia, boxplot y mapa)"""
+    from .visualizer import TSPTWVisualizer  # matplotlib solo para esta etapa
+    
+    results_dir = session.resolve_results_dir(args.results_dir)
+    if not (results_dir / "estadisticas.json").exists():
+        raise ValueError(f"{results_dir} no contiene estadisticas.json")
+    visualizer = TSPTWVisualizer(session.coordinates, output_dir=results_dir / "graficas")
+    visualizer.create_summary_report(results_dir)
+    return results_dir / "graficas"
+
+
+def build_parser(global_options: bool = True) -> argparse.ArgumentParser:
+    """
+    Parser con opciones de datos globales y un subcomando por etapa
+    
+    Args:
+        global_options: Si aceptar las opciones globales (solo la primera
+            etapa; en las siguientes argparse las rechaza)
+    
+    Returns:
+        ArgumentParser
+    """
+    parser = argparse.ArgumentParser(
+        prog='python -m src',
+        description="TSP-TW México. Encadene etapas con '+': "
+                    "python -m src evaluate --runs 5 + analyze + render")
+    if global_options:
+        parser.add_argument('--coords', default="data/processed/coordenadas_capitales.csv",
+                            help="CSV de coordenadas")
+        parser.add_argument('--speed', type=float, default=60, help="Velocidad promedio (km/h)")
+        parser.add_argument('--dtype', default='float64', choices=['float64', 'float32', 'uint16'],
+                            help="Precisión de la matriz en caché")
+        parser.add_argument('--cache-dir', default="data/processed", help="Caché de matrices")
+        parser.add_argument('--results-root', default="results", help="Directorio de resultados")
+    
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    
+    def add_solver_options(subparser, runs):
+        subparser.add_argument('--solver', default='ga', choices=list(SOLVERS))
+        subparser.add_argument('--param', action='append', default=[], metavar='CLAVE=VALOR',
+                               help="Parámetro del solver (repetible)")
+        subparser.add_argument('--seed', type=int, default=42,
+                               help="Semilla (la ejecución r usa seed * r)")
+        if runs:
+            subparser.add_argument('--runs', type=int, default=runs)
+    
+    solve = subparsers.add_parser('solve', help="Una ejecución de un solver")
+    add_solver_options(solve, runs=None)
+    solve.add_argument('--verbose', action='store_true')
+    solve.add_argument('--compress-history', action='store_true',
+                       help="Guardar convergencias con delta XOR comprimido (archivo)")
+    solve.set_defaults(handler=command_solve)
+    
+    evaluate = subparsers.add_parser('evaluate', help="Varias ejecuciones y estadísticas")
+    add_solver_options(evaluate, runs=10)
+    evaluate.add_argument('--verbose', action='store_true')
+    evaluate.add_argument('--compress-history', action='store_true',
+                          help="Guardar convergencias con delta XOR comprimido (archivo)")
+    evaluate.set_defaults(handler=command_evaluate)
+    
+    sweep = subparsers.add_parser('sweep', help="Barrido de parámetros")
+    add_solver_options(sweep, runs=3)
+    sweep.add_argument('--grid', action='append', required=True, metavar='CLAVE=V1,V2,...',
+                       help="Valores a probar de un parámetro (repetible)")
+    sweep.set_defaults(handler=command_sweep)
+    
+    analyze = subparsers.add_parser('analyze', help="Analizar la mejor ruta de unos resultados")
+    analyze.add_argument('results_dir', nargs='?', help="Default: el de la etapa anterior")
+    analyze.add_argument('--start-time', type=float, default=9.0)
+    analyze.add_argument('--top', type=int, default=10)
+    analyze.set_defaults(handler=command_analyze)
+    
+    render = subparsers.add_parser('render', help="Generar las gráficas de unos resultados")
+    render.add_argument('results_dir', nargs='?', help="Default: el de la etapa anterior")
+    render.set_defaults(handler=command_render)
+    
+    return parser
+
+
+def split_stages(argv: Sequence[str]) -> List[List[str]]:
+    """Separar los argumentos en etapas por STAGE_SEPARATOR"""
+    stages = [[]]
+    for arg in argv:
+        if arg == STAGE_SEPARATOR:
+            stages.append([])
+        else:
+            stages[-1].append(arg)
+    return [stage for stage in stages if stage]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Ejecutar una o varias etapas en un mismo proceso
+    
+    Las opciones globales (--coords, --speed, ...) solo se aceptan antes de
+    la primera etapa y definen la sesión que comparten todas; en las etapas
+    siguientes son un error de argumentos.
+    
+    Args:
+        argv: Argumentos (default: sys.argv[1:])
+    
+    Returns:
+        Código de salida
+    """
+    parser = build_parser()
+    stages = split_stages(sys.argv[1:] if argv is None else argv)
+    if not stages:
+        parser.print_help()
+        return 1
+    
+    stage_parser = build_parser(global_options=False)
+    parsed = [parser.parse_args(stages[0])] + [stage_parser.parse_args(stage)
+                                               for stage in stages[1:]]
+    first = parsed[0]
+    session = Session(first.coords, avg_speed_kmh=first.speed, dtype=first.dtype,
+                      cache_dir=first.cache_dir, results_root=first.results_root)
+    
+    for args in parsed:
+        try:
+            args.handler(session, args)
+        except (ValueError, TypeError, ImportError) as e:
+            print(f"✗ Error en {args.command}: {e}")
+            return 1
+    return 0
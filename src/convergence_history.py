@@ -0,0 +1,183 @@
+"""
+Convergence History Module
+Historiales de convergencia en formato columnar (ejecuciones x generaciones
+float32 en .npz) en lugar de filas CSV por (ejecución, generación)
+"""
+
+import struct
+import zipfile
+import numpy as np
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+
+class ConvergenceHistory:
+    """
+    Historiales de varias ejecuciones como arrays 2-D float32
+    
+    La fila r contiene el mejor fitness por generación de la ejecución r;
+    las ejecuciones más cortas se rellenan con su último valor y su longitud
+    real queda en `lengths`. Pueden acompañarse de estadísticas por
+    generación con la misma forma (p. ej. media, peor y diversidad).
+    """
+    
+    def __init__(self, best: np.ndarray, run_ids: np.ndarray, lengths: np.ndarray,
+                 stats: Optional[Dict[str, np.ndarray]] = None):
+        """
+        Args:
+            best: Array (ejecuciones, generaciones) con el mejor fitness
+            run_ids: Identificador de cada ejecución
+            lengths: Generaciones reales de cada ejecución
+            stats: {nombre: array (ejecuciones, generaciones)} opcionales
+        """
+        self.best = best
+        self.run_ids = run_ids
+        self.lengths = lengths
+        self.stats = stats or {}
+    
+    @classmethod
+    def from_histories(cls, histories: Sequence[Sequence[float]],
+                       run_ids: Optional[Sequence[int]] = None,
+                       stats: Optional[Dict[str, Sequence[Sequence[float]]]] = None
+                       ) -> 'ConvergenceHistory':
+        """
+        Construir a partir de listas de historiales (p. ej. de GeneticAlgorithm.evolve)
+        
+        Args:
+            histories: Historial de mejor fitness de cada ejecución
+            run_ids: Identificador de cada ejecución (default: 1..n)
+            stats: {nombre: historiales por ejecución} opcionales
+        
+        Returns:
+            ConvergenceHistory
+        """
+        lengths = np.array([len(h) for h in histories], dtype=np.int64)
+        run_ids = np.arange(1, len(histories) + 1) if run_ids is None else np.asarray(run_ids)
+        
+        def pack(rows):
+            array = np.empty((len(rows), lengths.max(initial=0)), dtype=np.float32)
+            for r, row in enumerate(rows):
+                array[r, :len(row)] = row
+                array[r, len(row):] = row[-1] if len(row) else np.nan
+            return array
+        
+        packed_stats = {name: pack(rows) for name, rows in (stats or {}).items()}
+        return cls(pack(histories), run_ids, lengths, packed_stats)
+    
+    def __len__(self) -> int:
+        return len(self.best)
+    
+    def run(self, run_id: int, name: str = 'best') -> np.ndarray:
+        """
+        Historial de una ejecución sin relleno
+        
+        Args:
+            run_id: Identificador de la ejecución
+            name: 'best' o el nombre de una estadística
+        
+        Returns:
+            Vista (sin copia) de la fila correspondiente
+        """
+        row = int(np.flatnonzero(self.run_ids == run_id)[0])
+        array = self.best if name == 'best' else self.stats[name]
+        return array[row, :self.lengths[row]]
+    
+    def histories(self) -> List[np.ndarray]:
+        """Historial de mejor fitness de cada ejecución, sin relleno"""
+        return [self.best[r, :n] for r, n in enumerate(self.lengths)]
+    
+    def save(self, filename: str, delta: bool = False) -> Path:
+        """
+        Guardar como .npz (cada array se escribe directamente desde su buffer)
+        
+        Sin delta los miembros se guardan sin comprimir, por lo que load los
+        abre mapeados en memoria dentro del mismo archivo. Con delta=True
+        cada valor se guarda como el XOR de sus bits con los del valor
+        anterior de la fila y el archivo se comprime: las generaciones sin
+        mejora quedan en cero, lo que reduce mucho el tamaño sin perder
+        precisión, a cambio de decodificar (copiar) al cargar.
+        
+        Args:
+            filename: Ruta del archivo .npz
+            delta: Si aplicar codificación delta y compresión
+        
+        Returns:
+            Ruta del archivo escrito
+        """
+        arrays = {'best': self.best, **{f"stat_{k}": v for k, v in self.stats.items()}}
+        if delta:
+            arrays = {k: _xor_delta_encode(v) for k, v in arrays.items()}
+        arrays.update(run_ids=self.run_ids, lengths=self.lengths, delta=np.array(delta))
+        
+        filename = Path(filename)
+        filename.parent.mkdir(parents=True, exist_ok=True)
+        (np.savez_compressed if delta else np.savez)(filename, **arrays)
+        return filename
+    
+    @classmethod
+    def load(cls, filename: str, mmap_mode: Optional[str] = 'r') -> 'ConvergenceHistory':
+        """
+        Cargar un archivo escrito con save
+        
+        Args:
+            filename: Ruta del .npz
+            mmap_mode: Modo de np.memmap para los historiales de un archivo
+                sin delta (None para leerlos a memoria); con delta siempre
+                se decodifican a arrays nuevos
+        
+        Returns:
+            ConvergenceHistory
+        """
+        with np.load(filename) as data:
+            delta = bool(data['delta'])
+            names = [k for k in data.files if k == 'best' or k.startswith('stat_')]
+            run_ids, lengths = data['run_ids'], data['lengths']
+            if delta:
+                arrays = {k: _xor_delta_decode(data[k]) for k in names}
+            elif mmap_mode is None:
+                arrays = {k: data[k] for k in names}
+        if not delta and mmap_mode is not None:
+            arrays = _memmap_npz_members(filename, names, mmap_mode)
+        stats = {k[len('stat_'):]: v for k, v in arrays.items() if k != 'best'}
+        return cls(arrays['best'], run_ids, lengths, stats)
+
+
+def _memmap_npz_members(filename: str, names: List[str], mode: str) -> Dict[str, np.ndarray]:
+    """
+    Mapear en memoria miembros sin comprimir de un .npz (sin copiarlos)
+    
+    Cada miembro es un .npy guardado tal cual dentro del zip: se salta la
+    cabecera local del zip y la del .npy y se abre un np.memmap en ese offset.
+    """
+    arrays = {}
+    with zipfile.ZipFile(filename) as archive, open(filename, 'rb') as f:
+        for name in names:
+            info = archive.getinfo(f"{name}.npy")
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f"{filename}: {name} está comprimido y no puede mapearse")
+            f.seek(info.header_offset + 26)
+            name_length, extra_length = struct.unpack('<HH', f.read(4))
+            f.seek(info.header_offset + 30 + name_length + extra_length)
+            version = np.lib.format.read_magic(f)
+            read_header = (np.lib.format.read_array_header_1_0 if version == (1, 0)
+                           else np.lib.format.read_array_header_2_0)
+            shape, fortran_order, dtype = read_header(f)
+            if 0 in shape:
+                arrays[name] = np.empty(shape, dtype=dtype)
+            else:
+                arrays[name] = np.memmap(filename, dtype=dtype, mode=mode, offset=f.tell(),
+                                         shape=shape, order='F' if fortran_order else 'C')
+    return arrays
+
+
+def _xor_delta_encode(values: np.ndarray) -> np.ndarray:
+    """XOR de los bits float32 de cada valor con el anterior de su fila"""
+    bits = np.ascontiguousarray(values, dtype=np.float32).view(np.uint32)
+    encoded = bits.copy()
+    encoded[:, 1:] ^= bits[:, :-1]
+    return encoded
+
+
+def _xor_delta_decode(encoded: np.ndarray) -> np.ndarray:
+    """Inversa de _xor_delta_encode"""
+    return np.bitwise_xor.accumulate(encoded, axis=1).view(np.float32)
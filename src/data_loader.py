@@ -3,34 +3,289 @@ Data Loader Module
 Cargar y procesar shapefiles de México (estados y ciudades)
 """
 
-import geopandas as gpd
+import csv
+import hashlib
+import os
+import re
+import struct
+import tempfile
+import numpy as np
 import pandas as pd
 from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    import geopandas as gpd
+
+
+# Tipos de geometría en .shp (sin, con Z, con M)
+POINT_SHAPE_TYPES = (1, 11, 21)
+POLYGON_SHAPE_TYPES = (5, 15, 25)
+
+
+def _dbf_encoding(shp_path: Path, encoding: Optional[str]) -> str:
+    """Codificación del .dbf: la indicada, la del .cpg o cp1252"""
+    if encoding is not None:
+        return encoding
+    cpg = shp_path.with_suffix('.cpg')
+    return cpg.read_text().strip() if cpg.exists() else 'cp1252'
+
+
+def _read_dbf_header(dbf) -> Tuple[int, int, Dict[str, Tuple[int, int, str, int]]]:
+    """
+    Leer la cabecera de un .dbf
+    
+    Returns:
+        Tupla (n_registros, longitud_registro, {campo: (inicio, longitud, tipo, decimales)})
+    """
+    header = dbf.read(32)
+    n_records, header_length, record_length = struct.unpack('<IHH', header[4:12])
+    descriptors = dbf.read(header_length - 32)
+    
+    fields, offset = {}, 1  # el primer byte de cada registro es la marca de borrado
+    for start in range(0, len(descriptors) - 1, 32):
+        descriptor = descriptors[start:start + 32]
+        if descriptor[0] == 0x0D:
+            break
+        name = descriptor[:11].split(b'\0')[0].decode('ascii')
+        length, decimals = descriptor[16], descriptor[17]
+        fields[name] = (offset, length, chr(descriptor[11]), decimals)
+        offset += length
+    return n_records, record_length, fields
+
+
+def _decode_dbf_value(raw: bytes, kind: str, decimals: int, encoding: str):
+    """Convertir un campo de .dbf al tipo de Python correspondiente"""
+    text = raw.decode(encoding, errors='replace').strip()
+    if kind in 'NF':
+        if not text or text.startswith('*'):
+            return None
+        return int(text) if kind == 'N' and decimals == 0 and '.' not in text else float(text)
+    if kind == 'L':
+        return text.upper() in ('Y', 'T', 'S') if text and text != '?' else None
+    return text
+
+
+def iter_point_features(shp_path: str, fields: Sequence[str] = ('CIUDAD', 'ESTADO'),
+                        where: Optional[Dict[str, object]] = None,
+                        bbox: Optional[Tuple[float, float, float, float]] = None,
+                        encoding: Optional[str] = None) -> Iterator[Tuple[float, float, tuple]]:
+    """
+    Recorrer una capa de puntos (.shp + .dbf) registro a registro con filtros
+    
+    Los archivos se leen en paralelo y en secuencia, de modo que la memoria es
+    constante sin importar el tamaño de la capa. Los filtros se aplican al
+    leer: primero los de atributos (decodificando solo esos campos), luego
+    el rectángulo, y solo para los registros aceptados se decodifican los
+    campos de salida. Las coordenadas se devuelven tal como están en la capa
+    (se espera un sistema geográfico, como el de los shapefiles del proyecto).
+    
+    Args:
+        shp_path: Ruta del .shp
+        fields: Campos de atributos a devolver
+        where: {campo: valor}, {campo: colección de valores} o
+            {campo: función que devuelve bool}; deben cumplirse todos
+        bbox: (lon_min, lat_min, lon_max, lat_max)
+        encoding: Codificación del .dbf (default: la del .cpg o cp1252)
+        
+    Yields:
+        Tuplas (lat, lon, valores de fields)
+    """
+    shp_path = Path(shp_path)
+    encoding = _dbf_encoding(shp_path, encoding)
+    
+    predicates = []
+    for name, condition in (where or {}).items():
+        if callable(condition):
+            predicates.append((name, condition))
+        elif isinstance(condition, (set, frozenset, list, tuple)):
+            predicates.append((name, frozenset(condition).__contains__))
+        else:
+            predicates.append((name, lambda value, expected=condition: value == expected))
+    
+    with open(shp_path, 'rb') as shp, open(shp_path.with_suffix('.dbf'), 'rb') as dbf:
+        shape_type = struct.unpack('<i', shp.read(100)[32:36])[0]
+        if shape_type not in POINT_SHAPE_TYPES:
+            raise ValueError(f"{shp_path} no es una capa de puntos (tipo de geometría {shape_type})")
+        
+        n_records, record_length, layout = _read_dbf_header(dbf)
+        missing = [name for name in list(fields) + [p[0] for p in predicates] if name not in layout]
+        if missing:
+            raise KeyError(f"Campos inexistentes en {shp_path.name}: {missing}")
+        filters = [(layout[name], accept) for name, accept in predicates]
+        outputs = [layout[name] for name in fields]
+        
+        for _ in range(n_records):
+            record = dbf.read(record_length)
+            _, content_length = struct.unpack('>ii', shp.read(8))
+            content = shp.read(2 * content_length)
+            
+            if record[:1] == b'*' or len(content) < 20:
+                continue  # registro borrado o geometría nula
+            if not all(accept(_decode_dbf_value(record[start:start + length], kind, decimals,
+                                                encoding))
+                       for (start, length, kind, decimals), accept in filters):
+                continue
+            
+            lon, lat = struct.unpack('<2d', content[4:20])
+            if bbox is not None and not (bbox[0] <= lon <= bbox[2] and bbox[1] <= lat <= bbox[3]):
+                continue
+            
+            yield lat, lon, tuple(_decode_dbf_value(record[start:start + length], kind, decimals,
+                                                    encoding)
+                                  for start, length, kind, decimals in outputs)
+
+
+def iter_polygon_features(shp_path: str, fields: Sequence[str] = ('ESTADO',),
+                          encoding: Optional[str] = None) -> Iterator[Tuple[List[np.ndarray], tuple]]:
+    """
+    Recorrer una capa de polígonos (.shp + .dbf) registro a registro
+    
+    Args:
+        shp_path: Ruta del .shp
+        fields: Campos de atributos a devolver
+        encoding: Codificación del .dbf (default: la del .cpg o cp1252)
+        
+    Yields:
+        Tuplas (anillos, valores de fields); cada anillo es un array (m, 2)
+        con columnas (lon, lat)
+    """
+    shp_path = Path(shp_path)
+    encoding = _dbf_encoding(shp_path, encoding)
+    
+    with open(shp_path, 'rb') as shp, open(shp_path.with_suffix('.dbf'), 'rb') as dbf:
+        shape_type = struct.unpack('<i', shp.read(100)[32:36])[0]
+        if shape_type not in POLYGON_SHAPE_TYPES:
+            raise ValueError(f"{shp_path} no es una capa de polígonos (tipo de geometría {shape_type})")
+        
+        n_records, record_length, layout = _read_dbf_header(dbf)
+        outputs = [layout[name] for name in fields]
+        
+        for _ in range(n_records):
+            record = dbf.read(record_length)
+            _, content_length = struct.unpack('>ii', shp.read(8))
+            content = shp.read(2 * content_length)
+            if record[:1] == b'*' or len(content) < 44:
+                continue
+            
+            n_parts, n_points = struct.unpack('<2i', content[36:44])
+            parts = np.frombuffer(content, dtype='<i4', count=n_parts, offset=44)
+            points = np.frombuffer(content, dtype='<f8', count=2 * n_points,
+                                   offset=44 + 4 * n_parts).reshape(-1, 2)
+            rings = np.split(points, parts[1:])
+            
+            yield rings, tuple(_decode_dbf_value(record[start:start + length], kind, decimals,
+                                                 encoding)
+                               for start, length, kind, decimals in outputs)
 
 
 class DataLoader:
     """Clase para cargar y procesar datos geográficos de México"""
     
+    # Columnas usadas por extract_capitals (además de la geometría)
+    CITY_COLUMNS = ['CIUDAD', 'ESTADO', 'CAPITAL']
+    # Archivos del shapefile que definen su contenido
+    SHAPEFILE_PARTS = ('.shp', '.shx', '.dbf', '.prj')
+    
     def __init__(self, data_dir: str = "data"):
         self.data_dir = Path(data_dir)
         self.raw_dir = self.data_dir / "raw"
         self.processed_dir = self.data_dir / "processed"
+        self.cache_dir = self.processed_dir / "cache"
         
-    def load_shapefile(self, filename: str) -> gpd.GeoDataFrame:
+    def load_shapefile(self, filename: str, columns: Optional[List[str]] = None,
+                       use_cache: bool = True) -> 'gpd.GeoDataFrame':
         """
         Cargar un shapefile desde el directorio raw
         
+        La primera lectura guarda una instantánea GeoParquet en
+        processed/cache; las siguientes leen de ella solo las columnas
+        pedidas. La clave de la instantánea incluye tamaño y fecha de
+        modificación de los archivos del shapefile, así que se regenera
+        sola cuando cambian los datos de origen.
+        
         Args:
             filename: Nombre del archivo shapefile
+            columns: Columnas de atributos a cargar (la geometría siempre se incluye)
+            use_cache: Si usar la instantánea columnar
             
         Returns:
             GeoDataFrame con los datos cargados
         """
+        # geopandas solo se importa al leer shapefiles (arranque rápido del solver)
+        import geopandas as gpd
+        
         filepath = self.raw_dir / filename
-        return gpd.read_file(filepath)
+        selected = None if columns is None else list(columns) + ['geometry']
+        
+        if not use_cache:
+            if columns is None:
+                return gpd.read_file(filepath)
+            try:
+                # Solo las columnas pedidas (geopandas >= 1.0 o motor pyogrio)
+                return gpd.read_file(filepath, columns=list(columns))[selected]
+            except TypeError:
+                return gpd.read_file(filepath)[selected]
+        
+        snapshot = self.snapshot_path(filepath)
+        if snapshot.exists():
+            return gpd.read_parquet(snapshot, columns=selected)
+        
+        gdf = gpd.read_file(filepath)
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            temporary = snapshot.with_name(f"{snapshot.stem}.{os.getpid()}.tmp")
+            gdf.to_parquet(temporary)
+            os.replace(temporary, snapshot)
+            self.remove_stale_snapshots(snapshot)
+        except ImportError:
+            print(f"   ℹ pyarrow no disponible: {filename} se leerá sin caché columnar")
+        
+        return gdf if selected is None else gdf[selected]
+    
+    def remove_stale_snapshots(self, snapshot: Path) -> List[Path]:
+        """
+        Borrar las instantáneas anteriores del mismo shapefile
+        
+        Solo se consideran archivos <nombre>_<16 hex>.parquet con exactamente
+        el mismo nombre de capa, de modo que capas cuyo nombre empieza igual
+        (p. ej. México_Ciudades y México_Ciudades_2020) no se afectan.
+        
+        Args:
+            snapshot: Instantánea vigente (de snapshot_path)
+            
+        Returns:
+            Rutas borradas
+        """
+        stem = snapshot.stem[:-17]
+        pattern = re.compile(rf"{re.escape(stem)}_[0-9a-f]{{16}}\.parquet")
+        removed = []
+        for stale in self.cache_dir.iterdir():
+            if stale != snapshot and pattern.fullmatch(stale.name):
+                stale.unlink()
+                removed.append(stale)
+        return removed
+    
+    def snapshot_path(self, filepath: Path) -> Path:
+        """
+        Ruta de la instantánea columnar de un shapefile
+        
+        Args:
+            filepath: Ruta del .shp
+            
+        Returns:
+            Ruta del .parquet en processed/cache
+        """
+        digest = hashlib.sha256()
+        for part in self.SHAPEFILE_PARTS:
+            source = filepath.with_suffix(part)
+            if source.exists():
+                stat = source.stat()
+                digest.update(f"{source.name}|{stat.st_size}|{stat.st_mtime_ns}".encode())
+        return self.cache_dir / f"{filepath.stem}_{digest.hexdigest()[:16]}.parquet"
     
-    def extract_capitals(self, states_gdf: gpd.GeoDataFrame, 
-                        cities_gdf: gpd.GeoDataFrame) -> pd.DataFrame:
+    def extract_capitals(self, states_gdf: 'gpd.GeoDataFrame', 
+                        cities_gdf: 'gpd.GeoDataFrame') -> pd.DataFrame:
         """
         Extraer coordenadas de las capitales estatales
         
@@ -66,6 +321,65 @@ class DataLoader:
         
         return df
     
+    def extract_points(self, filename: str, output_file: str,
+                       fields: Sequence[str] = ('CIUDAD', 'ESTADO'),
+                       where: Optional[Dict[str, object]] = None,
+                       bbox: Optional[Tuple[float, float, float, float]] = None,
+                       name_length: int = 64) -> int:
+        """
+        Extraer puntos filtrados de una capa grande directamente a disco
+        
+        Los registros de iter_point_features se escriben según se leen, así
+        que la memoria no depende del tamaño de la capa. Con salida .csv se
+        escriben las columnas fields + lat, lon (como coordenadas_capitales.csv);
+        con salida .npy, un array estructurado (lat, lon y los campos como
+        texto de name_length caracteres) que se arma desde un archivo binario
+        temporal.
+        
+        Args:
+            filename: Shapefile de puntos en el directorio raw
+            output_file: Archivo de salida (.csv o .npy)
+            fields: Campos de atributos a conservar
+            where: Filtros de atributos (ver iter_point_features)
+            bbox: (lon_min, lat_min, lon_max, lat_max)
+            name_length: Longitud de los campos de texto en la salida .npy
+            
+        Returns:
+            Número de puntos extraídos
+        """
+        features = iter_point_features(self.raw_dir / filename, fields, where, bbox)
+        output_file = Path(output_file)
+        count = 0
+        
+        if output_file.suffix == '.npy':
+            dtype = np.dtype([('lat', np.float64), ('lon', np.float64)]
+                             + [(name, f'U{name_length}') for name in fields])
+            with tempfile.TemporaryFile(dir=output_file.parent) as buffer:
+                for lat, lon, values in features:
+                    record = (lat, lon) + tuple('' if v is None else str(v) for v in values)
+                    buffer.write(np.array(record, dtype=dtype).tobytes())
+                    count += 1
+                
+                output = np.lib.format.open_memmap(output_file, mode='w+', dtype=dtype,
+                                                   shape=(count,))
+                buffer.seek(0)
+                chunk = max(1, (1 << 20) // dtype.itemsize)
+                for start in range(0, count, chunk):
+                    block = np.frombuffer(buffer.read(chunk * dtype.itemsize), dtype=dtype)
+                    output[start:start + len(block)] = block
+                output.flush()
+                del output
+        else:
+            with open(output_file, 'w', newline='', encoding='utf-8') as handle:
+                writer = csv.writer(handle)
+                writer.writerow(list(fields) + ['lat', 'lon'])
+                for lat, lon, values in features:
+                    writer.writerow(list(values) + [lat, lon])
+                    count += 1
+        
+        print(f"✓ {count} puntos extraídos de {filename} en: {output_file}")
+        return count
+    
     def save_coordinates(self, df: pd.DataFrame, filename: str = "coordenadas_capitales.csv"):
         """
         Guardar coordenadas procesadas
@@ -3,10 +3,547 @@ Distance Calculator Module
 Calcular distancias y tiempos de viaje entre ciudades
 """
 
+import hashlib
+import math
+import os
 import numpy as np
 import pandas as pd
-from geopy.distance import geodesic
-from typing import Tuple, List
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+
+# Elipsoide WGS-84 (el mismo que usa geopy.distance.geodesic)
+WGS84_A = 6378.137
+WGS84_F = 1 / 298.257223563
+WGS84_B = (1 - WGS84_F) * WGS84_A
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_distances(lat1: np.ndarray, lon1: np.ndarray,
+                        lat2: np.ndarray, lon2: np.ndarray) -> np.ndarray:
+    """
+    Distancia de gran círculo (esfera de radio medio) con difusión NumPy
+    
+    Args:
+        lat1, lon1: Coordenadas de origen en grados
+        lat2, lon2: Coordenadas de destino en grados (se difunden contra las de origen)
+        
+    Returns:
+        Distancias en kilómetros
+    """
+    phi1, phi2 = np.radians(lat1), np.radians(lat2)
+    dphi = phi2 - phi1
+    dlam = np.radians(lon2) - np.radians(lon1)
+    h = np.sin(dphi / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(dlam / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(h, 0.0, 1.0)))
+
+
+def ellipsoidal_distances(lat1: np.ndarray, lon1: np.ndarray,
+                          lat2: np.ndarray, lon2: np.ndarray,
+                          max_iterations: int = 200,
+                          tolerance: float = 1e-12) -> np.ndarray:
+    """
+    Distancia geodésica sobre el elipsoide WGS-84 (fórmula inversa de
+    Vincenty vectorizada); coincide con geopy a nivel de milímetros
+    
+    Todas las parejas iteran a la vez hasta que converge la más lenta. Los
+    pares casi antipodales, donde Vincenty no converge, usan haversine.
+    
+    Args:
+        lat1, lon1: Coordenadas de origen en grados
+        lat2, lon2: Coordenadas de destino en grados (se difunden contra las de origen)
+        max_iterations: Máximo de iteraciones sobre lambda
+        tolerance: Tolerancia de convergencia de lambda (radianes)
+        
+    Returns:
+        Distancias en kilómetros
+    """
+    a, b, f = WGS84_A, WGS84_B, WGS84_F
+    L = np.radians(lon2) - np.radians(lon1)
+    U1 = np.arctan((1 - f) * np.tan(np.radians(lat1)))
+    U2 = np.arctan((1 - f) * np.tan(np.radians(lat2)))
+    sinU1, cosU1 = np.sin(U1), np.cos(U1)
+    sinU2, cosU2 = np.sin(U2), np.cos(U2)
+    L, sinU1, cosU1, sinU2, cosU2 = np.broadcast_arrays(L, sinU1, cosU1, sinU2, cosU2)
+    
+    lam = L.copy()
+    converged = False
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for _ in range(max_iterations):
+            sin_lam, cos_lam = np.sin(lam), np.cos(lam)
+            sin_sigma = np.hypot(cosU2 * sin_lam, cosU1 * sinU2 - sinU1 * cosU2 * cos_lam)
+            cos_sigma = sinU1 * sinU2 + cosU1 * cosU2 * cos_lam
+            sigma = np.arctan2(sin_sigma, cos_sigma)
+            sin_alpha = np.where(sin_sigma > 0, cosU1 * cosU2 * sin_lam / sin_sigma, 0.0)
+            cos2_alpha = 1 - sin_alpha ** 2
+            # Líneas ecuatoriales: cos2_alpha = 0
+            cos_2sigma_m = np.where(cos2_alpha > 0,
+                                    cos_sigma - 2 * sinU1 * sinU2 / cos2_alpha, 0.0)
+            C = f / 16 * cos2_alpha * (4 + f * (4 - 3 * cos2_alpha))
+            previous = lam
+            lam = L + (1 - C) * f * sin_alpha * (
+                sigma + C * sin_sigma * (cos_2sigma_m + C * cos_sigma * (-1 + 2 * cos_2sigma_m ** 2))
+            )
+            delta = np.abs(lam - previous)
+            if not np.any(delta > tolerance):
+                converged = True
+                break
+    
+    u2 = cos2_alpha * (a ** 2 - b ** 2) / b ** 2
+    A = 1 + u2 / 16384 * (4096 + u2 * (-768 + u2 * (320 - 175 * u2)))
+    B = u2 / 1024 * (256 + u2 * (-128 + u2 * (74 - 47 * u2)))
+    delta_sigma = B * sin_sigma * (cos_2sigma_m + B / 4 * (
+        cos_sigma * (-1 + 2 * cos_2sigma_m ** 2)
+        - B / 6 * cos_2sigma_m * (-3 + 4 * sin_sigma ** 2) * (-3 + 4 * cos_2sigma_m ** 2)
+    ))
+    distances = b * A * (sigma - delta_sigma)
+    
+    if not converged:
+        failed = (delta > tolerance) | ~np.isfinite(distances)
+        fallback = haversine_distances(lat1, lon1, lat2, lon2)
+        distances = np.where(failed, np.broadcast_to(fallback, distances.shape), distances)
+    
+    return distances
+
+
+DISTANCE_METHODS = {
+    'haversine': haversine_distances,
+    'ellipsoidal': ellipsoidal_distances,
+}
+
+# Precisiones de almacenamiento en disco; las matrices uint16 guardan
+# kilómetros (distancias) o minutos (tiempos) redondeados
+MATRIX_DTYPES = {'float64': np.float64, 'float32': np.float32, 'uint16': np.uint16}
+UINT16_SCALES = {'distance': 1.0, 'time': 1.0 / 60.0}
+
+
+class ScaledMatrix:
+    """
+    Vista de solo lectura sobre una matriz entera (p. ej. np.memmap uint16)
+    que devuelve valores float ya escalados al indexar
+    
+    Solo se convierten los elementos leídos, por lo que la matriz completa
+    nunca se copia en memoria (salvo al convertirla con np.asarray).
+    """
+    
+    def __init__(self, data: np.ndarray, scale: float):
+        """
+        Args:
+            data: Matriz entera (puede ser np.memmap)
+            scale: Factor a unidades del solver (p. ej. 1/60 de minutos a horas)
+        """
+        self.data = data
+        self.scale = scale
+        self.shape = data.shape
+        self.dtype = np.dtype(float)
+    
+    def __len__(self) -> int:
+        return len(self.data)
+    
+    def __getitem__(self, key):
+        return self.data[key] * self.scale
+    
+    def __array__(self, dtype=None, copy=None):
+        return np.asarray(self.data * self.scale, dtype=dtype)
+
+
+def condensed_index(i, j, n: int):
+    """
+    Posición del par (i, j), i != j, en la forma condensada de una matriz
+    simétrica n x n (triángulo superior por filas, como scipy.spatial.distance)
+    
+    Args:
+        i, j: Índices (escalares o arrays difundibles)
+        n: Tamaño de la matriz
+        
+    Returns:
+        Posición en el vector de n(n-1)/2 elementos
+    """
+    lo, hi = np.minimum(i, j), np.maximum(i, j)
+    return lo * (2 * n - lo - 1) // 2 + hi - lo - 1
+
+
+class CondensedMatrix:
+    """
+    Matriz simétrica guardada como triángulo superior condensado
+    
+    Guarda n(n-1)/2 valores (float32 por defecto) en lugar de n^2 float64 y
+    se indexa como una matriz completa: m[i, j] con escalares, arrays
+    difundibles o np.ix_, y m[filas] / m[inicio:fin] devuelven filas
+    completas. La diagonal es cero.
+    """
+    
+    def __init__(self, data: np.ndarray, scale: float = 1.0):
+        """
+        Args:
+            data: Vector condensado de n(n-1)/2 elementos (puede ser np.memmap)
+            scale: Factor a unidades del solver (p. ej. 1/velocidad para horas)
+        """
+        n = int(round((1 + math.sqrt(1 + 8 * len(data))) / 2))
+        if n * (n - 1) // 2 != len(data):
+            raise ValueError(f"Longitud no válida para una matriz condensada: {len(data)}")
+        self.data = data
+        self.scale = scale
+        self.n_cities = n
+        self.shape = (n, n)
+        self.dtype = np.dtype(float)
+    
+    @classmethod
+    def from_square(cls, matrix: np.ndarray, dtype=np.float32) -> 'CondensedMatrix':
+        """
+        Condensar una matriz cuadrada simétrica (se usa el triángulo superior)
+        
+        Args:
+            matrix: Matriz (n, n)
+            dtype: Precisión del almacenamiento condensado
+            
+        Returns:
+            CondensedMatrix
+        """
+        matrix = np.asarray(matrix)
+        return cls(matrix[np.triu_indices(len(matrix), k=1)].astype(dtype))
+    
+    def __len__(self) -> int:
+        return self.n_cities
+    
+    def __getitem__(self, key):
+        n = self.n_cities
+        if not isinstance(key, tuple):
+            # Filas completas
+            if isinstance(key, slice):
+                key = np.arange(*key.indices(n))
+            rows = np.asarray(key)
+            return self[rows[..., None], np.arange(n)]
+        
+        i, j = key
+        if isinstance(i, slice) or isinstance(j, slice):
+            return self[i][..., j]
+        
+        if isinstance(i, (int, np.integer)) and isinstance(j, (int, np.integer)):
+            i, j = int(i), int(j)
+            if i == j:
+                return 0.0
+            return float(self.data[condensed_index(i, j, n)]) * self.scale
+        
+        i, j = np.broadcast_arrays(np.asarray(i, dtype=np.int64), np.asarray(j, dtype=np.int64))
+        diagonal = i == j
+        values = self.data[np.where(diagonal, 0, condensed_index(i, j, n))] * self.scale
+        values = np.where(diagonal, 0.0, values)
+        return values[()] if values.ndim == 0 else values
+    
+    def __array__(self, dtype=None, copy=None):
+        full = np.zeros(self.shape)
+        full[np.triu_indices(self.n_cities, k=1)] = self.data
+        full += full.T
+        return np.asarray(full * self.scale, dtype=dtype)
+    
+    def with_scale(self, scale: float) -> 'CondensedMatrix':
+        """Misma matriz (datos compartidos) con otra escala, p. ej. km -> horas"""
+        return CondensedMatrix(self.data, scale * self.scale)
+
+
+def compact_matrix(matrix, dtype=np.float32, block_size: int = 1024):
+    """
+    Representación compacta de una matriz: condensada si es simétrica y la
+    propia matriz completa si no lo es (p. ej. tiempos por carretera)
+    
+    Ambas se indexan igual, de modo que los evaluadores no distinguen entre
+    ellas. La simetría se comprueba por bloques de filas.
+    
+    Args:
+        matrix: Matriz (n, n), puede ser np.memmap
+        dtype: Precisión del almacenamiento condensado
+        block_size: Filas comparadas por bloque
+        
+    Returns:
+        CondensedMatrix o la matriz original
+    """
+    if isinstance(matrix, CondensedMatrix) or hasattr(matrix, 'travel_time_batch'):
+        return matrix
+    
+    n = len(matrix)
+    for start in range(0, n, block_size):
+        stop = min(start + block_size, n)
+        if not np.allclose(matrix[start:stop], np.asarray(matrix[:, start:stop]).T):
+            return matrix
+    return CondensedMatrix.from_square(matrix, dtype=dtype)
+
+
+def load_matrix(filename: str, kind: str = 'time', mmap_mode: str = 'r'):
+    """
+    Abrir una matriz .npy mapeada en memoria (sin copiarla a RAM)
+    
+    Args:
+        filename: Archivo .npy generado por DistanceCalculator.save_matrix_npy
+        kind: 'time' (horas) o 'distance' (km); define la escala de las
+            matrices uint16
+        mmap_mode: Modo de np.load (default: solo lectura)
+        
+    Returns:
+        np.memmap float32, ScaledMatrix si la matriz es entera o
+        CondensedMatrix si se guardó condensada (vector 1-D)
+    """
+    if kind not in UINT16_SCALES:
+        raise ValueError(f"Tipo de matriz desconocido: {kind}")
+    
+    data = np.load(filename, mmap_mode=mmap_mode)
+    if data.ndim == 1:
+        scale = UINT16_SCALES[kind] if np.issubdtype(data.dtype, np.integer) else 1.0
+        return CondensedMatrix(data, scale)
+    if np.issubdtype(data.dtype, np.integer):
+        return ScaledMatrix(data, UINT16_SCALES[kind])
+    return data
+
+
+class KNearestGraph:
+    """
+    Grafo disperso de k vecinos más cercanos en formato CSR
+    
+    Guarda solo los n*k arcos candidatos con su distancia exacta. Se indexa
+    como una matriz (graph[i, j], con escalares o arrays difundibles): los
+    arcos candidatos se buscan en el CSR y el resto se calcula al vuelo con
+    haversine, de modo que la memoria es O(n*k) en lugar de O(n^2).
+    """
+    
+    def __init__(self, indptr: np.ndarray, indices: np.ndarray, data: np.ndarray,
+                 lat: np.ndarray, lon: np.ndarray, scale: float = 1.0):
+        """
+        Args:
+            indptr: Inicio de cada fila en indices/data (longitud n + 1)
+            indices: Ciudad destino de cada arco (ordenados por distancia en cada fila)
+            data: Distancia en km de cada arco
+            lat, lon: Coordenadas en grados (para el cálculo al vuelo)
+            scale: Factor aplicado a las distancias (p. ej. 1/velocidad para horas)
+        """
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        self.lat = lat
+        self.lon = lon
+        self.scale = scale
+        self.n_cities = len(lat)
+        self.shape = (self.n_cities, self.n_cities)
+        self.dtype = np.dtype(float)
+        
+        # Claves fila*n + columna ordenadas para búsquedas vectorizadas
+        rows = np.repeat(np.arange(self.n_cities), np.diff(indptr))
+        keys = rows * self.n_cities + indices
+        self._key_order = np.argsort(keys, kind='stable')
+        self._keys = keys[self._key_order]
+        self._arcs = None
+    
+    def __len__(self) -> int:
+        return self.n_cities
+    
+    def __getitem__(self, key):
+        if not isinstance(key, tuple):
+            # Filas completas calculadas al vuelo
+            rows = np.asarray(key)
+            values = self[rows[..., None], np.arange(self.n_cities)]
+            return values
+        
+        if any(isinstance(k, slice) for k in key):
+            raise TypeError("KNearestGraph no admite cortes; use índices o arrays")
+        
+        i, j = key
+        if isinstance(i, (int, np.integer)) and isinstance(j, (int, np.integer)):
+            return self._lookup(int(i), int(j))
+        
+        i, j = np.broadcast_arrays(np.asarray(i), np.asarray(j))
+        
+        query = i.astype(np.int64) * self.n_cities + j
+        pos = np.minimum(np.searchsorted(self._keys, query), len(self._keys) - 1)
+        found = self._keys[pos] == query
+        values = np.where(found, self.data[self._key_order[pos]], 0.0)
+        
+        missing = ~found & (i != j)
+        if missing.any():
+            values[missing] = haversine_distances(self.lat[i[missing]], self.lon[i[missing]],
+                                                  self.lat[j[missing]], self.lon[j[missing]])
+        values = values * self.scale
+        return values[()] if values.ndim == 0 else values
+    
+    def _lookup(self, i: int, j: int) -> float:
+        """Consulta escalar rápida (bucles de evaluación de rutas)"""
+        if self._arcs is None:
+            keys = self._keys.tolist()
+            values = self.data[self._key_order].tolist()
+            self._arcs = dict(zip(keys, values))
+        
+        value = self._arcs.get(i * self.n_cities + j)
+        if value is None:
+            if i == j:
+                return 0.0
+            phi1, phi2 = math.radians(self.lat[i]), math.radians(self.lat[j])
+            h = (math.sin((phi2 - phi1) / 2) ** 2 + math.cos(phi1) * math.cos(phi2)
+                 * math.sin(math.radians(self.lon[j] - self.lon[i]) / 2) ** 2)
+            value = 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(h, 1.0)))
+        return value * self.scale
+    
+    def neighbors(self, city: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Vecinos candidatos de una ciudad
+        
+        Args:
+            city: Índice de la ciudad
+            
+        Returns:
+            Tupla (ciudades_vecinas, valores) ordenadas de más cercana a más lejana
+        """
+        start, stop = self.indptr[city], self.indptr[city + 1]
+        return self.indices[start:stop], self.data[start:stop] * self.scale
+    
+    def neighbor_lists(self, m: int) -> np.ndarray:
+        """
+        Listas de los m vecinos más cercanos de cada ciudad
+        
+        Args:
+            m: Número de vecinos (a lo sumo k)
+            
+        Returns:
+            Array (n_ciudades, m)
+        """
+        k = int(np.diff(self.indptr).min())
+        if m > k:
+            raise ValueError(f"El grafo solo tiene {k} vecinos por ciudad (se pidieron {m})")
+        return self.indices.reshape(self.n_cities, -1)[:, :m]
+    
+    def with_scale(self, scale: float) -> 'KNearestGraph':
+        """Mismo grafo (arrays compartidos) con otra escala, p. ej. 1/velocidad"""
+        graph = KNearestGraph.__new__(KNearestGraph)
+        graph.__dict__.update(self.__dict__)
+        graph.scale = scale
+        return graph
+
+
+def _unit_vectors(lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+    """Coordenadas en grados a vectores unitarios 3D"""
+    phi, lam = np.radians(lat), np.radians(lon)
+    return np.column_stack([np.cos(phi) * np.cos(lam), np.cos(phi) * np.sin(lam), np.sin(phi)])
+
+
+class SpatialGrid:
+    """
+    Índice espacial de rejilla para consultas de vecinos más cercanos
+    
+    Los puntos se llevan a vectores unitarios 3D, donde la distancia de
+    cuerda es monótona con la de gran círculo, y se agrupan en celdas
+    cúbicas de lado c. Para las consultas de una celda basta revisar las
+    celdas a distancia r (en celdas) mientras el k-ésimo vecino esté a menos
+    de r*c, ya que cualquier punto fuera de ese cubo está al menos a r*c.
+    """
+    
+    def __init__(self, lat: np.ndarray, lon: np.ndarray, points_per_cell: int = 8):
+        """
+        Construir el índice
+        
+        Args:
+            lat, lon: Coordenadas de los puntos indexados en grados
+            points_per_cell: Ocupación media deseada por celda
+        """
+        self.xyz = _unit_vectors(np.asarray(lat, dtype=float), np.asarray(lon, dtype=float))
+        n = len(self.xyz)
+        
+        # Lado de celda para ~points_per_cell puntos por celda sobre la superficie ocupada
+        extents = np.sort(np.ptp(self.xyz, axis=0))[1:]
+        area = max(extents[0] * extents[1], extents[1] ** 2 / n, 1e-12)
+        self.cell = np.sqrt(area * max(points_per_cell, 1) / n)
+        self.origin = self.xyz.min(axis=0)
+        
+        cells = self._cells(self.xyz)
+        self.dims = cells.max(axis=0) + 1
+        keys = self._keys(cells)
+        self.order = np.argsort(keys, kind='stable')
+        self.cell_keys, self.starts, self.counts = np.unique(keys[self.order], return_index=True,
+                                                             return_counts=True)
+        self.max_radius = int(np.ceil(2.0 / self.cell)) + 1
+        self._offsets = {}
+    
+    def _cells(self, xyz: np.ndarray) -> np.ndarray:
+        return np.floor((xyz - self.origin) / self.cell).astype(np.int64)
+    
+    def _keys(self, cells: np.ndarray) -> np.ndarray:
+        return (cells[:, 0] * self.dims[1] + cells[:, 1]) * self.dims[2] + cells[:, 2]
+    
+    def _candidates(self, base: np.ndarray, radius: int) -> np.ndarray:
+        """Puntos indexados en el cubo de celdas de radio `radius` alrededor de base"""
+        if radius not in self._offsets:
+            steps = np.arange(-radius, radius + 1)
+            self._offsets[radius] = np.stack(np.meshgrid(steps, steps, steps, indexing='ij'),
+                                             axis=-1).reshape(-1, 3)
+        near = base[None, :] + self._offsets[radius]
+        near = near[((near >= 0) & (near < self.dims)).all(axis=1)]
+        near_keys = self._keys(near)
+        
+        # Celdas vecinas no vacías
+        slots = np.searchsorted(self.cell_keys, near_keys)
+        valid = slots < len(self.cell_keys)
+        valid[valid] = self.cell_keys[slots[valid]] == near_keys[valid]
+        slots = slots[valid]
+        if len(slots) == 0:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([self.order[self.starts[s]:self.starts[s] + self.counts[s]]
+                               for s in slots])
+    
+    def query(self, lat: np.ndarray, lon: np.ndarray, k: int,
+              exclude_self: bool = False) -> np.ndarray:
+        """
+        k puntos indexados más cercanos (gran círculo) a cada consulta
+        
+        Args:
+            lat, lon: Coordenadas de las consultas en grados
+            k: Número de vecinos por consulta
+            exclude_self: Si las consultas son los propios puntos indexados
+                (mismo orden) y no deben devolverse a sí mismas
+            
+        Returns:
+            Array (n_consultas, k) con índices de puntos indexados (sin ordenar)
+        """
+        xyz = _unit_vectors(np.atleast_1d(np.asarray(lat, dtype=float)),
+                            np.atleast_1d(np.asarray(lon, dtype=float)))
+        k = min(k, len(self.xyz) - (1 if exclude_self else 0))
+        query_cells = self._cells(xyz)
+        _, groups = np.unique(query_cells, axis=0, return_inverse=True)
+        groups = groups.ravel()
+        order = np.argsort(groups, kind='stable')
+        bounds = np.flatnonzero(np.diff(groups[order])) + 1
+        
+        result = np.empty((len(xyz), k), dtype=np.int64)
+        for members in np.split(order, bounds):
+            base = query_cells[members[0]]
+            
+            for radius in range(1, self.max_radius + 1):
+                candidates = self._candidates(base, radius)
+                available = len(candidates) - (1 if exclude_self else 0)
+                if available < k and radius < self.max_radius:
+                    continue
+                
+                chord = np.linalg.norm(xyz[members][:, None, :] - self.xyz[candidates][None, :, :],
+                                       axis=-1)
+                if exclude_self:
+                    chord[members[:, None] == candidates[None, :]] = np.inf
+                nearest = np.argpartition(chord, k - 1, axis=1)[:, :k]
+                kth = np.take_along_axis(chord, nearest, axis=1).max(axis=1)
+                
+                if (kth <= radius * self.cell).all() or radius == self.max_radius:
+                    result[members] = candidates[nearest]
+                    break
+        
+        return result
+
+
+def grid_nearest_neighbors(lat: np.ndarray, lon: np.ndarray, k: int) -> np.ndarray:
+    """
+    k vecinos más cercanos (gran círculo) de cada punto con SpatialGrid
+    
+    Args:
+        lat, lon: Coordenadas en grados
+        k: Número de vecinos por punto
+        
+    Returns:
+        Array (n, k) con los índices de los vecinos (sin ordenar)
+    """
+    return SpatialGrid(lat, lon, points_per_cell=k).query(lat, lon, k, exclude_self=True)
 
 
 class DistanceCalculator:
@@ -21,6 +558,7 @@ class DistanceCalculator:
         """
         self.coordinates = coordinates_df
         self.distance_matrix = None
+        self.method = 'ellipsoidal'
         
     def calculate_distance(self, city1: Tuple[float, float], 
                           city2: Tuple[float, float]) -> float:
@@ -34,32 +572,144 @@ class DistanceCalculator:
         Returns:
             Distancia en kilómetros
         """
+        from geopy.distance import geodesic
+        
         return geodesic(city1, city2).kilometers
     
-    def build_distance_matrix(self) -> np.ndarray:
+    def build_distance_matrix(self, method: str = 'ellipsoidal',
+                              block_size: int = 1024) -> np.ndarray:
         """
         Construir matriz de distancias entre todas las ciudades
         
+        Se calcula por bloques de filas con difusión NumPy, de modo que la
+        memoria temporal es O(block_size * n) en lugar de O(n^2). Cada bloque
+        solo calcula las columnas desde su diagonal y se refleja (la
+        distancia es simétrica).
+        
+        Args:
+            method: 'ellipsoidal' (WGS-84, equivalente a geopy) o
+                'haversine' (esfera, más rápido)
+            block_size: Filas calculadas por bloque
+            
         Returns:
             Matriz numpy con distancias
         """
-        n_cities = len(self.coordinates)
-        matrix = np.zeros((n_cities, n_cities))
+        if method not in DISTANCE_METHODS:
+            raise ValueError(f"Método de distancia desconocido: {method}")
+        distance_func = DISTANCE_METHODS[method]
+        
+        lat = self.coordinates['lat'].to_numpy(dtype=float)
+        lon = self.coordinates['lon'].to_numpy(dtype=float)
+        n_cities = len(lat)
+        matrix = np.empty((n_cities, n_cities))
+        
+        for start in range(0, n_cities, block_size):
+            stop = min(start + block_size, n_cities)
+            block = distance_func(lat[start:stop, None], lon[start:stop, None],
+                                  lat[None, start:], lon[None, start:])
+            matrix[start:stop, start:] = block
+            matrix[start:, start:stop] = block.T
+        np.fill_diagonal(matrix, 0.0)
         
-        for i in range(n_cities):
-            for j in range(i + 1, n_cities):
-                city1 = (self.coordinates.iloc[i]['lat'], 
-                        self.coordinates.iloc[i]['lon'])
-                city2 = (self.coordinates.iloc[j]['lat'], 
-                        self.coordinates.iloc[j]['lon'])
-                
-                distance = self.calculate_distance(city1, city2)
-                matrix[i, j] = distance
-                matrix[j, i] = distance
-                
         self.distance_matrix = matrix
+        self.method = method
         return matrix
     
+    def build_condensed_matrix(self, method: str = 'ellipsoidal', block_size: int = 1024,
+                               dtype=np.float32) -> CondensedMatrix:
+        """
+        Construir la matriz de distancias directamente en forma condensada
+        
+        Cada bloque de filas calcula solo las columnas a la derecha de su
+        diagonal, que son contiguas en el vector condensado; nunca se
+        materializa la matriz completa. Para tiempos basta with_scale(1/v).
+        
+        Args:
+            method: 'ellipsoidal' o 'haversine'
+            block_size: Filas calculadas por bloque
+            dtype: Precisión del almacenamiento
+            
+        Returns:
+            CondensedMatrix con distancias en km
+        """
+        if method not in DISTANCE_METHODS:
+            raise ValueError(f"Método de distancia desconocido: {method}")
+        distance_func = DISTANCE_METHODS[method]
+        
+        lat = self.coordinates['lat'].to_numpy(dtype=float)
+        lon = self.coordinates['lon'].to_numpy(dtype=float)
+        n_cities = len(lat)
+        data = np.empty(n_cities * (n_cities - 1) // 2, dtype=dtype)
+        
+        for start, stop, values in self._upper_triangle_blocks(distance_func, lat, lon, block_size):
+            data[start:stop] = values
+        
+        return CondensedMatrix(data)
+    
+    @staticmethod
+    def _upper_triangle_blocks(distance_func, lat: np.ndarray, lon: np.ndarray,
+                               block_size: int):
+        """
+        Recorrer el triángulo superior por bloques de filas
+        
+        Yields:
+            Tuplas (inicio, fin, valores) con el tramo del vector condensado
+        """
+        n_cities = len(lat)
+        for first in range(0, n_cities - 1, block_size):
+            last = min(first + block_size, n_cities - 1)
+            block = distance_func(lat[first:last, None], lon[first:last, None],
+                                  lat[None, first:], lon[None, first:])
+            upper = np.arange(block.shape[1])[None, :] > np.arange(last - first)[:, None]
+            start = condensed_index(first, first + 1, n_cities)
+            values = block[upper]
+            yield start, start + len(values), values
+    
+    def build_knn_graph(self, k: int = 10, method: str = 'ellipsoidal',
+                        avg_speed_kmh: Optional[float] = None,
+                        oversample: int = 3) -> KNearestGraph:
+        """
+        Construir el grafo disperso de k vecinos más cercanos
+        
+        Los candidatos se obtienen con el índice espacial de rejilla (en la
+        esfera) y solo para esos arcos se calcula la distancia exacta; se
+        piden `oversample` candidatos de más para que los casi empates entre
+        esfera y elipsoide no cambien los k vecinos. Las consultas de arcos
+        no candidatos se resuelven al vuelo con haversine.
+        
+        Args:
+            k: Vecinos por ciudad
+            method: Método de distancia para los arcos candidatos
+            avg_speed_kmh: Si se indica, el grafo devuelve tiempos en horas
+            oversample: Candidatos extra evaluados por ciudad
+            
+        Returns:
+            KNearestGraph con n*k arcos
+        """
+        if method not in DISTANCE_METHODS:
+            raise ValueError(f"Método de distancia desconocido: {method}")
+        
+        lat = self.coordinates['lat'].to_numpy(dtype=float)
+        lon = self.coordinates['lon'].to_numpy(dtype=float)
+        n_cities = len(lat)
+        candidates = grid_nearest_neighbors(lat, lon, k + oversample)
+        k = min(k, candidates.shape[1])
+        
+        rows = np.repeat(np.arange(n_cities), candidates.shape[1])
+        cols = candidates.ravel()
+        data = DISTANCE_METHODS[method](lat[rows], lon[rows], lat[cols], lon[cols])
+        data = data.reshape(candidates.shape)
+        
+        # Cada fila ordenada de más cercano a más lejano
+        order = np.argsort(data, axis=1, kind='stable')[:, :k]
+        indices = np.take_along_axis(candidates, order, axis=1).ravel()
+        data = np.take_along_axis(data, order, axis=1).ravel()
+        indptr = np.arange(0, n_cities * k + 1, k)
+        
+        scale = 1.0 / avg_speed_kmh if avg_speed_kmh else 1.0
+        print(f"✓ Grafo k-NN generado ({n_cities} ciudades, k={k}, {len(indices)} arcos)")
+        return KNearestGraph(indptr, indices, data, lat, lon, scale=scale)
+    
     def estimate_travel_time(self, distance_km: float, 
                            avg_speed_kmh: float = 60) -> float:
         """
@@ -94,6 +744,166 @@ class DistanceCalculator:
         print(f"✓ Matriz de tiempos generada (velocidad: {avg_speed_kmh} km/h)")
         return time_matrix
     
+    def add_points(self, points_df: pd.DataFrame,
+                   cache_dir: Optional[str] = None,
+                   avg_speed_kmh: float = 60) -> np.ndarray:
+        """
+        Agregar paradas calculando solo sus filas y columnas
+        
+        Con k paradas nuevas se evalúan k*(n+k) distancias (vectorizadas con
+        el mismo método que la matriz existente) en lugar de las n^2 de una
+        reconstrucción; la matriz previa solo se copia.
+        
+        Args:
+            points_df: DataFrame con las columnas de las coordenadas ('lat', 'lon', ...)
+            cache_dir: Si se indica, se escriben en la caché las matrices de
+                distancias y tiempos del nuevo conjunto (ver load_cached_matrix)
+            avg_speed_kmh: Velocidad de la matriz de tiempos en caché
+            
+        Returns:
+            Índices asignados a las nuevas paradas
+        """
+        old = self._current_distance_matrix(cache_dir)
+        n, k = len(old), len(points_df)
+        self.coordinates = pd.concat([self.coordinates, points_df], ignore_index=True)
+        
+        lat = self.coordinates['lat'].to_numpy(dtype=float)
+        lon = self.coordinates['lon'].to_numpy(dtype=float)
+        rows = DISTANCE_METHODS[self.method](lat[n:, None], lon[n:, None], lat[None, :], lon[None, :])
+        rows[np.arange(k), np.arange(n, n + k)] = 0.0
+        
+        matrix = np.empty((n + k, n + k))
+        matrix[:n, :n] = old
+        matrix[n:, :] = rows
+        matrix[:n, n:] = rows[:, :n].T
+        self.distance_matrix = matrix
+        
+        if cache_dir is not None:
+            self._store_cached_matrices(cache_dir, avg_speed_kmh)
+        print(f"✓ {k} paradas agregadas ({n + k} en total)")
+        return np.arange(n, n + k)
+    
+    def remove_points(self, indices, cache_dir: Optional[str] = None,
+                      avg_speed_kmh: float = 60) -> np.ndarray:
+        """
+        Quitar paradas y compactar los índices
+        
+        Args:
+            indices: Índices de las paradas a quitar
+            cache_dir: Si se indica, se escriben en la caché las matrices del
+                nuevo conjunto
+            avg_speed_kmh: Velocidad de la matriz de tiempos en caché
+            
+        Returns:
+            Tabla de reasignación: remap[índice_anterior] = índice_nuevo (-1 si se quitó)
+        """
+        old = self._current_distance_matrix(cache_dir)
+        keep = np.ones(len(old), dtype=bool)
+        keep[np.asarray(indices, dtype=np.int64)] = False
+        
+        remap = np.full(len(old), -1, dtype=np.int64)
+        remap[keep] = np.arange(int(keep.sum()))
+        
+        self.coordinates = self.coordinates[keep].reset_index(drop=True)
+        self.distance_matrix = np.asarray(old)[np.ix_(keep, keep)]
+        
+        if cache_dir is not None:
+            self._store_cached_matrices(cache_dir, avg_speed_kmh)
+        print(f"✓ {int((~keep).sum())} paradas quitadas ({int(keep.sum())} restantes)")
+        return remap
+    
+    def _current_distance_matrix(self, cache_dir: Optional[str]) -> np.ndarray:
+        """Matriz de distancias actual: en memoria, en caché o recién construida"""
+        if self.distance_matrix is None:
+            if cache_dir is not None:
+                self.distance_matrix = np.array(load_cached_matrix(
+                    self.coordinates, kind='distance', cache_dir=cache_dir, method=self.method))
+            else:
+                self.build_distance_matrix(method=self.method)
+        return self.distance_matrix
+    
+    def _store_cached_matrices(self, cache_dir: str, avg_speed_kmh: float) -> None:
+        """Escribir distancias y tiempos del conjunto actual con sus claves de caché"""
+        store_cached_matrix(self.coordinates, self.distance_matrix, kind='distance',
+                            cache_dir=cache_dir, method=self.method)
+        store_cached_matrix(self.coordinates, self.distance_matrix / avg_speed_kmh, kind='time',
+                            avg_speed_kmh=avg_speed_kmh, cache_dir=cache_dir, method=self.method)
+    
+    def save_matrix_npy(self, filename: str, kind: str = 'time',
+                        avg_speed_kmh: float = 60, dtype: str = 'float32',
+                        method: str = 'ellipsoidal', block_size: int = 1024,
+                        condensed: bool = False, verbose: bool = True):
+        """
+        Construir y escribir una matriz directamente a un .npy mapeado en memoria
+        
+        Los bloques de filas del constructor vectorizado se escriben en el
+        archivo según se calculan, sin materializar la matriz en RAM (útil
+        para instancias más grandes que la memoria). El archivo resultante
+        puede abrirse desde varios procesos con load_matrix.
+        
+        Args:
+            filename: Ruta del archivo .npy de salida
+            kind: 'time' (horas) o 'distance' (km)
+            avg_speed_kmh: Velocidad promedio para matrices de tiempo
+            dtype: 'float64', 'float32' o 'uint16' (minutos / km redondeados)
+            method: Método de distancia ('ellipsoidal' o 'haversine')
+            block_size: Filas calculadas y escritas por bloque
+            condensed: Si guardar solo el triángulo superior (n(n-1)/2 valores)
+            verbose: Si informar la ruta del archivo escrito
+            
+        Returns:
+            Matriz abierta en solo lectura (ver load_matrix)
+        """
+        if kind not in UINT16_SCALES:
+            raise ValueError(f"Tipo de matriz desconocido: {kind}")
+        if dtype not in MATRIX_DTYPES:
+            raise ValueError(f"Precisión no soportada: {dtype} (opciones: {list(MATRIX_DTYPES)})")
+        if method not in DISTANCE_METHODS:
+            raise ValueError(f"Método de distancia desconocido: {method}")
+        distance_func = DISTANCE_METHODS[method]
+        
+        lat = self.coordinates['lat'].to_numpy(dtype=float)
+        lon = self.coordinates['lon'].to_numpy(dtype=float)
+        n_cities = len(lat)
+        shape = (n_cities * (n_cities - 1) // 2,) if condensed else (n_cities, n_cities)
+        output = np.lib.format.open_memmap(filename, mode='w+', dtype=MATRIX_DTYPES[dtype],
+                                           shape=shape)
+        
+        if condensed:
+            blocks = self._upper_triangle_blocks(distance_func, lat, lon, block_size)
+        else:
+            blocks = self._full_row_blocks(distance_func, lat, lon, block_size)
+        
+        # Bloques contiguos: escrituras secuenciales en el archivo
+        for start, stop, block in blocks:
+            if kind == 'time':
+                block /= avg_speed_kmh
+            if dtype == 'uint16':
+                block = np.clip(np.rint(block / UINT16_SCALES[kind]), 0, np.iinfo(np.uint16).max)
+            output[start:stop] = block
+        
+        output.flush()
+        del output
+        if verbose:
+            print(f"✓ Matriz ({kind}, {dtype}) guardada en: {filename}")
+        return load_matrix(filename, kind=kind)
+    
+    @staticmethod
+    def _full_row_blocks(distance_func, lat: np.ndarray, lon: np.ndarray, block_size: int):
+        """
+        Recorrer la matriz completa por bloques de filas
+        
+        Yields:
+            Tuplas (fila_inicio, fila_fin, filas)
+        """
+        n_cities = len(lat)
+        for start in range(0, n_cities, block_size):
+            stop = min(start + block_size, n_cities)
+            block = distance_func(lat[start:stop, None], lon[start:stop, None],
+                                  lat[None, :], lon[None, :])
+            block[np.arange(stop - start), np.arange(start, stop)] = 0.0
+            yield start, stop, block
+    
     def save_distance_matrix(self, filename: str = "data/processed/matriz_distancias.csv"):
         """
         Guardar matriz de distancias en archivo CSV
@@ -122,3 +932,102 @@ class DistanceCalculator:
                          index=self.coordinates['CIUDAD'])
         df.to_csv(filename)
         print(f"✓ Matriz de tiempos guardada en: {filename}")
+
+
+def matrix_cache_key(coordinates_df: pd.DataFrame, kind: str = 'time',
+                     avg_speed_kmh: float = 60, method: str = 'ellipsoidal',
+                     dtype: str = 'float64') -> str:
+    """
+    Clave de contenido de una matriz: hash de las coordenadas y de los
+    parámetros que la definen
+    
+    Args:
+        coordinates_df: DataFrame con columnas 'lat' y 'lon'
+        kind: 'time' o 'distance'
+        avg_speed_kmh: Velocidad promedio (solo afecta a matrices de tiempo)
+        method: Método de distancia
+        dtype: Precisión de almacenamiento
+    
+    Returns:
+        Clave hexadecimal de 16 caracteres
+    """
+    digest = hashlib.sha256()
+    coords = coordinates_df[['lat', 'lon']].to_numpy(dtype=np.float64)
+    digest.update(np.ascontiguousarray(coords).tobytes())
+    speed = repr(float(avg_speed_kmh)) if kind == 'time' else ''
+    digest.update(f"{kind}|{speed}|{method}|{dtype}".encode())
+    return digest.hexdigest()[:16]
+
+
+def load_cached_matrix(coordinates_df: pd.DataFrame, kind: str = 'time',
+                       avg_speed_kmh: float = 60,
+                       cache_dir: str = "data/processed",
+                       method: str = 'ellipsoidal', dtype: str = 'float64'):
+    """
+    Cargar una matriz desde la caché binaria (memoria mapeada) o construirla
+    
+    El archivo se nombra con matrix_cache_key, por lo que solo se reconstruye
+    cuando cambian las coordenadas o los parámetros. La escritura se hace en
+    un archivo temporal que luego se renombra, de modo que procesos
+    concurrentes nunca leen un .npy a medio escribir.
+    
+    Args:
+        coordinates_df: DataFrame con coordenadas de ciudades
+        kind: 'time' (horas) o 'distance' (km)
+        avg_speed_kmh: Velocidad promedio para matrices de tiempo
+        cache_dir: Directorio de la caché (junto a los CSV procesados)
+        method: Método de distancia
+        dtype: Precisión de almacenamiento
+    
+    Returns:
+        Matriz abierta en solo lectura (ver load_matrix)
+    """
+    filename = _cache_filename(coordinates_df, kind, avg_speed_kmh, cache_dir, method, dtype)
+    
+    if not filename.exists():
+        filename.parent.mkdir(parents=True, exist_ok=True)
+        temporary = filename.with_name(f"{filename.stem}.{os.getpid()}.tmp.npy")
+        calculator = DistanceCalculator(coordinates_df)
+        calculator.save_matrix_npy(str(temporary), kind=kind, avg_speed_kmh=avg_speed_kmh,
+                                   dtype=dtype, method=method, verbose=False)
+        os.replace(temporary, filename)
+        print(f"✓ Matriz ({kind}, {dtype}) guardada en: {filename}")
+    
+    return load_matrix(str(filename), kind=kind)
+
+
+def store_cached_matrix(coordinates_df: pd.DataFrame, matrix: np.ndarray, kind: str = 'time',
+                        avg_speed_kmh: float = 60, cache_dir: str = "data/processed",
+                        method: str = 'ellipsoidal') -> Path:
+    """
+    Escribir una matriz float64 ya calculada en la caché con su clave
+    
+    Lo usan las actualizaciones incrementales de DistanceCalculator para que
+    load_cached_matrix encuentre la matriz del nuevo conjunto de paradas sin
+    recalcularla. La escritura es atómica (archivo temporal + renombrado).
+    
+    Args:
+        coordinates_df: Coordenadas a las que corresponde la matriz
+        matrix: Matriz (n, n)
+        kind: 'time' o 'distance'
+        avg_speed_kmh: Velocidad (solo forma parte de la clave de tiempos)
+        cache_dir: Directorio de la caché
+        method: Método de distancia con que se calculó
+        
+    Returns:
+        Ruta del archivo en caché
+    """
+    filename = _cache_filename(coordinates_df, kind, avg_speed_kmh, cache_dir, method, 'float64')
+    filename.parent.mkdir(parents=True, exist_ok=True)
+    temporary = filename.with_name(f"{filename.stem}.{os.getpid()}.tmp.npy")
+    np.save(temporary, np.asarray(matrix, dtype=np.float64))
+    os.replace(temporary, filename)
+    return filename
+
+
+def _cache_filename(coordinates_df: pd.DataFrame, kind: str, avg_speed_kmh: float,
+                    cache_dir: str, method: str, dtype: str) -> Path:
+    """Ruta en caché de una matriz según su clave de contenido"""
+    key = matrix_cache_key(coordinates_df, kind, avg_speed_kmh, method, dtype)
+    prefix = 'matriz_tiempos' if kind == 'time' else 'matriz_distancias'
+    return Path(cache_dir) / f"{prefix}_{key}.npy"
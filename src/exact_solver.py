@@ -0,0 +1,161 @@
+"""
+Exact Solver Module
+Programación dinámica exacta (Held-Karp con máscaras de bits) para
+instancias pequeñas del TSP-TW
+"""
+
+import numpy as np
+from typing import List, Optional, Tuple
+from .time_windows import RouteTimeCalculator
+
+
+class ExactSolver:
+    """Solver exacto por programación dinámica sobre (conjunto visitado, última ciudad)"""
+    
+    def __init__(self,
+                 time_matrix: np.ndarray,
+                 start_city_index: int = 0,
+                 start_time: float = 9.0,
+                 max_cities: int = 20):
+        """
+        Inicializar solver exacto
+        
+        Args:
+            time_matrix: Matriz de tiempos de viaje entre ciudades (en horas)
+                o TimeDependentTravelTimes
+            start_city_index: Índice de la ciudad de inicio (CDMX)
+            start_time: Hora de inicio del viaje (default: 9:00 AM)
+            max_cities: Máximo de ciudades a visitar (sin contar el inicio);
+                la memoria crece como 2^n * n
+        """
+        self.time_matrix = time_matrix
+        self.start_city_index = start_city_index
+        self.start_time = start_time
+        self.max_cities = max_cities
+        self.route_calculator = RouteTimeCalculator(time_matrix, start_time)
+    
+    def _closed_on_arrival(self, current_time: np.ndarray,
+                           travel_time: np.ndarray) -> np.ndarray:
+        """Detectar llegadas después del cierre (antes de esperar al día siguiente)"""
+        window = self.route_calculator.time_window
+        with np.errstate(invalid='ignore'):
+            return (current_time + travel_time) % 24 > window.closing_hour
+    
+    def solve(self, cities: Optional[List[int]] = None,
+              upper_bound: float = np.inf,
+              hard_windows: bool = False,
+              verbose: bool = False) -> Tuple[np.ndarray, float]:
+        """
+        Resolver exactamente el TSP-TW (ruta abierta desde la ciudad de inicio)
+        
+        Se guarda, para cada (conjunto visitado, última ciudad), la etiqueta
+        con la hora más temprana: con espera activada el horario es FIFO
+        (llegar antes nunca retrasa las llegadas siguientes), por lo que esa
+        etiqueta domina a las demás. Los estados se procesan por capas de
+        cardinalidad en arrays NumPy.
+        
+        Args:
+            cities: Ciudades a visitar (default: todas excepto el inicio)
+            upper_bound: Cota superior conocida (p. ej. resultado del AG);
+                se podan estados cuyo costo parcial ya la supera
+            hard_windows: Si True, se podan llegadas después del cierre
+                en lugar de esperar al día siguiente
+            verbose: Si mostrar progreso por capa
+        
+        Returns:
+            Tupla con (ruta_optima, fitness_optimo); fitness infinito si no
+            existe ruta factible bajo las podas
+        """
+        if cities is None:
+            cities = [c for c in range(len(self.time_matrix)) if c != self.start_city_index]
+        cities = np.array([c for c in cities if c != self.start_city_index], dtype=int)
+        m = len(cities)
+        
+        if m > self.max_cities:
+            raise ValueError(f"Instancia demasiado grande para el solver exacto: "
+                             f"{m} ciudades (máximo {self.max_cities})")
+        if m == 0:
+            return np.array([self.start_city_index]), 0.0
+        
+        calculator = self.route_calculator
+        
+        # Índice de cada máscara dentro de su capa de cardinalidad
+        masks = np.arange(1 << m, dtype=np.int64)
+        popcount = np.zeros(1 << m, dtype=np.int8)
+        for bit in range(m):
+            popcount += ((masks >> bit) & 1).astype(np.int8)
+        layers = [masks[popcount == k] for k in range(m + 1)]
+        rank = np.empty(1 << m, dtype=np.int64)
+        for layer in layers:
+            rank[layer] = np.arange(len(layer))
+        
+        # Capa 1: inicio -> ciudad j
+        times = np.full((m, m), np.inf)
+        penalties = np.zeros((m, m))
+        departure = np.full(m, self.start_time)
+        from_start = calculator.travel_time_batch(departure, self.start_city_index, cities)
+        first_time, first_penalty = calculator.arrive_batch(departure + from_start)
+        if hard_windows:
+            first_time[self._closed_on_arrival(departure, from_start)] = np.inf
+        diag = np.arange(m)
+        times[rank[1 << diag], diag] = first_time
+        penalties[rank[1 << diag], diag] = first_penalty
+        parents = [np.full((m, m), -1, dtype=np.int8)]
+        
+        for k in range(1, m):
+            layer = layers[k]
+            next_layer = layers[k + 1]
+            next_times = np.full((len(next_layer), m), np.inf)
+            next_penalties = np.zeros((len(next_layer), m))
+            next_parents = np.full((len(next_layer), m), -1, dtype=np.int8)
+            
+            for j in range(m):
+                valid = ((layer >> j) & 1) == 0
+                if not valid.any():
+                    continue
+                t = times[valid]
+                # Las salidas de estados imposibles (inf) se consultan a hora 0
+                travel = calculator.travel_time_batch(np.where(np.isfinite(t), t, 0.0),
+                                                      cities[None, :], cities[j])
+                candidate_times, leg_penalties = calculator.arrive_batch(t + travel)
+                candidate_penalties = penalties[valid] + leg_penalties
+                if hard_windows:
+                    candidate_times[self._closed_on_arrival(t, travel)] = np.inf
+                
+                best_last = np.argmin(candidate_times, axis=1)
+                rows = np.arange(len(best_last))
+                best_times = candidate_times[rows, best_last]
+                best_penalties = candidate_penalties[rows, best_last]
+                
+                cost = best_times - self.start_time + best_penalties
+                best_times[cost > upper_bound + 1e-9] = np.inf
+                
+                target = rank[layer[valid] | (1 << j)]
+                next_times[target, j] = best_times
+                next_penalties[target, j] = best_penalties
+                next_parents[target, j] = best_last
+            
+            parents.append(next_parents)
+            times, penalties = next_times, next_penalties
+            
+            if verbose:
+                alive = np.isfinite(times).sum()
+                print(f"   Capa {k + 1}/{m}: {alive} estados factibles")
+        
+        total = times[0] - self.start_time + penalties[0]
+        last = int(np.argmin(total))
+        best_fitness = float(total[last])
+        if not np.isfinite(best_fitness):
+            return None, float('inf')
+        
+        # Reconstruir ruta desde la última ciudad
+        order = []
+        mask = (1 << m) - 1
+        for k in range(m - 1, -1, -1):
+            order.append(last)
+            previous = int(parents[k][rank[mask], last])
+            mask ^= 1 << last
+            last = previous
+        
+        route = np.concatenate([[self.start_city_index], cities[order[::-1]]])
+        return route, best_fitness
@@ -6,7 +6,7 @@ Optimiza TIEMPO en lugar de distancia, con penalizaciones por violación de vent
 
 import numpy as np
 from typing import List, Optional
-from time_windows import RouteTimeCalculator, TimeWindow
+from .time_windows import RouteTimeCalculator, TimeWindow
 
 
 class FitnessFunction:
@@ -21,7 +21,8 @@ class FitnessFunction:
         Inicializar función de aptitud para TSP-TW
         
         Args:
-            time_matrix: Matriz de tiempos de viaje entre ciudades (en horas)
+            time_matrix: Matriz de tiempos de viaje entre ciudades (en horas);
+                acepta un np.memmap o ScaledMatrix de load_matrix sin copiarlo
             start_city_index: Índice de la ciudad de inicio (CDMX)
             start_time: Hora de inicio del viaje (default: 9:00 AM)
             penalty_weight: Peso de la penalización por violar ventanas
@@ -36,17 +37,25 @@ class FitnessFunction:
         """
         Calcular tiempo total de una ruta (solo tiempo de viaje, sin penalizaciones)
         
+        Cada tramo se consulta con la hora de salida del horario (viaje más
+        esperas), de modo que también vale para tiempos dependientes de la hora.
+        
         Args:
             route: Array con el orden de ciudades a visitar
             
         Returns:
             Tiempo total de viaje en horas
         """
+        window = self.route_calculator.time_window
+        current_time = self.start_time
         total_time = 0
         for i in range(len(route)):
             from_city = route[i]
             to_city = route[(i + 1) % len(route)]  # Volver al inicio
-            total_time += self.time_matrix[from_city, to_city]
+            travel_time = self.route_calculator.travel_time(current_time, from_city, to_city)
+            total_time += travel_time
+            current_time += travel_time
+            current_time += window.calculate_waiting_time(current_time)
         return total_time
     
     def calculate_fitness(self, route: np.ndarray, 
@@ -5,8 +5,8 @@ Implementación del Algoritmo Genético para TSP-TW
 
 import numpy as np
 from typing import List, Tuple
-from fitness_function import FitnessFunction
-from operators import GeneticOperators
+from .fitness_function import FitnessFunction
+from .operators import GeneticOperators
 
 
 class GeneticAlgorithm:
@@ -21,7 +21,8 @@ class GeneticAlgorithm:
                  crossover_rate: float = 0.8,
                  elitism_rate: float = 0.1,
                  start_time: float = 9.0,
-                 penalty_weight: float = 100.0):
+                 penalty_weight: float = 100.0,
+                 track_stats: bool = False):
         """
         Inicializar Algoritmo Genético para TSP-TW
         
@@ -35,6 +36,8 @@ class GeneticAlgorithm:
             elitism_rate: Porcentaje de élite a preservar
             start_time: Hora de inicio del viaje (default: 9:00 AM)
             penalty_weight: Peso de penalización por violación de ventanas
+            track_stats: Si registrar media, peor y diversidad por generación
+                (ver ConvergenceHistory); tiene costo en cada generación
         """
         self.time_matrix = time_matrix
         self.n_cities = len(time_matrix)
@@ -64,6 +67,9 @@ class GeneticAlgorithm:
         self.best_solution = None
         self.best_fitness = float('inf')
         self.fitness_history = []
+        # Estadísticas por generación (ver ConvergenceHistory), opcionales
+        self.generation_stats = ({'mean': [], 'worst': [], 'diversity': []}
+                                 if track_stats else None)
         
     def initialize_population(self) -> np.ndarray:
         """
@@ -142,6 +148,11 @@ class GeneticAlgorithm:
                 self.best_solution = self.population[best_idx].copy()
             
             self.fitness_history.append(self.best_fitness)
+            if self.generation_stats is not None:
+                self.generation_stats['mean'].append(fitness_scores.mean())
+                self.generation_stats['worst'].append(fitness_scores.max())
+                self.generation_stats['diversity'].append(
+                    len(np.unique(self.population, axis=0)) / len(self.population))
             
             # Crear nueva población
             new_population = []
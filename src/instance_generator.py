@@ -0,0 +1,254 @@
+"""
+Instance Generator Module
+Instancias sintéticas escaladas (100 a 100k paradas) muestreadas dentro de
+los polígonos de México_Estados.shp, para medir cómo escala el proyecto
+"""
+
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+from .data_loader import iter_polygon_features
+from .distance_calculator import EARTH_RADIUS_KM, DistanceCalculator
+
+START_CITY = 'Ciudad de México'
+KM_PER_DEGREE = np.pi * EARTH_RADIUS_KM / 180
+
+
+def points_in_rings(lon: np.ndarray, lat: np.ndarray, rings: List[np.ndarray]) -> np.ndarray:
+    """
+    Prueba punto en polígono vectorizada (regla par-impar sobre todos los
+    anillos, de modo que los huecos quedan fuera)
+    
+    Args:
+        lon, lat: Coordenadas de los puntos
+        rings: Anillos (m, 2) con columnas (lon, lat)
+    
+    Returns:
+        Array booleano, True para los puntos dentro
+    """
+    inside = np.zeros(len(lon), dtype=bool)
+    for ring in rings:
+        x1, y1 = ring[:-1, 0], ring[:-1, 1]
+        x2, y2 = ring[1:, 0], ring[1:, 1]
+        crosses = (y1[None, :] > lat[:, None]) != (y2[None, :] > lat[:, None])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x_cross = x1 + (lat[:, None] - y1) * (x2 - x1) / (y2 - y1)
+        inside ^= (np.count_nonzero(crosses & (lon[:, None] < x_cross), axis=1) % 2).astype(bool)
+    return inside
+
+
+def rings_area_km2(rings: List[np.ndarray]) -> float:
+    """Área aproximada (proyección equivalente local) de un conjunto de anillos"""
+    lat0 = np.radians(np.mean(np.concatenate(rings)[:, 1]))
+    signed = 0.0
+    for ring in rings:
+        x = ring[:, 0] * KM_PER_DEGREE * np.cos(lat0)
+        y = ring[:, 1] * KM_PER_DEGREE
+        signed += 0.5 * np.sum(x[:-1] * y[1:] - x[1:] * y[:-1])
+    return abs(signed)
+
+
+class InstanceGenerator:
+    """Generador de instancias TSP-TW sintéticas sobre los estados de México"""
+    
+    STATE_WEIGHTS = ['area', 'uniform']
+    
+    def __init__(self, data_dir: str = "data", states_file: str = "México_Estados.shp",
+                 capitals_file: str = "coordenadas_capitales.csv"):
+        """
+        Cargar polígonos estatales y capitales
+        
+        Args:
+            data_dir: Directorio de datos (con raw/ y processed/)
+            states_file: Capa de polígonos estatales en raw/
+            capitals_file: Coordenadas de capitales en processed/ (centros de
+                los cúmulos y ciudad de inicio)
+        """
+        self.data_dir = Path(data_dir)
+        self.states = {}
+        for rings, (name,) in iter_polygon_features(self.data_dir / "raw" / states_file):
+            self.states[name] = rings
+        self.areas = {name: rings_area_km2(rings) for name, rings in self.states.items()}
+        
+        capitals = pd.read_csv(self.data_dir / "processed" / capitals_file)
+        self.capitals = {row.ESTADO: (row.lat, row.lon) for row in capitals.itertuples()}
+        self.start = capitals[capitals['CIUDAD'] == START_CITY].iloc[0]
+    
+    def state_counts(self, n_points: int, weights: Union[str, Dict[str, float]],
+                     rng: np.random.Generator) -> Dict[str, int]:
+        """
+        Repartir los puntos entre estados
+        
+        Args:
+            n_points: Número de puntos
+            weights: 'area' (densidad uniforme en el país), 'uniform' (igual
+                por estado) o {estado: peso} (p. ej. población)
+            rng: Generador aleatorio
+        
+        Returns:
+            {estado: número de puntos}
+        """
+        names = list(self.states)
+        if weights == 'area':
+            values = np.array([self.areas[name] for name in names])
+        elif weights == 'uniform':
+            values = np.ones(len(names))
+        elif isinstance(weights, dict):
+            values = np.array([weights.get(name, 0.0) for name in names], dtype=float)
+        else:
+            raise ValueError(f"Pesos desconocidos: {weights} (opciones: {self.STATE_WEIGHTS} o dict)")
+        
+        if weights == 'uniform':
+            # Reparto exacto: a lo sumo un punto de diferencia entre estados
+            counts = np.full(len(names), n_points // len(names))
+            counts[rng.permutation(len(names))[:n_points % len(names)]] += 1
+        else:
+            counts = rng.multinomial(n_points, values / values.sum())
+        return dict(zip(names, counts.tolist()))
+    
+    def sample_state(self, state: str, count: int, rng: np.random.Generator,
+                     cluster_fraction: float = 0.0, cluster_km: float = 30.0) -> np.ndarray:
+        """
+        Muestrear puntos dentro de un estado por rechazo
+        
+        Los puntos uniformes se sortean en el rectángulo del estado con
+        densidad uniforme en la esfera; los de cúmulo siguen una normal de
+        desviación cluster_km alrededor de la capital. Ambos se rechazan si
+        caen fuera de los polígonos del estado.
+        
+        Args:
+            state: Nombre del estado
+            count: Número de puntos
+            rng: Generador aleatorio
+            cluster_fraction: Fracción de puntos agrupados alrededor de la capital
+            cluster_km: Dispersión de los cúmulos en km
+        
+        Returns:
+            Array (count, 2) con columnas (lat, lon)
+        """
+        rings = self.states[state]
+        points = np.concatenate(rings)
+        lon_min, lat_min = points.min(axis=0)
+        lon_max, lat_max = points.max(axis=0)
+        
+        n_cluster = int(round(count * cluster_fraction)) if state in self.capitals else 0
+        accepted = []
+        
+        def draw(n, clustered):
+            if clustered:
+                lat0, lon0 = self.capitals[state]
+                offsets = rng.normal(0.0, cluster_km, size=(n, 2)) / KM_PER_DEGREE
+                return lat0 + offsets[:, 0], lon0 + offsets[:, 1] / np.cos(np.radians(lat0))
+            z = rng.uniform(np.sin(np.radians(lat_min)), np.sin(np.radians(lat_max)), n)
+            return np.degrees(np.arcsin(z)), rng.uniform(lon_min, lon_max, n)
+        
+        for target, clustered in ((n_cluster, True), (count - n_cluster, False)):
+            found, attempts = 0, 0
+            while found < target:
+                # Cúmulos casi fuera del estado (capital en la costa): completar uniformes
+                use_cluster = clustered and attempts < 50
+                lat, lon = draw(max(2 * (target - found), 64), use_cluster)
+                inside = points_in_rings(lon, lat, rings)
+                batch = np.column_stack([lat[inside], lon[inside]])[:target - found]
+                accepted.append(batch)
+                found += len(batch)
+                attempts += 1
+        
+        return np.concatenate(accepted) if accepted else np.empty((0, 2))
+    
+    def generate(self, n_points: int, seed: int = 0,
+                 weights: Union[str, Dict[str, float]] = 'area',
+                 cluster_fraction: float = 0.0, cluster_km: float = 30.0,
+                 narrow_fraction: float = 0.0, opening_hour: float = 9.0,
+                 closing_hour: float = 21.0, min_window: float = 3.0) -> pd.DataFrame:
+        """
+        Generar una instancia reproducible
+        
+        La primera fila es siempre Ciudad de México (ciudad de inicio). Todas
+        las paradas reciben la ventana del proyecto (apertura/cierre); con
+        narrow_fraction > 0 una fracción recibe una subventana de al menos
+        min_window horas, redondeada a cuartos de hora. RouteTimeCalculator
+        aún aplica la ventana general a todas las ciudades; las columnas
+        quedan en el CSV para evaluadores con ventanas por parada.
+        
+        Args:
+            n_points: Número total de paradas (incluida la de inicio)
+            seed: Semilla; la misma semilla reproduce la misma instancia
+            weights: Reparto entre estados (ver state_counts)
+            cluster_fraction: Fracción de puntos agrupados alrededor de las capitales
+            cluster_km: Dispersión de los cúmulos en km
+            narrow_fraction: Fracción de paradas con ventana reducida
+            opening_hour: Apertura de la ventana general
+            closing_hour: Cierre de la ventana general
+            min_window: Duración mínima de las ventanas reducidas en horas
+        
+        Returns:
+            DataFrame con CIUDAD, ESTADO, lat, lon, apertura, cierre
+        """
+        rng = np.random.default_rng(seed)
+        counts = self.state_counts(n_points - 1, weights, rng)
+        
+        frames = [pd.DataFrame({'CIUDAD': [START_CITY], 'ESTADO': [self.start['ESTADO']],
+                                'lat': [self.start['lat']], 'lon': [self.start['lon']]})]
+        for state, count in counts.items():
+            if count == 0:
+                continue
+            coords = self.sample_state(state, count, rng, cluster_fraction, cluster_km)
+            frames.append(pd.DataFrame({'ESTADO': state, 'lat': coords[:, 0], 'lon': coords[:, 1]}))
+        
+        instance = pd.concat(frames, ignore_index=True)
+        instance.loc[1:, 'CIUDAD'] = [f"P{i:06d}" for i in range(1, len(instance))]
+        
+        # Ventanas de tiempo reproducibles
+        opening = np.full(len(instance), opening_hour)
+        closing = np.full(len(instance), closing_hour)
+        narrow = np.flatnonzero(rng.random(len(instance)) < narrow_fraction)
+        narrow = narrow[narrow > 0]
+        latest = closing_hour - min_window
+        opening[narrow] = np.round(rng.uniform(opening_hour, latest, len(narrow)) * 4) / 4
+        width = rng.uniform(min_window, closing_hour - opening[narrow])
+        closing[narrow] = np.minimum(np.ceil((opening[narrow] + width) * 4) / 4, closing_hour)
+        instance['apertura'] = opening
+        instance['cierre'] = closing
+        
+        print(f"✓ Instancia sintética generada ({len(instance)} paradas, semilla {seed})")
+        return instance
+    
+    def save(self, instance: pd.DataFrame, name: str,
+             output_dir: str = "data/processed/instancias", avg_speed_kmh: float = 60,
+             dtype: str = 'float32', condensed: Optional[bool] = None,
+             matrices: bool = True) -> Dict[str, Path]:
+        """
+        Guardar coordenadas (CSV) y matrices binarias en los formatos del proyecto
+        
+        Args:
+            instance: DataFrame de generate
+            name: Nombre base de los archivos
+            output_dir: Directorio de salida
+            avg_speed_kmh: Velocidad de la matriz de tiempos
+            dtype: Precisión de las matrices ('float64', 'float32' o 'uint16')
+            condensed: Guardar solo el triángulo superior (default: con más de
+                10 000 paradas)
+            matrices: Si escribir las matrices (con 100k paradas ocupan
+                decenas de GB incluso condensadas)
+        
+        Returns:
+            {'coordinates' | 'distance' | 'time': ruta}
+        """
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        paths = {'coordinates': output_dir / f"{name}_coordenadas.csv"}
+        instance.to_csv(paths['coordinates'], index=False)
+        
+        if matrices:
+            if condensed is None:
+                condensed = len(instance) > 10000
+            calculator = DistanceCalculator(instance)
+            for kind, prefix in (('distance', 'matriz_distancias'), ('time', 'matriz_tiempos')):
+                paths[kind] = output_dir / f"{name}_{prefix}.npy"
+                calculator.save_matrix_npy(str(paths[kind]), kind=kind, avg_speed_kmh=avg_speed_kmh,
+                                           dtype=dtype, condensed=condensed)
+        
+        print(f"✓ Instancia guardada en: {output_dir}")
+        return paths
@@ -0,0 +1,397 @@
+"""
+Lin-Kernighan Module
+Búsqueda local de profundidad variable estilo Lin-Kernighan (LK)
+con movimientos Or-opt, listas de candidatos y LK encadenado (double-bridge)
+"""
+
+import time
+import numpy as np
+from collections import deque
+from typing import List, Optional, Tuple
+from .fitness_function import FitnessFunction
+
+
+class LinKernighan:
+    """Motor de mejora local LK para rutas abiertas desde la ciudad de inicio"""
+    
+    def __init__(self,
+                 time_matrix: np.ndarray,
+                 start_city_index: int = 0,
+                 n_candidates: int = 8,
+                 max_depth: int = 10,
+                 fitness_function: Optional[FitnessFunction] = None):
+        """
+        Inicializar motor Lin-Kernighan
+        
+        Args:
+            time_matrix: Matriz simétrica de tiempos de viaje (en horas)
+            start_city_index: Índice de la ciudad de inicio (fija en posición 0)
+            n_candidates: Tamaño de la lista de vecinos más cercanos por ciudad
+            max_depth: Profundidad máxima de la cadena de intercambios LK
+            fitness_function: Función de aptitud TSP-TW usada como filtro de
+                ventanas de tiempo (solo se aceptan movimientos que no
+                empeoran el objetivo real). Si es None se optimiza solo el
+                tiempo de viaje.
+        """
+        self.time_matrix = time_matrix
+        self.n_cities = len(time_matrix)
+        self.start_city_index = start_city_index
+        self.max_depth = max_depth
+        self.fitness_function = fitness_function
+        self.neighbors = self.build_candidate_lists(n_candidates)
+        
+        self._current_objective = None
+        self._schedule = None
+    
+    def build_candidate_lists(self, n_candidates: int) -> np.ndarray:
+        """
+        Construir listas de candidatos (k vecinos más cercanos por tiempo)
+        
+        Args:
+            n_candidates: Número de vecinos por ciudad
+        
+        Returns:
+            Array (n_cities, k) con los vecinos ordenados por cercanía
+        """
+        k = max(1, min(n_candidates, self.n_cities - 1))
+        masked = np.array(self.time_matrix, dtype=float, copy=True)
+        np.fill_diagonal(masked, np.inf)
+        
+        nearest = np.argpartition(masked, k - 1, axis=1)[:, :k]
+        order = np.argsort(np.take_along_axis(masked, nearest, axis=1), axis=1)
+        return np.take_along_axis(nearest, order, axis=1)
+    
+    def path_cost(self, route: np.ndarray) -> float:
+        """
+        Calcular tiempo de viaje de una ruta abierta (sin regreso al inicio)
+        
+        Args:
+            route: Array con el orden de ciudades
+        
+        Returns:
+            Suma de los tiempos de viaje de cada tramo
+        """
+        return float(self.time_matrix[route[:-1], route[1:]].sum())
+    
+    def objective(self, route: np.ndarray) -> float:
+        """
+        Objetivo a minimizar: fitness TSP-TW si hay filtro, si no tiempo de viaje
+        
+        Args:
+            route: Array con el orden de ciudades
+        
+        Returns:
+            Valor del objetivo (menor es mejor)
+        """
+        if self.fitness_function is not None:
+            return self.fitness_function.calculate_fitness(route)
+        return self.path_cost(route)
+    
+    def nearest_neighbor_route(self) -> np.ndarray:
+        """
+        Construir ruta inicial con el vecino más cercano desde la ciudad de inicio
+        
+        Returns:
+            Ruta que empieza en start_city_index
+        """
+        visited = np.zeros(self.n_cities, dtype=bool)
+        route = [self.start_city_index]
+        visited[self.start_city_index] = True
+        
+        for _ in range(self.n_cities - 1):
+            row = np.where(visited, np.inf, self.time_matrix[route[-1]])
+            next_city = int(np.argmin(row))
+            route.append(next_city)
+            visited[next_city] = True
+        
+        return np.array(route)
+    
+    def optimize(self, route: np.ndarray,
+                 deadline: Optional[float] = None) -> Tuple[np.ndarray, float]:
+        """
+        Llevar una ruta a un óptimo local LK + Or-opt
+        
+        Args:
+            route: Ruta inicial (empezando en la ciudad de inicio)
+            deadline: Instante de time.perf_counter() en el que se detiene la
+                mejora aunque queden ciudades activas (opcional)
+        
+        Returns:
+            Tupla con (mejor_ruta, mejor_objetivo)
+        """
+        r = self._with_start_city(route)
+        self._improve(r, range(self.n_cities), deadline)
+        return r, self.objective(r)
+    
+    def chained_optimize(self, route: Optional[np.ndarray] = None,
+                         max_kicks: int = 100,
+                         time_limit: Optional[float] = None,
+                         verbose: bool = False) -> Tuple[np.ndarray, float, List[float]]:
+        """
+        LK encadenado: óptimo local + perturbaciones double-bridge
+        
+        Args:
+            route: Ruta inicial (default: vecino más cercano)
+            max_kicks: Número máximo de perturbaciones
+            time_limit: Límite de tiempo en segundos (opcional)
+            verbose: Si mostrar progreso
+        
+        Returns:
+            Tupla con (mejor_ruta, mejor_objetivo, historial_objetivo)
+        """
+        deadline = time.perf_counter() + time_limit if time_limit is not None else None
+        if route is None:
+            route = self.nearest_neighbor_route()
+        
+        best_route, best_value = self.optimize(route, deadline)
+        history = [best_value]
+        
+        for kick in range(max_kicks):
+            if deadline is not None and time.perf_counter() > deadline:
+                break
+            if self.n_cities < 5:
+                break
+            
+            candidate, touched = self._double_bridge(best_route)
+            self._improve(candidate, touched, deadline)
+            value = self.objective(candidate)
+            
+            if value < best_value - 1e-9:
+                best_route, best_value = candidate, value
+            history.append(best_value)
+            
+            if verbose and (kick + 1) % 50 == 0:
+                print(f"   Kick {kick + 1}/{max_kicks} - Mejor: {best_value:.2f} horas")
+        
+        return best_route, best_value, history
+    
+    def _with_start_city(self, route: np.ndarray) -> np.ndarray:
+        """Copiar la ruta asegurando que empieza en la ciudad de inicio"""
+        route = np.asarray(route)
+        rest = route[route != self.start_city_index]
+        return np.concatenate([[self.start_city_index], rest]).astype(np.intp)
+    
+    def _improve(self, r: np.ndarray, active_cities,
+                 deadline: Optional[float] = None) -> None:
+        """
+        Aplicar movimientos LK y Or-opt hasta no encontrar mejora o alcanzar
+        el deadline (bits "don't look" implementados con una cola de
+        ciudades activas)
+        """
+        pos = np.empty(self.n_cities, dtype=np.intp)
+        pos[r] = np.arange(self.n_cities)
+        self._current_objective = None
+        self._schedule = None
+        if self.fitness_function is not None:
+            calculator = self.fitness_function.route_calculator
+            self._schedule = calculator.get_schedule(r)
+            times, penalties = self._schedule
+            self._current_objective = times[-1] - calculator.start_time + penalties[-1]
+        
+        queue = deque(int(c) for c in active_cities)
+        in_queue = np.zeros(self.n_cities, dtype=bool)
+        in_queue[list(queue)] = True
+        
+        while queue:
+            if deadline is not None and time.perf_counter() > deadline:
+                break
+            city = queue.popleft()
+            in_queue[city] = False
+            
+            touched = self._lk_move(r, pos, city)
+            if touched is None:
+                touched = self._or_opt_move(r, pos, city)
+            if touched is None:
+                continue
+            
+            for p in touched:
+                for q in (p - 1, p, p + 1):
+                    if 0 <= q < self.n_cities and not in_queue[r[q]]:
+                        in_queue[r[q]] = True
+                        queue.append(int(r[q]))
+    
+    def _accept(self, r: np.ndarray, first: int, last: int) -> bool:
+        """
+        Filtro de ventanas de tiempo: aceptar solo si el objetivo real no empeora
+        
+        El objetivo se re-evalúa desde la primera posición modificada sobre
+        el horario prefijo cacheado de la ruta actual (r[first..last] es el
+        único tramo que cambió), que se actualiza si se acepta el movimiento.
+        """
+        if self.fitness_function is None:
+            return True
+        calculator = self.fitness_function.route_calculator
+        times, penalties = self._schedule
+        value = calculator.evaluate_from(r, first, times, penalties, sync_position=last + 1)
+        if value <= self._current_objective + 1e-9:
+            calculator.update_schedule(r, times, penalties, first, sync_position=last + 1)
+            self._current_objective = value
+            return True
+        return False
+    
+    @staticmethod
+    def _reverse(r: np.ndarray, pos: np.ndarray, i: int, j: int) -> None:
+        """Invertir r[i..j] actualizando el índice de posiciones"""
+        r[i:j+1] = r[i:j+1][::-1]
+        pos[r[i:j+1]] = np.arange(i, j + 1)
+    
+    def _lk_move(self, r: np.ndarray, pos: np.ndarray, t1: int) -> Optional[List[int]]:
+        """
+        Cadena LK de inversiones (2-opt secuencial) anclada en t1
+        
+        Se elimina la arista (t1, t2) y en cada nivel se añade (t2, y) con y en
+        la lista de candidatos de t2, se elimina (x, y) con x = pred(y) y se
+        cierra con (t1, x) invirtiendo r[p+1..pos(x)]. La cadena continúa
+        mientras la ganancia parcial sea positiva y se conserva el prefijo
+        con mayor ganancia al cerrar.
+        
+        Returns:
+            Posiciones modificadas si hubo mejora, None en caso contrario
+        """
+        c = self.time_matrix
+        n = self.n_cities
+        p = pos[t1]
+        if p >= n - 2:
+            return None
+        
+        t2 = r[p + 1]
+        gain = c[t1, t2]
+        flips = []
+        added = set()
+        best_gain = 1e-9
+        best_len = 0
+        
+        for _ in range(self.max_depth):
+            choice = None
+            choice_gain = -np.inf
+            
+            for y in self.neighbors[t2]:
+                q = pos[y]
+                if q <= p + 2:
+                    continue
+                x = r[q - 1]
+                if (x, y) in added or (y, x) in added:
+                    continue
+                partial = gain - c[t2, y]
+                if partial <= 0:
+                    continue
+                new_gain = partial + c[x, y]
+                if new_gain > choice_gain:
+                    choice, choice_gain = (q - 1, y), new_gain
+            
+            # Extremo abierto: invertir el sufijo completo (sin arista de cierre)
+            if n - 1 >= p + 2 and gain > choice_gain:
+                choice, choice_gain = (n - 1, None), gain
+            
+            if choice is None:
+                break
+            
+            j, y = choice
+            if y is not None:
+                added.add((t2, y))
+            self._reverse(r, pos, p + 1, j)
+            flips.append((p + 1, j))
+            
+            t2 = r[p + 1]
+            gain = choice_gain
+            closed = gain - c[t1, t2]
+            if closed > best_gain:
+                best_gain, best_len = closed, len(flips)
+        
+        for i, j in reversed(flips[best_len:]):
+            self._reverse(r, pos, i, j)
+        
+        if best_len == 0:
+            return None
+        
+        if not self._accept(r, p + 1, max(j for _, j in flips[:best_len])):
+            for i, j in reversed(flips[:best_len]):
+                self._reverse(r, pos, i, j)
+            return None
+        
+        touched = []
+        for i, j in flips[:best_len]:
+            touched.extend((i, j))
+        return touched
+    
+    def _or_opt_move(self, r: np.ndarray, pos: np.ndarray, city: int) -> Optional[List[int]]:
+        """
+        Movimiento Or-opt (3-opt restringido): reubicar un segmento de 1 a 3
+        ciudades que empieza en `city`, opcionalmente invertido, junto a un
+        vecino de la lista de candidatos
+        
+        Returns:
+            Posiciones modificadas si hubo mejora, None en caso contrario
+        """
+        c = self.time_matrix
+        n = self.n_cities
+        s = pos[city]
+        if s == 0:
+            return None
+        
+        for length in (1, 2, 3):
+            e = s + length - 1
+            if e >= n:
+                break
+            
+            prev, first, last = r[s - 1], r[s], r[e]
+            nxt = r[e + 1] if e + 1 < n else None
+            removal_gain = c[prev, first]
+            if nxt is not None:
+                removal_gain += c[last, nxt] - c[prev, nxt]
+            
+            best = None
+            best_delta = -1e-9
+            for u in np.concatenate([self.neighbors[first], self.neighbors[last]]):
+                k = pos[u]
+                if s - 1 <= k <= e:
+                    continue
+                v = r[k + 1] if k + 1 < n else None
+                base = c[u, v] if v is not None else 0.0
+                
+                # Insertar entre u y v en orden directo o invertido
+                forward = c[u, first] + (c[last, v] if v is not None else 0.0) - base
+                backward = c[u, last] + (c[first, v] if v is not None else 0.0) - base
+                for reverse, insertion_cost in ((False, forward), (True, backward)):
+                    delta = insertion_cost - removal_gain
+                    if delta < best_delta:
+                        best, best_delta = (k, reverse), delta
+            
+            if best is None:
+                continue
+            
+            k, reverse = best
+            segment = r[s:e+1][::-1] if reverse else r[s:e+1]
+            rest = np.concatenate([r[:s], r[e+1:]])
+            insert_at = k + 1 if k < s else k + 1 - length
+            candidate = np.concatenate([rest[:insert_at], segment, rest[insert_at:]])
+            
+            previous = r.copy()
+            r[:] = candidate
+            first = min(s, insert_at)
+            last = max(e, insert_at + length - 1)
+            if not self._accept(r, first, last):
+                r[:] = previous
+                continue
+            pos[r] = np.arange(n)
+            return [s - 1, s, e, insert_at - 1, insert_at, insert_at + length - 1]
+        
+        return None
+    
+    def _double_bridge(self, route: np.ndarray) -> Tuple[np.ndarray, List[int]]:
+        """
+        Perturbación double-bridge: intercambiar dos segmentos consecutivos
+        (la ciudad de inicio permanece en la posición 0)
+        
+        Returns:
+            Tupla con (ruta_perturbada, ciudades_en_los_cortes)
+        """
+        a, b, c = sorted(np.random.choice(range(1, self.n_cities), 3, replace=False))
+        kicked = np.concatenate([route[:a], route[b:c], route[a:b], route[c:]])
+        
+        touched = set()
+        for cut in (a, a + (c - b), c):
+            for q in (cut - 1, cut):
+                if 0 <= q < self.n_cities:
+                    touched.add(int(kicked[q]))
+        return kicked, sorted(touched)
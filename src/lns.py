@@ -0,0 +1,309 @@
+"""
+Large Neighborhood Search Module
+Búsqueda de Vecindario Grande (ruin & recreate) para TSP-TW con inserción
+por arrepentimiento (regret-k) guiada por la holgura hacia adelante del horario
+"""
+
+import time
+import numpy as np
+from typing import List, Optional, Tuple
+from .fitness_function import FitnessFunction
+from .time_windows import static_matrix
+
+
+class LargeNeighborhoodSearch:
+    """LNS: destruir parte de la ruta y reconstruirla con inserción regret-k"""
+    
+    RUIN_OPERATORS = ['random', 'radial', 'time_slice', 'worst']
+    
+    def __init__(self,
+                 time_matrix: np.ndarray,
+                 start_city_index: int = 0,
+                 iterations: int = 2000,
+                 coordinates: Optional[np.ndarray] = None,
+                 min_removal: float = 0.1,
+                 max_removal: float = 0.3,
+                 regret_k: int = 3,
+                 acceptance: str = 'rrt',
+                 deviation: float = 0.05,
+                 start_temperature: float = 5.0,
+                 end_temperature: float = 0.05,
+                 worst_randomness: float = 3.0,
+                 time_limit: Optional[float] = None,
+                 start_time: float = 9.0,
+                 penalty_weight: float = 100.0):
+        """
+        Inicializar LNS para TSP-TW
+        
+        Args:
+            time_matrix: Matriz de tiempos de viaje entre ciudades (en horas)
+                o TimeDependentTravelTimes
+            start_city_index: Índice de la ciudad de inicio (CDMX)
+            iterations: Número de iteraciones destruir/reconstruir
+            coordinates: Array (n, 2) con lat/lon de cada ciudad (p. ej. de
+                coordenadas_capitales.csv) para la destrucción radial;
+                sin coordenadas se usa la cercanía en tiempo de viaje
+            min_removal: Fracción mínima de ciudades a remover
+            max_removal: Fracción máxima de ciudades a remover
+            regret_k: Número de posiciones consideradas en el arrepentimiento
+            acceptance: Criterio de aceptación: 'rrt' (record-to-record) o 'sa'
+            deviation: Desviación relativa permitida sobre el récord (rrt)
+            start_temperature: Temperatura inicial en horas (sa)
+            end_temperature: Temperatura final en horas (sa)
+            worst_randomness: Exponente de aleatoriedad de la remoción por peor costo
+            time_limit: Presupuesto de tiempo de reloj en segundos (opcional)
+            start_time: Hora de inicio del viaje (default: 9:00 AM)
+            penalty_weight: Peso de penalización por violación de ventanas
+        """
+        if acceptance not in ('rrt', 'sa'):
+            raise ValueError(f"Criterio de aceptación desconocido: {acceptance}")
+        
+        # Referencia estática para la cercanía y los ahorros aproximados
+        self.time_matrix = static_matrix(time_matrix)
+        self.n_cities = len(time_matrix)
+        self.start_city_index = start_city_index
+        self.iterations = iterations
+        self.min_removal = min_removal
+        self.max_removal = max_removal
+        self.regret_k = regret_k
+        self.acceptance = acceptance
+        self.deviation = deviation
+        self.start_temperature = start_temperature
+        self.end_temperature = end_temperature
+        self.worst_randomness = worst_randomness
+        self.time_limit = time_limit
+        
+        self.fitness_func = FitnessFunction(
+            time_matrix=time_matrix,
+            start_city_index=start_city_index,
+            start_time=start_time,
+            penalty_weight=penalty_weight
+        )
+        self.route_calculator = self.fitness_func.route_calculator
+        
+        # Ciudades ordenadas por cercanía (para la destrucción radial)
+        if coordinates is not None:
+            coordinates = np.asarray(coordinates, dtype=float)
+            lat = np.radians(coordinates[:, 0])
+            lon = np.radians(coordinates[:, 1])
+            x = lon * np.cos(lat.mean())
+            proximity = np.hypot(x[:, None] - x[None, :], lat[:, None] - lat[None, :])
+        else:
+            proximity = self.time_matrix + self.time_matrix.T
+        self.nearest = np.argsort(proximity, axis=1, kind='stable')
+        
+        self.best_solution = None
+        self.best_fitness = float('inf')
+        self.fitness_history = []
+    
+    def ruin(self, route: np.ndarray, n_remove: int,
+             operator: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Remover ciudades de la ruta (la ciudad de inicio nunca se remueve)
+        
+        Args:
+            route: Ruta completa
+            n_remove: Número de ciudades a remover
+            operator: 'random', 'radial', 'time_slice' o 'worst'
+        
+        Returns:
+            Tupla (ruta_parcial, ciudades_removidas)
+        """
+        n = len(route)
+        n_remove = min(n_remove, n - 1)
+        
+        if operator == 'random':
+            positions = np.random.choice(np.arange(1, n), n_remove, replace=False)
+            removed = route[positions]
+        elif operator == 'radial':
+            seed = route[np.random.randint(1, n)]
+            neighbors = self.nearest[seed]
+            removed = neighbors[neighbors != self.start_city_index][:n_remove]
+        elif operator == 'time_slice':
+            # Ciudades visitadas en una franja contigua del horario
+            first = np.random.randint(1, n - n_remove + 1)
+            removed = route[first:first + n_remove]
+        elif operator == 'worst':
+            savings = self._removal_savings(route)
+            order = np.argsort(-savings[1:]) + 1
+            picks = []
+            for _ in range(n_remove):
+                index = int(np.random.random() ** self.worst_randomness * len(order))
+                picks.append(order[index])
+                order = np.delete(order, index)
+            removed = route[picks]
+        else:
+            raise ValueError(f"Operador de destrucción desconocido: {operator}")
+        
+        partial = route[~np.isin(route, removed)]
+        return partial, np.asarray(removed)
+    
+    def _removal_savings(self, route: np.ndarray) -> np.ndarray:
+        """Ahorro aproximado (viaje + espera) de quitar cada posición de la ruta"""
+        times, _ = self.route_calculator.get_schedule(route)
+        tm = self.time_matrix
+        savings = np.zeros(len(route))
+        savings[1:] = times[1:] - times[:-1]
+        savings[1:-1] += tm[route[1:-1], route[2:]] - tm[route[:-2], route[2:]]
+        return savings
+    
+    def insertion_costs(self, route: np.ndarray, cities: np.ndarray) -> np.ndarray:
+        """
+        Incremento del tiempo total al insertar cada ciudad en cada posición
+        
+        Con el horario de la ruta se precalcula la espera w_j de cada ciudad y
+        la holgura hacia adelante FTS_j = w_j + min(cierre - hora_j, FTS_{j+1}):
+        el retraso máximo a la llegada a route[j] que no hace cruzar el cierre
+        a ninguna ciudad posterior. Dentro de esa holgura el horario conserva
+        su forma y el incremento total es max(0, retraso - esperas restantes),
+        una comprobación O(1) por inserción. Las inserciones fuera de la
+        holgura (o que adelantan el horario) se evalúan de forma exacta,
+        cortando en cuanto el horario vuelve a coincidir con el original.
+        Con tiempos dependientes de la hora un retraso cambia también los
+        tiempos de viaje siguientes, así que todas se evalúan de forma exacta.
+        
+        Args:
+            route: Ruta parcial (empezando en la ciudad de inicio)
+            cities: Ciudades a insertar
+        
+        Returns:
+            Matriz (len(route), len(cities)); la fila p corresponde a insertar
+            después de route[p]
+        """
+        calculator = self.route_calculator
+        closing = calculator.time_window.closing_hour
+        length = len(route)
+        times, penalties = calculator.get_schedule(route)
+        total = times[-1] - calculator.start_time + penalties[-1]
+        
+        # Esperas, holgura hacia adelante y esperas acumuladas hasta el final
+        arrivals = times[:-1] + calculator.travel_time_batch(times[:-1], route[:-1], route[1:])
+        waits = np.concatenate([[0.0], times[1:] - arrivals])
+        gaps = np.maximum(closing - times % 24, 0.0)
+        forward_slack = np.empty(length + 1)
+        remaining_wait = np.empty(length + 1)
+        forward_slack[length] = np.inf
+        remaining_wait[length] = 0.0
+        for j in range(length - 1, -1, -1):
+            forward_slack[j] = waits[j] + min(gaps[j], forward_slack[j + 1])
+            remaining_wait[j] = waits[j] + remaining_wait[j + 1]
+        
+        # Llegada (con espera) a la ciudad insertada desde cada posición
+        city_times, city_penalties = calculator.advance_batch(
+            times[:, None], route[:, None], cities[None, :]
+        )
+        costs = np.empty((length, len(cities)))
+        costs[-1] = city_times[-1] - times[-1] + city_penalties[-1]
+        
+        if length > 1:
+            delay = (city_times[:-1]
+                     + calculator.travel_time_batch(city_times[:-1], cities[None, :], route[1:, None])
+                     - arrivals[:, None])
+            costs[:-1] = (np.maximum(delay - remaining_wait[1:-1, None], 0.0)
+                          + city_penalties[:-1])
+            
+            outside = (delay < 0) | (delay > forward_slack[1:-1, None])
+            if calculator.time_dependent:
+                outside[:] = True
+            for p, u in zip(*np.nonzero(outside)):
+                candidate = np.concatenate([route[:p + 1], [cities[u]], route[p + 1:]])
+                costs[p, u] = calculator.evaluate_from(candidate, p + 1, times, penalties,
+                                                       sync_position=p + 2, sync_offset=1) - total
+        
+        return costs
+    
+    def recreate(self, route: np.ndarray, removed: np.ndarray) -> np.ndarray:
+        """
+        Reinsertar ciudades con inserción regret-k
+        
+        En cada paso se inserta la ciudad con mayor arrepentimiento (suma de
+        diferencias entre su mejor posición y las k-1 siguientes) en su mejor
+        posición; los empates se rompen por menor costo de inserción.
+        
+        Args:
+            route: Ruta parcial
+            removed: Ciudades a insertar
+        
+        Returns:
+            Ruta completa
+        """
+        route = np.asarray(route)
+        pending = np.asarray(removed)
+        
+        while len(pending):
+            costs = self.insertion_costs(route, pending)
+            k = min(self.regret_k, len(route))
+            best_k = np.sort(costs, axis=0)[:k]
+            regret = (best_k - best_k[0]).sum(axis=0)
+            
+            u = np.lexsort((best_k[0], -regret))[0]
+            p = int(np.argmin(costs[:, u]))
+            route = np.concatenate([route[:p + 1], [pending[u]], route[p + 1:]])
+            pending = np.delete(pending, u)
+        
+        return route
+    
+    def _accept(self, candidate_value: float, current_value: float,
+                temperature: float) -> bool:
+        """Criterio de aceptación record-to-record o recocido simulado"""
+        if self.acceptance == 'rrt':
+            return candidate_value < self.best_fitness * (1.0 + self.deviation)
+        if candidate_value <= current_value:
+            return True
+        return np.random.random() < np.exp(-(candidate_value - current_value) / temperature)
+    
+    def solve(self, verbose: bool = True) -> Tuple[np.ndarray, float, List[float]]:
+        """
+        Ejecutar LNS
+        
+        Args:
+            verbose: Si mostrar progreso
+        
+        Returns:
+            Tupla con (mejor_ruta, mejor_fitness, historial_fitness)
+        """
+        deadline = time.perf_counter() + self.time_limit if self.time_limit is not None else None
+        other_cities = np.array([i for i in range(self.n_cities) if i != self.start_city_index])
+        
+        current = self.recreate(np.array([self.start_city_index]), np.random.permutation(other_cities))
+        current_value = self.fitness_func.calculate_fitness(current)
+        self.best_solution, self.best_fitness = current.copy(), current_value
+        
+        n_min = max(1, int(self.min_removal * (self.n_cities - 1)))
+        n_max = max(n_min, int(self.max_removal * (self.n_cities - 1)))
+        cooling = (self.end_temperature / self.start_temperature) ** (1.0 / max(1, self.iterations))
+        temperature = self.start_temperature
+        
+        if verbose:
+            print(f"\n🧨 Iniciando LNS para TSP-TW")
+            print(f"   Iteraciones: {self.iterations}")
+            print(f"   Remoción: {n_min}-{n_max} ciudades, regret-{self.regret_k}")
+            print(f"   Aceptación: {self.acceptance}\n")
+        
+        for iteration in range(1, self.iterations + 1):
+            if deadline is not None and time.perf_counter() > deadline:
+                break
+            
+            operator = self.RUIN_OPERATORS[np.random.randint(len(self.RUIN_OPERATORS))]
+            partial, removed = self.ruin(current, np.random.randint(n_min, n_max + 1), operator)
+            candidate = self.recreate(partial, np.random.permutation(removed))
+            candidate_value = self.fitness_func.calculate_fitness(candidate)
+            
+            if self._accept(candidate_value, current_value, temperature):
+                current, current_value = candidate, candidate_value
+                
+                if current_value < self.best_fitness - 1e-9:
+                    self.best_solution, self.best_fitness = current.copy(), current_value
+            
+            temperature *= cooling
+            self.fitness_history.append(self.best_fitness)
+            
+            if verbose and iteration % 200 == 0:
+                print(f"   Iteración {iteration}/{self.iterations} - "
+                      f"Mejor tiempo: {self.best_fitness:.2f} horas")
+        
+        if verbose:
+            print(f"\n✓ LNS completado")
+            print(f"   Mejor tiempo total: {self.best_fitness:.2f} horas")
+        
+        return self.best_solution, self.best_fitness, self.fitness_history
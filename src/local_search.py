@@ -3,21 +3,32 @@ Local Search Module
 Heurística 2-opt para mejora local de rutas
 """
 
+import time
 import numpy as np
-from typing import Tuple
+from typing import Optional, Tuple
+from .fitness_function import FitnessFunction
 
 
 class LocalSearch:
     """Búsqueda local 2-opt para optimización de rutas"""
     
-    def __init__(self, distance_matrix: np.ndarray):
+    # Filas leídas por bloque al recorrer la matriz completa
+    BLOCK_ROWS = 1024
+    
+    def __init__(self, distance_matrix: np.ndarray,
+                 fitness_function: Optional[FitnessFunction] = None):
         """
         Inicializar búsqueda local
         
         Args:
-            distance_matrix: Matriz de distancias entre ciudades
+            distance_matrix: Matriz de distancias entre ciudades (puede ser
+                un np.memmap o ScaledMatrix de load_matrix, que se leen sin
+                copiar, o un KNearestGraph para instancias muy grandes)
+            fitness_function: Función de aptitud TSP-TW usada como objetivo
+                real en optimize_time_windows (opcional)
         """
         self.distance_matrix = distance_matrix
+        self.fitness_function = fitness_function
     
     def calculate_route_distance(self, route: np.ndarray) -> float:
         """
@@ -89,6 +100,89 @@ class LocalSearch:
         
         return best_route, best_distance
     
+    def two_opt_gains(self, route: np.ndarray, rows: slice) -> np.ndarray:
+        """
+        Calcular un bloque de la matriz de ganancias 2-opt (tour cerrado)
+        
+        gain[i, j] = d[a_i,a_{i+1}] + d[a_j,a_{j+1}] - d[a_i,a_j] - d[a_{i+1},a_{j+1}]
+        es lo que se ahorra al invertir route[i+1..j]. Solo los pares con
+        j > i + 1 son movimientos válidos; el resto se devuelve como -inf.
+        
+        Args:
+            route: Ruta actual
+            rows: Rango de filas i a calcular
+            
+        Returns:
+            Matriz (len(rows), n) con las ganancias
+        """
+        n = len(route)
+        a = route
+        b = np.roll(route, -1)
+        edges = self.distance_matrix[a, b]
+        
+        i = np.arange(n)[rows]
+        gains = (edges[i, None] + edges[None, :]
+                 - self.distance_matrix[a[i]][:, a]
+                 - self.distance_matrix[b[i]][:, b])
+        gains[np.arange(n)[None, :] <= i[:, None] + 1] = -np.inf
+        return gains
+    
+    def optimize_vectorized(self, route: np.ndarray, max_iterations: int = 1000,
+                            multi_move: bool = False,
+                            chunk_size: Optional[int] = None) -> Tuple[np.ndarray, float]:
+        """
+        Optimizar ruta con 2-opt de mejor mejora evaluando todas las
+        ganancias con operaciones NumPy (sin doble bucle en Python)
+        
+        Args:
+            route: Ruta inicial
+            max_iterations: Número máximo de barridos
+            multi_move: Si aplicar en cada barrido todos los movimientos de
+                mejora que no se solapan (en lugar de solo el mejor)
+            chunk_size: Filas de la matriz de ganancias por bloque
+                (default: bloques de ~4M elementos)
+            
+        Returns:
+            Tupla con (mejor_ruta, mejor_distancia)
+        """
+        best_route = np.asarray(route).copy()
+        n = len(best_route)
+        if chunk_size is None:
+            chunk_size = max(1, (1 << 22) // max(n, 1))
+        
+        for _ in range(max_iterations):
+            moves = []
+            
+            for start in range(0, n - 2, chunk_size):
+                rows = slice(start, min(start + chunk_size, n - 2))
+                gains = self.two_opt_gains(best_route, rows)
+                
+                if multi_move:
+                    i, j = np.nonzero(gains > 1e-10)
+                    if len(i) > n:
+                        top = np.argpartition(gains[i, j], -n)[-n:]
+                        i, j = i[top], j[top]
+                    moves.extend(zip(gains[i, j], i + start, j))
+                else:
+                    flat = np.argmax(gains)
+                    i, j = divmod(flat, n)
+                    if gains[i, j] > 1e-10 and (not moves or gains[i, j] > moves[0][0]):
+                        moves = [(gains[i, j], i + start, j)]
+            
+            if not moves:
+                break
+            
+            # Aplicar movimientos de mayor a menor ganancia sin solapamiento
+            moves.sort(key=lambda move: -move[0])
+            used = np.zeros(n, dtype=bool)
+            for gain, i, j in moves:
+                if used[i:j+1].any():
+                    continue
+                used[i:j+1] = True
+                best_route[i+1:j+1] = best_route[i+1:j+1][::-1]
+        
+        return best_route, self.calculate_route_distance(best_route)
+    
     def optimize_greedy(self, route: np.ndarray) -> Tuple[np.ndarray, float]:
         """
         Optimización 2-opt greedy (primera mejora encontrada)
@@ -121,3 +215,217 @@ class LocalSearch:
                         break
         
         return best_route, best_distance
+    
+    def optimize_time_windows(self, route: np.ndarray, max_iterations: int = 1000,
+                              screen_tolerance: float = 0.0,
+                              deadline: Optional[float] = None) -> Tuple[np.ndarray, float]:
+        """
+        Optimización 2-opt guiada por el objetivo TSP-TW (tiempo con esperas
+        y penalizaciones) en lugar de la distancia pura
+        
+        Cada movimiento se filtra primero con el delta de distancia en O(1)
+        y solo los candidatos con delta < screen_tolerance se confirman
+        re-evaluando el horario desde el primer punto modificado (prefijo
+        cacheado). Solo se aceptan movimientos que mejoran el fitness real.
+        
+        Args:
+            route: Ruta inicial (empezando en la ciudad de inicio)
+            max_iterations: Número máximo de movimientos aceptados
+            screen_tolerance: Umbral del delta de distancia para evaluar un
+                candidato (valores > 0 permiten probar movimientos que
+                alargan el viaje pero pueden reducir esperas)
+            deadline: Instante de time.perf_counter() en el que se detiene
+                la búsqueda con la mejor ruta hasta el momento (opcional)
+            
+        Returns:
+            Tupla con (mejor_ruta, mejor_fitness)
+        """
+        if self.fitness_function is None:
+            raise ValueError("optimize_time_windows requiere fitness_function")
+        
+        calculator = self.fitness_function.route_calculator
+        d = self.distance_matrix
+        best_route = self.fitness_function._ensure_start_end_city(np.asarray(route)).copy()
+        n = len(best_route)
+        
+        times, penalties = calculator.get_schedule(best_route)
+        best_fitness = times[-1] - calculator.start_time + penalties[-1]
+        improved = True
+        iteration = 0
+        
+        while improved and iteration < max_iterations:
+            improved = False
+            iteration += 1
+            
+            for i in range(1, n - 1):
+                if deadline is not None and time.perf_counter() > deadline:
+                    break
+                a, b = best_route[i - 1], best_route[i]
+                
+                for j in range(i + 1, n):
+                    c = best_route[j]
+                    # Delta de distancia de invertir best_route[i..j] (ruta abierta)
+                    delta = d[a, c] - d[a, b]
+                    if j + 1 < n:
+                        e = best_route[j + 1]
+                        delta += d[b, e] - d[c, e]
+                    
+                    if delta >= screen_tolerance:
+                        continue
+                    
+                    candidate = best_route.copy()
+                    candidate[i:j+1] = best_route[i:j+1][::-1]
+                    candidate_fitness = calculator.evaluate_from(
+                        candidate, i, times, penalties, sync_position=j + 1
+                    )
+                    
+                    if candidate_fitness < best_fitness - 1e-9:
+                        best_route = candidate
+                        best_fitness = candidate_fitness
+                        times, penalties = calculator.get_schedule(best_route)
+                        improved = True
+                        break
+                
+                if improved:
+                    break
+        
+        return best_route, self.fitness_function.calculate_fitness(best_route)
+    
+    def get_near_lists(self, m: int) -> np.ndarray:
+        """
+        Obtener (y cachear) las m ciudades más cercanas a cada ciudad
+        
+        Args:
+            m: Número de vecinos por ciudad
+            
+        Returns:
+            Array (n_ciudades, m) con vecinos ordenados por distancia
+        """
+        # Grafo disperso de vecinos (KNearestGraph): listas ya calculadas
+        neighbor_lists = getattr(self.distance_matrix, 'neighbor_lists', None)
+        if neighbor_lists is not None:
+            return neighbor_lists(m)
+        
+        if getattr(self, '_near_lists', None) is None or self._near_lists.shape[1] < m:
+            n = len(self.distance_matrix)
+            k = min(m, n - 1)
+            near = np.empty((n, k), dtype=np.intp)
+            
+            # Por bloques de filas: no se copia la matriz completa (memmap)
+            for start in range(0, n, self.BLOCK_ROWS):
+                stop = min(start + self.BLOCK_ROWS, n)
+                rows = np.array(self.distance_matrix[start:stop], dtype=float)
+                rows[np.arange(stop - start), np.arange(start, stop)] = np.inf
+                candidates = np.argpartition(rows, k - 1, axis=1)[:, :k]
+                order = np.argsort(np.take_along_axis(rows, candidates, axis=1), axis=1)
+                near[start:stop] = np.take_along_axis(candidates, order, axis=1)
+            
+            self._near_lists = near
+        return self._near_lists[:, :m]
+    
+    def abrupt_removal(self, route: np.ndarray, m: int = 5,
+                       max_iterations: int = 10,
+                       screen_tolerance: float = 0.0,
+                       deadline: Optional[float] = None) -> Tuple[np.ndarray, float]:
+        """
+        Heurística de Remoción de Abruptos (versión indexada del HGA legacy)
+        
+        Para cada ciudad se prueba sacarla de la ruta e insertarla antes o
+        después de cada una de sus m ciudades más cercanas (NEARLIST
+        precalculada). La posición de cada ciudad se mantiene en un array
+        índice, el delta de viaje de cada inserción se calcula en O(1) y el
+        objetivo TSP-TW se re-evalúa solo desde la primera posición
+        modificada. Se aplica la mejor inserción que mejore el fitness.
+        
+        Args:
+            route: Ruta inicial (empezando en la ciudad de inicio)
+            m: Número de ciudades más cercanas a considerar
+            max_iterations: Máximo número de pasadas completas
+            screen_tolerance: Solo se evalúan inserciones con delta de viaje
+                menor a este umbral (default: las que no alargan el viaje;
+                np.inf las evalúa todas, como el legacy)
+            deadline: Instante de time.perf_counter() en el que se detiene
+                la búsqueda con la mejor ruta hasta el momento (opcional)
+            
+        Returns:
+            Tupla con (mejor_ruta, mejor_fitness)
+        """
+        if self.fitness_function is None:
+            raise ValueError("abrupt_removal requiere fitness_function")
+        
+        calculator = self.fitness_function.route_calculator
+        start_city = self.fitness_function.start_city_index
+        d = self.distance_matrix
+        near_lists = self.get_near_lists(m)
+        
+        best_route = self.fitness_function._ensure_start_end_city(np.asarray(route)).copy()
+        n = len(best_route)
+        pos = np.empty(len(d), dtype=int)
+        pos[best_route] = np.arange(n)
+        
+        times, penalties = calculator.get_schedule(best_route)
+        best_fitness = times[-1] - calculator.start_time + penalties[-1]
+        
+        for _ in range(max_iterations):
+            improved = False
+            
+            for city in best_route[1:].tolist():
+                if deadline is not None and time.perf_counter() > deadline:
+                    break
+                i = pos[city]
+                prev = best_route[i - 1]
+                nxt = best_route[i + 1] if i + 1 < n else None
+                removal = d[prev, city]
+                if nxt is not None:
+                    removal += d[city, nxt] - d[prev, nxt]
+                
+                best_move = None
+                best_move_fitness = best_fitness - 1e-9
+                
+                for near in near_lists[city]:
+                    k = pos[near]
+                    # Posibles posiciones de inserción en la ruta original:
+                    # antes de `near` (no antes del inicio) y después de `near`
+                    for target in ((k, k + 1) if near != start_city else (k + 1,)):
+                        if target == i or target == i + 1:
+                            continue
+                        
+                        u = best_route[target - 1]
+                        v = best_route[target] if target < n else None
+                        insertion = d[u, city]
+                        if v is not None:
+                            insertion += d[city, v] - d[u, v]
+                        if insertion - removal >= screen_tolerance:
+                            continue
+                        
+                        if target < i:
+                            first, last = target, i
+                            candidate = np.concatenate([
+                                best_route[:target], [city],
+                                best_route[target:i], best_route[i+1:]
+                            ])
+                        else:
+                            first, last = i, target - 1
+                            candidate = np.concatenate([
+                                best_route[:i], best_route[i+1:target],
+                                [city], best_route[target:]
+                            ])
+                        
+                        candidate_fitness = calculator.evaluate_from(
+                            candidate, first, times, penalties, sync_position=last + 1
+                        )
+                        if candidate_fitness < best_move_fitness:
+                            best_move = (candidate, first, last)
+                            best_move_fitness = candidate_fitness
+                
+                if best_move is not None:
+                    best_route, first, last = best_move
+                    best_fitness = best_move_fitness
+                    pos[best_route[first:last+1]] = np.arange(first, last + 1)
+                    times, penalties = calculator.get_schedule(best_route)
+                    improved = True
+            
+            if not improved:
+                break
+        
+        return best_route, self.fitness_function.calculate_fitness(best_route)
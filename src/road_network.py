@@ -0,0 +1,331 @@
+"""
+Road Network Module
+Tiempos de viaje sobre una red de carreteras (capa de líneas) con caminos
+mínimos muchos-a-muchos en un grafo CSR compacto (scipy.sparse.csgraph si
+está instalado)
+"""
+
+import hashlib
+import heapq
+import os
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Optional, Sequence, Tuple
+from .distance_calculator import SpatialGrid, haversine_distances
+
+
+class RoadNetwork:
+    """
+    Grafo de carreteras no dirigido en formato CSR
+    
+    Los nodos son los vértices de las polilíneas (redondeados para unir
+    tramos que se tocan) y cada arista pesa su tiempo de recorrido en horas.
+    """
+    
+    def __init__(self, indptr: np.ndarray, indices: np.ndarray, weights: np.ndarray,
+                 lat: np.ndarray, lon: np.ndarray):
+        """
+        Inicializar la red
+        
+        Args:
+            indptr: Inicio de las aristas de cada nodo (n_nodos + 1,)
+            indices: Nodo destino de cada arista
+            weights: Tiempo de recorrido de cada arista en horas
+            lat, lon: Coordenadas de los nodos en grados
+        """
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+        self.lat = lat
+        self.lon = lon
+        self.n_nodes = len(lat)
+        self._grid = None
+    
+    @classmethod
+    def from_polylines(cls, polylines: Sequence[np.ndarray], speed_kmh=60.0,
+                       precision: int = 5) -> 'RoadNetwork':
+        """
+        Construir la red a partir de polilíneas
+        
+        Args:
+            polylines: Secuencia de arrays (m, 2) con columnas (lon, lat)
+            speed_kmh: Velocidad de circulación, única o una por polilínea
+            precision: Decimales para unir vértices coincidentes (5 ≈ 1 m)
+        
+        Returns:
+            RoadNetwork con aristas en ambos sentidos
+        """
+        polylines = [np.asarray(line, dtype=float).reshape(-1, 2) for line in polylines]
+        lengths = np.array([len(line) for line in polylines], dtype=np.int64)
+        if len(polylines) == 0 or lengths.sum() == 0:
+            raise ValueError("La capa de carreteras no contiene vértices")
+        speeds = np.broadcast_to(np.asarray(speed_kmh, dtype=float), (len(polylines),))
+        
+        # Nodos: vértices únicos tras redondear
+        vertices = np.round(np.concatenate(polylines), precision)
+        coords, node_of = np.unique(vertices, axis=0, return_inverse=True)
+        node_of = node_of.ravel()
+        
+        # Aristas entre vértices consecutivos de una misma polilínea
+        line_of = np.repeat(np.arange(len(polylines)), lengths)
+        consecutive = line_of[1:] == line_of[:-1]
+        u, v = node_of[:-1][consecutive], node_of[1:][consecutive]
+        speed = speeds[line_of[:-1][consecutive]]
+        keep = u != v
+        u, v, speed = u[keep], v[keep], speed[keep]
+        
+        length_km = haversine_distances(coords[u, 1], coords[u, 0], coords[v, 1], coords[v, 0])
+        hours = length_km / speed
+        
+        # Ambos sentidos; entre aristas paralelas se queda la más rápida
+        origins = np.concatenate([u, v])
+        targets = np.concatenate([v, u])
+        hours = np.concatenate([hours, hours])
+        order = np.lexsort((hours, targets, origins))
+        origins, targets, hours = origins[order], targets[order], hours[order]
+        first = np.ones(len(origins), dtype=bool)
+        first[1:] = (origins[1:] != origins[:-1]) | (targets[1:] != targets[:-1])
+        origins, targets, hours = origins[first], targets[first], hours[first]
+        
+        indptr = np.zeros(len(coords) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(origins, minlength=len(coords)), out=indptr[1:])
+        return cls(indptr, targets.astype(np.int32), hours.astype(np.float32),
+                   coords[:, 1].copy(), coords[:, 0].copy())
+    
+    @classmethod
+    def from_shapefile(cls, path: str, speed_kmh: float = 60.0,
+                       speed_column: Optional[str] = None,
+                       precision: int = 5) -> 'RoadNetwork':
+        """
+        Cargar una capa de líneas (LineString / MultiLineString) de carreteras
+        
+        Args:
+            path: Ruta del shapefile (p. ej. en data/raw)
+            speed_kmh: Velocidad por defecto
+            speed_column: Columna opcional con la velocidad de cada tramo en km/h
+            precision: Decimales para unir vértices coincidentes
+        
+        Returns:
+            RoadNetwork construida con from_polylines
+        """
+        import geopandas as gpd
+        
+        roads = gpd.read_file(path)
+        if roads.crs is not None and not roads.crs.is_geographic:
+            roads = roads.to_crs(epsg=4326)
+        
+        geometry_types = set(roads.geom_type.dropna())
+        if not geometry_types <= {'LineString', 'MultiLineString'}:
+            raise ValueError(f"{path} no es una capa de líneas "
+                             f"(geometrías: {', '.join(sorted(geometry_types))})")
+        
+        if speed_column is not None:
+            default_speeds = roads[speed_column].fillna(speed_kmh).to_numpy(dtype=float)
+        else:
+            default_speeds = np.full(len(roads), float(speed_kmh))
+        
+        polylines, speeds = [], []
+        for geometry, speed in zip(roads.geometry, default_speeds):
+            if geometry is None or geometry.is_empty:
+                continue
+            parts = geometry.geoms if geometry.geom_type == 'MultiLineString' else [geometry]
+            for part in parts:
+                polylines.append(np.asarray(part.coords)[:, :2])
+                speeds.append(speed if speed > 0 else speed_kmh)
+        
+        return cls.from_polylines(polylines, np.array(speeds), precision)
+    
+    def snap(self, lat: np.ndarray, lon: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Nodo de la red más cercano a cada punto
+        
+        Args:
+            lat, lon: Coordenadas en grados
+        
+        Returns:
+            Tupla (nodos, distancia_km al nodo)
+        """
+        if self._grid is None:
+            self._grid = SpatialGrid(self.lat, self.lon)
+        lat, lon = np.atleast_1d(lat), np.atleast_1d(lon)
+        nodes = self._grid.query(lat, lon, 1)[:, 0]
+        return nodes, haversine_distances(lat, lon, self.lat[nodes], self.lon[nodes])
+    
+    def shortest_paths(self, sources: np.ndarray, targets: np.ndarray,
+                       limit: float = np.inf, batch_cells: int = 20_000_000) -> np.ndarray:
+        """
+        Tiempos mínimos muchos-a-muchos
+        
+        Con scipy instalado se usa scipy.sparse.csgraph.dijkstra sobre el grafo
+        CSR con lotes de orígenes (cada lote produce un bloque de
+        len(lote) x n_nodos, acotado por batch_cells). Sin scipy se recurre a
+        _dijkstra_per_source, un Dijkstra en Python por origen.
+        
+        Args:
+            sources: Nodos de origen
+            targets: Nodos de destino
+            limit: Tiempo máximo a explorar en horas (más allá se da inf)
+            batch_cells: Celdas máximas del bloque de distancias de un lote
+        
+        Returns:
+            Matriz (len(sources), len(targets)) en horas (inf si no hay camino)
+        """
+        try:
+            from scipy.sparse import csr_matrix
+            from scipy.sparse.csgraph import dijkstra
+        except ImportError:
+            return self._dijkstra_per_source(sources, targets, limit)
+        
+        sources = np.asarray(sources)
+        targets = np.asarray(targets)
+        graph = csr_matrix((self.weights.astype(float), self.indices, self.indptr),
+                           shape=(self.n_nodes, self.n_nodes))
+        batch = max(1, batch_cells // max(self.n_nodes, 1))
+        
+        result = np.empty((len(sources), len(targets)))
+        for start in range(0, len(sources), batch):
+            distances = dijkstra(graph, directed=True, indices=sources[start:start + batch],
+                                 limit=limit)
+            result[start:start + batch] = distances[:, targets]
+        return result
+    
+    def _dijkstra_per_source(self, sources: np.ndarray, targets: np.ndarray,
+                             limit: float = np.inf) -> np.ndarray:
+        """
+        Respaldo sin scipy: un Dijkstra con heapq por cada origen (no es un
+        cálculo por lotes)
+        
+        Cada búsqueda se detiene en cuanto todos los destinos quedan fijados
+        o se supera `limit`, de modo que con destinos cercanos solo se explora
+        una parte de la red.
+        
+        Args:
+            sources: Nodos de origen
+            targets: Nodos de destino
+            limit: Tiempo máximo a explorar en horas
+        
+        Returns:
+            Matriz (len(sources), len(targets)) en horas (inf si no hay camino)
+        """
+        # Listas de Python: el acceso por elemento es mucho más rápido que en NumPy
+        indptr = self.indptr.tolist()
+        indices = self.indices.tolist()
+        weights = self.weights.astype(float).tolist()
+        targets = np.asarray(targets)
+        wanted = set(targets.tolist())
+        
+        result = np.full((len(sources), len(targets)), np.inf)
+        for row, source in enumerate(np.asarray(sources).tolist()):
+            settled = {}
+            best = {source: 0.0}
+            heap = [(0.0, source)]
+            remaining = len(wanted)
+            
+            while heap and remaining:
+                time, node = heapq.heappop(heap)
+                if time > limit:
+                    break
+                if node in settled:
+                    continue
+                settled[node] = time
+                if node in wanted:
+                    remaining -= 1
+                for edge in range(indptr[node], indptr[node + 1]):
+                    neighbor = indices[edge]
+                    candidate = time + weights[edge]
+                    if candidate < best.get(neighbor, np.inf):
+                        best[neighbor] = candidate
+                        heapq.heappush(heap, (candidate, neighbor))
+            
+            result[row] = [settled.get(node, np.inf) for node in targets.tolist()]
+        
+        return result
+
+
+def road_cache_key(coordinates_df: pd.DataFrame, shapefile: str, speed_kmh: float,
+                   speed_column: Optional[str]) -> str:
+    """
+    Clave de la matriz de red: coordenadas, huella del shapefile (tamaño y
+    fecha de modificación) y parámetros de velocidad
+    
+    Returns:
+        Clave hexadecimal de 16 caracteres
+    """
+    stat = os.stat(shapefile)
+    digest = hashlib.sha256()
+    coords = coordinates_df[['lat', 'lon']].to_numpy(dtype=np.float64)
+    digest.update(np.ascontiguousarray(coords).tobytes())
+    digest.update(f"{Path(shapefile).name}|{stat.st_size}|{stat.st_mtime_ns}|"
+                  f"{float(speed_kmh)!r}|{speed_column}".encode())
+    return digest.hexdigest()[:16]
+
+
+def road_time_matrix(network: RoadNetwork, lat: np.ndarray, lon: np.ndarray,
+                     avg_speed_kmh: float = 60) -> np.ndarray:
+    """
+    Matriz de tiempos entre paradas sobre la red
+    
+    Cada parada se une a su nodo más cercano con un tramo de acceso en línea
+    recta; los pares sin camino en la red usan la distancia de gran círculo.
+    
+    Args:
+        network: Red de carreteras
+        lat, lon: Coordenadas de las paradas en grados
+        avg_speed_kmh: Velocidad de los tramos de acceso y del respaldo
+    
+    Returns:
+        Matriz (n, n) en horas
+    """
+    lat, lon = np.asarray(lat, dtype=float), np.asarray(lon, dtype=float)
+    nodes, access_km = network.snap(lat, lon)
+    access = access_km / avg_speed_kmh
+    
+    unique_nodes, stop_of = np.unique(nodes, return_inverse=True)
+    paths = network.shortest_paths(unique_nodes, unique_nodes)
+    stop_of = stop_of.ravel()
+    matrix = access[:, None] + paths[np.ix_(stop_of, stop_of)] + access[None, :]
+    
+    unreachable = ~np.isfinite(matrix)
+    if unreachable.any():
+        print(f"⚠ {int(unreachable.sum())} pares sin camino en la red; "
+              f"se usa la distancia de gran círculo")
+        straight = haversine_distances(lat[:, None], lon[:, None], lat[None, :], lon[None, :])
+        matrix[unreachable] = straight[unreachable] / avg_speed_kmh
+    
+    np.fill_diagonal(matrix, 0.0)
+    return matrix
+
+
+def load_road_time_matrix(coordinates_df: pd.DataFrame, shapefile: str,
+                          avg_speed_kmh: float = 60,
+                          speed_column: Optional[str] = None,
+                          cache_dir: str = "data/processed") -> np.ndarray:
+    """
+    Cargar la matriz de tiempos por carretera desde la caché o construirla
+    
+    Args:
+        coordinates_df: DataFrame con columnas 'lat' y 'lon'
+        shapefile: Capa de líneas de carreteras (LineString/MultiLineString);
+            los shapefiles incluidos en data/raw son de puntos o polígonos
+        avg_speed_kmh: Velocidad por defecto de la red y de los tramos de acceso
+        speed_column: Columna opcional con la velocidad de cada tramo
+        cache_dir: Directorio de la caché
+    
+    Returns:
+        Matriz (n, n) en horas, mapeada en memoria (solo lectura)
+    """
+    key = road_cache_key(coordinates_df, shapefile, avg_speed_kmh, speed_column)
+    filename = Path(cache_dir) / f"matriz_tiempos_red_{key}.npy"
+    
+    if not filename.exists():
+        network = RoadNetwork.from_shapefile(shapefile, avg_speed_kmh, speed_column)
+        matrix = road_time_matrix(network, coordinates_df['lat'].to_numpy(),
+                                  coordinates_df['lon'].to_numpy(), avg_speed_kmh)
+        filename.parent.mkdir(parents=True, exist_ok=True)
+        temporary = filename.with_name(f"{filename.stem}.{os.getpid()}.tmp.npy")
+        np.save(temporary, matrix)
+        os.replace(temporary, filename)
+        print(f"✓ Matriz de tiempos por carretera guardada en: {filename}")
+    
+    return np.load(filename, mmap_mode='r')
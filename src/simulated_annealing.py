@@ -0,0 +1,245 @@
+"""
+Simulated Annealing Module
+Recocido simulado con Parallel Tempering (réplicas a distintas temperaturas
+en varios procesos con intercambio periódico) para TSP-TW
+"""
+
+import os
+import numpy as np
+from multiprocessing import Pool
+from typing import List, Optional, Tuple
+from .fitness_function import FitnessFunction
+from .time_windows import RouteTimeCalculator
+
+
+class ReplicaRunner:
+    """Ejecuta pasos de recocido a temperatura fija sobre una réplica"""
+    
+    def __init__(self, time_matrix: np.ndarray, start_time: float = 9.0):
+        """
+        Inicializar ejecutor de réplicas
+        
+        Args:
+            time_matrix: Matriz de tiempos de viaje entre ciudades (en horas)
+            start_time: Hora de inicio del viaje
+        """
+        self.route_calculator = RouteTimeCalculator(time_matrix, start_time)
+    
+    def run(self, route: np.ndarray, temperature: float, steps: int,
+            seed: int) -> Tuple[np.ndarray, float, np.ndarray, float]:
+        """
+        Ejecutar `steps` movimientos swap/Or-opt con criterio de Metropolis
+        
+        Cada candidato se evalúa solo desde la primera posición modificada
+        reutilizando el horario prefijo de la ruta actual.
+        
+        Args:
+            route: Ruta actual de la réplica (empezando en la ciudad de inicio)
+            temperature: Temperatura de la réplica
+            steps: Número de movimientos a intentar
+            seed: Semilla del generador aleatorio
+        
+        Returns:
+            Tupla (ruta_final, energia_final, mejor_ruta, mejor_energia)
+        """
+        rng = np.random.RandomState(seed)
+        calculator = self.route_calculator
+        route = route.copy()
+        n = len(route)
+        
+        times, penalties = calculator.get_schedule(route)
+        energy = times[-1] - calculator.start_time + penalties[-1]
+        best_route, best_energy = route.copy(), energy
+        
+        if n < 3:
+            return route, energy, best_route, best_energy
+        
+        for _ in range(steps):
+            if rng.random_sample() < 0.5:
+                # Swap de dos ciudades (nunca la ciudad de inicio)
+                i, j = rng.randint(1, n, size=2)
+                if i == j:
+                    continue
+                first, last = min(i, j), max(i, j)
+                candidate = route.copy()
+                candidate[i], candidate[j] = route[j], route[i]
+            else:
+                # Or-opt: reubicar un segmento de 1 a 3 ciudades
+                length = rng.randint(1, min(3, n - 2) + 1)
+                s = rng.randint(1, n - length + 1)
+                t = rng.randint(1, n - length + 1)
+                if s == t:
+                    continue
+                segment = route[s:s+length]
+                rest = np.concatenate([route[:s], route[s+length:]])
+                candidate = np.concatenate([rest[:t], segment, rest[t:]])
+                first, last = min(s, t), max(s, t) + length - 1
+            
+            candidate_energy = calculator.evaluate_from(
+                candidate, first, times, penalties, sync_position=last + 1
+            )
+            delta = candidate_energy - energy
+            
+            if delta <= 0 or rng.random_sample() < np.exp(-delta / temperature):
+                route = candidate
+                calculator.update_schedule(route, times, penalties, first, last + 1)
+                energy = candidate_energy
+                
+                if energy < best_energy - 1e-9:
+                    best_route, best_energy = route.copy(), energy
+        
+        return route, energy, best_route, best_energy
+
+
+_worker_runner = None
+
+
+def _init_worker(time_matrix: np.ndarray, start_time: float):
+    """Inicializar el ejecutor de réplicas en cada proceso del pool"""
+    global _worker_runner
+    _worker_runner = ReplicaRunner(time_matrix, start_time)
+
+
+def _run_replica(args):
+    """Ejecutar un segmento de recocido en un proceso del pool"""
+    return _worker_runner.run(*args)
+
+
+class ParallelTemperingSA:
+    """Recocido simulado con Parallel Tempering para resolver el TSP-TW"""
+    
+    def __init__(self,
+                 time_matrix: np.ndarray,
+                 start_city_index: int = 0,
+                 n_replicas: int = 8,
+                 iterations: int = 20000,
+                 exchange_interval: int = 500,
+                 min_temperature: float = 0.05,
+                 max_temperature: float = 20.0,
+                 start_time: float = 9.0,
+                 penalty_weight: float = 100.0,
+                 n_processes: Optional[int] = None):
+        """
+        Inicializar recocido simulado con Parallel Tempering
+        
+        Args:
+            time_matrix: Matriz de tiempos de viaje entre ciudades (en horas)
+            start_city_index: Índice de la ciudad de inicio (CDMX)
+            n_replicas: Número de réplicas (temperaturas)
+            iterations: Movimientos por réplica en total
+            exchange_interval: Movimientos entre intentos de intercambio
+            min_temperature: Temperatura de la réplica más fría
+            max_temperature: Temperatura de la réplica más caliente
+            start_time: Hora de inicio del viaje (default: 9:00 AM)
+            penalty_weight: Peso de penalización por violación de ventanas
+            n_processes: Procesos a usar (default: min(réplicas, CPUs));
+                1 ejecuta todo en el proceso actual
+        """
+        self.time_matrix = time_matrix
+        self.n_cities = len(time_matrix)
+        self.start_city_index = start_city_index
+        self.n_replicas = n_replicas
+        self.iterations = iterations
+        self.exchange_interval = exchange_interval
+        self.start_time = start_time
+        self.n_processes = n_processes or min(n_replicas, os.cpu_count() or 1)
+        
+        # Escalera geométrica de temperaturas (fría -> caliente)
+        self.temperatures = np.geomspace(min_temperature, max_temperature, n_replicas)
+        
+        self.fitness_func = FitnessFunction(
+            time_matrix=time_matrix,
+            start_city_index=start_city_index,
+            start_time=start_time,
+            penalty_weight=penalty_weight
+        )
+        
+        self.best_solution = None
+        self.best_fitness = float('inf')
+        self.fitness_history = []
+        self.exchange_rate = 0.0
+    
+    def initialize_replicas(self) -> List[np.ndarray]:
+        """
+        Crear una ruta aleatoria por réplica (empezando en la ciudad de inicio)
+        
+        Returns:
+            Lista de rutas iniciales
+        """
+        other_cities = [i for i in range(self.n_cities) if i != self.start_city_index]
+        return [np.concatenate([[self.start_city_index], np.random.permutation(other_cities)])
+                for _ in range(self.n_replicas)]
+    
+    def solve(self, verbose: bool = True) -> Tuple[np.ndarray, float, List[float]]:
+        """
+        Ejecutar el recocido con intercambio de réplicas
+        
+        Args:
+            verbose: Si mostrar progreso
+        
+        Returns:
+            Tupla con (mejor_ruta, mejor_fitness, historial_fitness)
+        """
+        routes = self.initialize_replicas()
+        energies = np.array([self.fitness_func.calculate_fitness(r) for r in routes])
+        n_rounds = max(1, self.iterations // self.exchange_interval)
+        attempts, accepted = 0, 0
+        
+        if verbose:
+            print(f"\n🔥 Iniciando Parallel Tempering SA para TSP-TW")
+            print(f"   Réplicas: {self.n_replicas} ({self.n_processes} procesos)")
+            print(f"   Temperaturas: {self.temperatures[0]:.3f} - {self.temperatures[-1]:.3f}")
+            print(f"   Rondas de intercambio: {n_rounds}\n")
+        
+        pool = None
+        if self.n_processes > 1:
+            pool = Pool(self.n_processes, initializer=_init_worker,
+                        initargs=(self.time_matrix, self.start_time))
+        else:
+            runner = ReplicaRunner(self.time_matrix, self.start_time)
+        
+        try:
+            for round_idx in range(n_rounds):
+                seeds = np.random.randint(0, 2**31 - 1, size=self.n_replicas)
+                tasks = [(routes[k], self.temperatures[k], self.exchange_interval, seeds[k])
+                         for k in range(self.n_replicas)]
+                
+                if pool is not None:
+                    results = pool.map(_run_replica, tasks)
+                else:
+                    results = [runner.run(*task) for task in tasks]
+                
+                for k, (route, energy, best_route, best_energy) in enumerate(results):
+                    routes[k], energies[k] = route, energy
+                    if best_energy < self.best_fitness:
+                        self.best_fitness = best_energy
+                        self.best_solution = best_route
+                
+                # Intercambio entre temperaturas vecinas (pares/impares alternados)
+                for k in range(round_idx % 2, self.n_replicas - 1, 2):
+                    attempts += 1
+                    beta_diff = 1 / self.temperatures[k] - 1 / self.temperatures[k + 1]
+                    log_ratio = (energies[k] - energies[k + 1]) * beta_diff
+                    if log_ratio >= 0 or np.random.random() < np.exp(log_ratio):
+                        routes[k], routes[k + 1] = routes[k + 1], routes[k]
+                        energies[k], energies[k + 1] = energies[k + 1], energies[k]
+                        accepted += 1
+                
+                self.fitness_history.append(self.best_fitness)
+                
+                if verbose and (round_idx + 1) % 10 == 0:
+                    print(f"   Ronda {round_idx + 1}/{n_rounds} - "
+                          f"Mejor tiempo: {self.best_fitness:.2f} horas")
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+        
+        self.exchange_rate = accepted / attempts if attempts else 0.0
+        
+        if verbose:
+            print(f"\n✓ Recocido completado")
+            print(f"   Mejor tiempo total: {self.best_fitness:.2f} horas")
+            print(f"   Tasa de intercambio: {self.exchange_rate:.1%}")
+        
+        return self.best_solution, self.best_fitness, self.fitness_history
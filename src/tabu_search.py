@@ -0,0 +1,197 @@
+"""
+Tabu Search Module
+Búsqueda tabú para TSP-TW con memoria de atributos (ciudad, posición),
+aspiración, listas de candidatos y memoria de frecuencia a largo plazo
+"""
+
+import numpy as np
+from typing import List, Optional, Tuple
+from .fitness_function import FitnessFunction
+
+
+class TabuSearch:
+    """Búsqueda tabú sobre vecindarios swap, Or-opt y 2-opt"""
+    
+    def __init__(self,
+                 time_matrix: np.ndarray,
+                 start_city_index: int = 0,
+                 iterations: int = 1000,
+                 tenure: Optional[int] = None,
+                 n_candidates: int = 6,
+                 sample_size: int = 12,
+                 diversification_weight: float = 0.5,
+                 start_time: float = 9.0,
+                 penalty_weight: float = 100.0):
+        """
+        Inicializar búsqueda tabú para TSP-TW
+        
+        Args:
+            time_matrix: Matriz de tiempos de viaje entre ciudades (en horas)
+            start_city_index: Índice de la ciudad de inicio (CDMX)
+            iterations: Número de iteraciones
+            tenure: Iteraciones que un atributo (ciudad, posición) permanece
+                tabú (default: n_cities // 4 + 3)
+            n_candidates: Vecinos más cercanos por ciudad (lista de candidatos)
+            sample_size: Ciudades exploradas por iteración
+            diversification_weight: Peso de la memoria de frecuencia en la
+                elección de movimientos que no mejoran
+            start_time: Hora de inicio del viaje (default: 9:00 AM)
+            penalty_weight: Peso de penalización por violación de ventanas
+        """
+        self.time_matrix = time_matrix
+        self.n_cities = len(time_matrix)
+        self.start_city_index = start_city_index
+        self.iterations = iterations
+        self.tenure = tenure if tenure is not None else self.n_cities // 4 + 3
+        self.sample_size = min(sample_size, self.n_cities - 1)
+        self.diversification_weight = diversification_weight
+        
+        self.fitness_func = FitnessFunction(
+            time_matrix=time_matrix,
+            start_city_index=start_city_index,
+            start_time=start_time,
+            penalty_weight=penalty_weight
+        )
+        
+        k = max(1, min(n_candidates, self.n_cities - 1))
+        masked = np.array(time_matrix, dtype=float, copy=True)
+        np.fill_diagonal(masked, np.inf)
+        self.neighbors = np.argsort(masked, axis=1)[:, :k]
+        
+        # Memorias: tabú a corto plazo y frecuencia a largo plazo (ciudad, posición)
+        self.tabu_until = np.zeros((self.n_cities, self.n_cities), dtype=np.int64)
+        self.frequency = np.zeros((self.n_cities, self.n_cities), dtype=np.int64)
+        
+        self.best_solution = None
+        self.best_fitness = float('inf')
+        self.fitness_history = []
+    
+    def initial_solution(self) -> np.ndarray:
+        """
+        Ruta inicial aleatoria que empieza en la ciudad de inicio
+        
+        Returns:
+            Ruta inicial
+        """
+        other_cities = [i for i in range(self.n_cities) if i != self.start_city_index]
+        return np.concatenate([[self.start_city_index], np.random.permutation(other_cities)])
+    
+    def generate_moves(self, route: np.ndarray, pos: np.ndarray):
+        """
+        Generar movimientos restringidos a la lista de candidatos
+        
+        Para una muestra de ciudades c y cada vecino cercano v se proponen:
+        intercambiar c y v, insertar c justo después de v (Or-opt) y la
+        inversión 2-opt que deja c junto a v.
+        
+        Yields:
+            Tuplas (ruta_candidata, primera_posicion, ultima_posicion)
+        """
+        n = self.n_cities
+        sample = np.random.choice(np.arange(1, n), self.sample_size, replace=False)
+        
+        for i in pos[route[sample]]:
+            city = route[i]
+            for v in self.neighbors[city]:
+                j = pos[v]
+                
+                # Swap
+                if j != 0:
+                    candidate = route.copy()
+                    candidate[i], candidate[j] = route[j], route[i]
+                    yield candidate, min(i, j), max(i, j)
+                
+                # Or-opt: insertar c después de v
+                if j != i - 1:
+                    rest = np.concatenate([route[:i], route[i+1:]])
+                    target = j + 1 if j < i else j
+                    candidate = np.concatenate([rest[:target], [city], rest[target:]])
+                    yield candidate, min(i, target), max(i, target)
+                
+                # 2-opt: dejar c adyacente a v
+                if j < i - 1:
+                    candidate = route.copy()
+                    candidate[j+1:i+1] = route[j+1:i+1][::-1]
+                    yield candidate, j + 1, i
+                elif j > i + 1:
+                    candidate = route.copy()
+                    candidate[i:j] = route[i:j][::-1]
+                    yield candidate, i, j - 1
+    
+    def solve(self, verbose: bool = True) -> Tuple[np.ndarray, float, List[float]]:
+        """
+        Ejecutar la búsqueda tabú
+        
+        Args:
+            verbose: Si mostrar progreso
+        
+        Returns:
+            Tupla con (mejor_ruta, mejor_fitness, historial_fitness)
+        """
+        calculator = self.fitness_func.route_calculator
+        route = self.initial_solution()
+        pos = np.empty(self.n_cities, dtype=np.int64)
+        pos[route] = np.arange(self.n_cities)
+        
+        times, penalties = calculator.get_schedule(route)
+        current = times[-1] - calculator.start_time + penalties[-1]
+        self.best_solution, self.best_fitness = route.copy(), current
+        
+        if verbose:
+            print(f"\n🚫 Iniciando Búsqueda Tabú para TSP-TW")
+            print(f"   Iteraciones: {self.iterations}")
+            print(f"   Tenencia tabú: {self.tenure}")
+            print(f"   Ciudad de inicio: índice {self.start_city_index}\n")
+        
+        for iteration in range(1, self.iterations + 1):
+            chosen = None
+            chosen_score = np.inf
+            
+            for candidate, first, last in self.generate_moves(route, pos):
+                value = calculator.evaluate_from(candidate, first, times, penalties,
+                                                 sync_position=last + 1)
+                
+                segment = slice(first, last + 1)
+                changed = np.nonzero(candidate[segment] != route[segment])[0] + first
+                is_tabu = (self.tabu_until[candidate[changed], changed] >= iteration).any()
+                
+                # Aspiración: se permite un movimiento tabú que mejora el mejor global
+                if is_tabu and value >= self.best_fitness - 1e-9:
+                    continue
+                
+                score = value
+                if value >= current:
+                    score += (self.diversification_weight
+                              * self.frequency[candidate[changed], changed].sum() / iteration)
+                
+                if score < chosen_score:
+                    chosen, chosen_score = (candidate, first, last, changed, value), score
+            
+            if chosen is None:
+                self.fitness_history.append(self.best_fitness)
+                continue
+            
+            candidate, first, last, changed, value = chosen
+            self.tabu_until[route[changed], changed] = iteration + self.tenure
+            self.frequency[candidate[changed], changed] += 1
+            
+            route = candidate
+            pos[route[changed]] = changed
+            calculator.update_schedule(route, times, penalties, first, last + 1)
+            current = value
+            
+            if current < self.best_fitness - 1e-9:
+                self.best_fitness = current
+                self.best_solution = route.copy()
+            
+            self.fitness_history.append(self.best_fitness)
+            
+            if verbose and iteration % 200 == 0:
+                print(f"   Iteración {iteration}/{self.iterations} - "
+                      f"Mejor tiempo: {self.best_fitness:.2f} horas")
+        
+        if verbose:
+            print(f"\n✓ Búsqueda tabú completada")
+            print(f"   Mejor tiempo total: {self.best_fitness:.2f} horas")
+        
+        return self.best_solution, self.best_fitness, self.fitness_history
@@ -0,0 +1,225 @@
+"""
+Time Dependent Module
+Tiempos de viaje dependientes de la hora de salida (franjas de congestión)
+para TSP-TW, con interpolación lineal por tramos que respeta FIFO
+"""
+
+import numpy as np
+from typing import Dict, Optional, Sequence, Tuple
+
+
+class TimeDependentTravelTimes:
+    """
+    Tensor de tiempos de viaje (n_franjas, n, n) con periodo diario
+    
+    T[s, i, j] es el tiempo de viaje de i a j saliendo al inicio de la franja
+    s; entre franjas el tiempo se interpola linealmente según la hora de
+    salida. Si entre franjas consecutivas el tiempo nunca baja más que la
+    duración de la franja, salir más tarde nunca hace llegar antes (FIFO).
+    """
+    
+    def __init__(self, tensor: np.ndarray):
+        """
+        Inicializar tiempos dependientes de la hora
+        
+        Args:
+            tensor: Array (n_franjas, n, n) en horas (puede ser np.memmap float32)
+        """
+        self.tensor = tensor
+        self.n_slots = tensor.shape[0]
+        self.n_cities = tensor.shape[1]
+        self.slot_hours = 24.0 / self.n_slots
+        self.shape = tensor.shape[1:]
+    
+    def __len__(self) -> int:
+        return self.n_cities
+    
+    def _slot_position(self, departure):
+        """Franja de salida y fracción transcurrida dentro de ella"""
+        position = (departure % 24) / self.slot_hours
+        slot = np.floor(position).astype(np.int64) % self.n_slots
+        return slot, position - np.floor(position)
+    
+    def travel_time(self, departure: float, from_city: int, to_city: int) -> float:
+        """
+        Tiempo de viaje de un tramo según la hora de salida
+        
+        Args:
+            departure: Hora de salida (horas desde las 00:00 del día 1)
+            from_city: Ciudad de origen
+            to_city: Ciudad de destino
+        
+        Returns:
+            Tiempo de viaje en horas
+        """
+        position = (departure % 24) / self.slot_hours
+        slot = int(position)
+        fraction = position - slot
+        slot %= self.n_slots
+        current = float(self.tensor[slot, from_city, to_city])
+        following = float(self.tensor[(slot + 1) % self.n_slots, from_city, to_city])
+        return current + fraction * (following - current)
+    
+    def travel_time_batch(self, departures: np.ndarray, from_cities: np.ndarray,
+                          to_cities: np.ndarray) -> np.ndarray:
+        """
+        Versión vectorizada de travel_time (los argumentos se difunden)
+        
+        Args:
+            departures: Horas de salida
+            from_cities: Ciudades de origen
+            to_cities: Ciudades de destino
+        
+        Returns:
+            Tiempos de viaje en horas
+        """
+        slot, fraction = self._slot_position(np.asarray(departures, dtype=float))
+        current = self.tensor[slot, from_cities, to_cities].astype(float)
+        following = self.tensor[(slot + 1) % self.n_slots, from_cities, to_cities]
+        return current + fraction * (following - current)
+    
+    def mean_matrix(self) -> np.ndarray:
+        """
+        Tiempo de viaje promedio del día por arco
+        
+        Returns:
+            Array (n, n) float64 (promedio de las franjas)
+        """
+        total = np.zeros(self.shape)
+        for s in range(self.n_slots):
+            total += self.tensor[s]
+        return total / self.n_slots
+    
+    def enforce_fifo(self) -> int:
+        """
+        Ajustar el tensor (en sitio) para garantizar la propiedad FIFO
+        
+        Se exige T[s+1] >= T[s] - duración_franja de forma cíclica, elevando
+        los valores de la franja siguiente cuando la caída es demasiado brusca.
+        
+        Returns:
+            Número de valores ajustados
+        """
+        adjusted = 0
+        # Dos vueltas bastan para propagar el ajuste a través del cierre del ciclo
+        for step in range(2 * self.n_slots):
+            s = step % self.n_slots
+            following = (s + 1) % self.n_slots
+            floor = self.tensor[s] - self.slot_hours
+            violations = self.tensor[following] < floor
+            count = int(violations.sum())
+            if count:
+                self.tensor[following] = np.maximum(self.tensor[following], floor)
+                adjusted += count
+        return adjusted
+    
+    def save(self, filename: str) -> None:
+        """
+        Guardar el tensor como .npy float32
+        
+        Args:
+            filename: Ruta del archivo de salida
+        """
+        output = np.lib.format.open_memmap(filename, mode='w+', dtype=np.float32,
+                                           shape=self.tensor.shape)
+        for s in range(self.n_slots):
+            output[s] = self.tensor[s]
+        output.flush()
+        del output
+        print(f"✓ Tiempos dependientes de la hora guardados en: {filename}")
+    
+    @classmethod
+    def load(cls, filename: str) -> 'TimeDependentTravelTimes':
+        """
+        Abrir un tensor guardado con save, mapeado en memoria (solo lectura)
+        
+        Args:
+            filename: Archivo .npy
+        
+        Returns:
+            TimeDependentTravelTimes sobre un np.memmap
+        """
+        return cls(np.load(filename, mmap_mode='r'))
+
+
+def rush_hour_profile(n_slots: int = 24,
+                      peaks: Sequence[Tuple[float, float]] = ((7.0, 10.0), (17.0, 20.0)),
+                      factor: float = 0.6) -> np.ndarray:
+    """
+    Perfil de velocidad relativa por franja con horas pico
+    
+    Args:
+        n_slots: Número de franjas del día
+        peaks: Intervalos (inicio, fin) de hora pico en horas del día
+        factor: Velocidad relativa en hora pico (1.0 = flujo libre)
+    
+    Returns:
+        Array (n_slots,) con la velocidad relativa al inicio de cada franja
+    """
+    starts = np.arange(n_slots) * 24.0 / n_slots
+    profile = np.ones(n_slots)
+    for begin, end in peaks:
+        profile[(starts >= begin) & (starts < end)] = factor
+    return profile
+
+
+def build_time_dependent_matrix(distance_matrix: np.ndarray,
+                                speed_profiles: np.ndarray,
+                                avg_speed_kmh: float = 60,
+                                filename: Optional[str] = None) -> TimeDependentTravelTimes:
+    """
+    Construir el tensor de tiempos a partir de distancias y perfiles de velocidad
+    
+    Args:
+        distance_matrix: Matriz (n, n) de distancias en km
+        speed_profiles: Velocidad relativa por franja, difundible a
+            (n_franjas, n, n): (n_franjas,) global, (n_franjas, n, 1) por
+            origen o (n_franjas, n, n) por arco
+        avg_speed_kmh: Velocidad de flujo libre
+        filename: Si se indica, el tensor se escribe franja a franja en un
+            .npy float32 mapeado en memoria
+    
+    Returns:
+        TimeDependentTravelTimes con FIFO garantizado
+    """
+    distance_matrix = np.asarray(distance_matrix)
+    speed_profiles = np.asarray(speed_profiles, dtype=float)
+    if speed_profiles.ndim == 1:
+        speed_profiles = speed_profiles[:, None, None]
+    n_slots = speed_profiles.shape[0]
+    n = len(distance_matrix)
+    shape = (n_slots, n, n)
+    
+    if filename is not None:
+        tensor = np.lib.format.open_memmap(filename, mode='w+', dtype=np.float32, shape=shape)
+    else:
+        tensor = np.empty(shape, dtype=np.float32)
+    
+    for s in range(n_slots):
+        tensor[s] = distance_matrix / (avg_speed_kmh * np.broadcast_to(speed_profiles[s], (n, n)))
+    
+    travel_times = TimeDependentTravelTimes(tensor)
+    travel_times.enforce_fifo()
+    if filename is not None:
+        tensor.flush()
+    return travel_times
+
+
+def congestion_profiles(n_cities: int, congested_cities: Dict[int, np.ndarray],
+                        n_slots: int = 24) -> np.ndarray:
+    """
+    Perfiles por origen: las salidas desde ciudades congestionadas (p. ej.
+    CDMX y Guadalajara) usan su perfil propio y el resto circula libre
+    
+    Args:
+        n_cities: Número de ciudades
+        congested_cities: {índice_ciudad: perfil (n_slots,)}
+        n_slots: Número de franjas
+    
+    Returns:
+        Array (n_slots, n_cities, 1) para build_time_dependent_matrix
+    """
+    profiles = np.ones((n_slots, n_cities, 1))
+    for city, profile in congested_cities.items():
+        profiles[:, city, 0] = profile
+    return profiles
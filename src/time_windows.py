@@ -4,7 +4,7 @@ Manejo de ventanas de tiempo para TSP-TW
 """
 
 from datetime import datetime, timedelta
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 import numpy as np
 
 
@@ -91,6 +91,23 @@ class TimeWindow:
         return 0.0
 
 
+def static_matrix(time_matrix) -> np.ndarray:
+    """
+    Matriz (n, n) de referencia para heurísticas que no dependen de la hora
+    (visibilidad, cercanía, ahorros aproximados)
+    
+    Args:
+        time_matrix: Matriz de tiempos o TimeDependentTravelTimes
+        
+    Returns:
+        La matriz como array float, o el promedio diario por arco si los
+        tiempos dependen de la hora
+    """
+    if hasattr(time_matrix, 'travel_time_batch'):
+        return time_matrix.mean_matrix()
+    return np.asarray(time_matrix, dtype=float)
+
+
 class RouteTimeCalculator:
     """Calculador de tiempos para rutas con ventanas de tiempo"""
     
@@ -99,12 +116,47 @@ class RouteTimeCalculator:
         Inicializar calculador de tiempos de ruta
         
         Args:
-            time_matrix: Matriz de tiempos de viaje entre ciudades
+            time_matrix: Matriz de tiempos de viaje entre ciudades, o un
+                TimeDependentTravelTimes para tiempos según la hora de salida
             start_time: Hora de inicio del viaje (default: 9:00 AM)
         """
         self.time_matrix = time_matrix
         self.start_time = start_time
         self.time_window = TimeWindow()
+        self.time_dependent = hasattr(time_matrix, 'travel_time_batch')
+    
+    def travel_time(self, departure: float, from_city: int, to_city: int) -> float:
+        """
+        Tiempo de viaje de un tramo (constante o según la hora de salida)
+        
+        Args:
+            departure: Hora de salida de la ciudad de origen
+            from_city: Ciudad de origen
+            to_city: Ciudad de destino
+            
+        Returns:
+            Tiempo de viaje en horas
+        """
+        if self.time_dependent:
+            return self.time_matrix.travel_time(departure, from_city, to_city)
+        return self.time_matrix[from_city, to_city]
+    
+    def travel_time_batch(self, departures: np.ndarray, from_cities: np.ndarray,
+                          to_cities: np.ndarray) -> np.ndarray:
+        """
+        Versión vectorizada de travel_time (los argumentos se difunden)
+        
+        Args:
+            departures: Horas de salida
+            from_cities: Ciudades de origen
+            to_cities: Ciudades de destino
+            
+        Returns:
+            Tiempos de viaje en horas
+        """
+        if self.time_dependent:
+            return self.time_matrix.travel_time_batch(departures, from_cities, to_cities)
+        return self.time_matrix[from_cities, to_cities] + np.zeros(np.shape(departures))
         
     def calculate_route_time(self, route: List[int], 
                             include_waiting: bool = True,
@@ -130,7 +182,7 @@ class RouteTimeCalculator:
             to_city = route[i + 1]
             
             # Tiempo de viaje entre ciudades
-            travel_time = self.time_matrix[from_city, to_city]
+            travel_time = self.travel_time(current_time, from_city, to_city)
             total_travel_time += travel_time
             
             # Actualizar tiempo actual
@@ -151,6 +203,182 @@ class RouteTimeCalculator:
         
         return total_time, total_waiting_time, total_penalty
     
+    def advance(self, current_time: float, from_city: int, to_city: int) -> Tuple[float, float]:
+        """
+        Avanzar un tramo de la ruta (viaje + espera + penalización)
+        
+        Args:
+            current_time: Hora actual en la ciudad de origen
+            from_city: Ciudad de origen
+            to_city: Ciudad de destino
+            
+        Returns:
+            Tupla (hora_tras_espera_en_destino, penalizacion_del_tramo)
+        """
+        if self.time_dependent:
+            current_time += self.time_matrix.travel_time(current_time, from_city, to_city)
+        else:
+            current_time += self.time_matrix[from_city, to_city]
+        current_time += self.time_window.calculate_waiting_time(current_time)
+        return current_time, self.time_window.calculate_penalty(current_time)
+    
+    def advance_batch(self, current_times: np.ndarray, from_cities: np.ndarray,
+                      to_cities: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Versión vectorizada de advance para muchos tramos a la vez
+        (mismas reglas de espera y penalización que TimeWindow)
+        
+        Args:
+            current_times: Horas actuales en las ciudades de origen
+            from_cities: Ciudades de origen
+            to_cities: Ciudades de destino (los tres argumentos se difunden;
+                los tiempos se obtienen con travel_time_batch)
+            
+        Returns:
+            Tupla (horas_tras_espera, penalizaciones) como arrays
+        """
+        return self.arrive_batch(current_times + self.travel_time_batch(current_times, from_cities,
+                                                                        to_cities))
+    
+    def arrive_batch(self, arrival: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Aplicar espera y penalización a horas de llegada ya calculadas
+        (para quien también necesita los tiempos de viaje de advance_batch)
+        
+        Args:
+            arrival: Horas de llegada (antes de esperar)
+            
+        Returns:
+            Tupla (horas_tras_espera, penalizaciones) como arrays
+        """
+        window = self.time_window
+        
+        with np.errstate(invalid='ignore'):
+            time_of_day = arrival % 24
+            waiting = np.where(time_of_day < window.opening_hour,
+                               window.opening_hour - time_of_day,
+                               np.where(time_of_day > window.closing_hour,
+                                        (24 - time_of_day) + window.opening_hour,
+                                        0.0))
+            current = arrival + waiting
+            
+            time_of_day = current % 24
+            penalty = np.where(time_of_day > window.closing_hour,
+                               100.0 * (time_of_day - window.closing_hour),
+                               np.where(time_of_day < window.opening_hour,
+                                        100.0 * (window.opening_hour - time_of_day) * 0.5,
+                                        0.0))
+        return current, penalty
+    
+    def get_schedule(self, route: List[int]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Calcular el horario prefijo de una ruta (con esperas y penalizaciones)
+        
+        times[k] es la hora tras llegar (y esperar) a route[k] y penalties[k]
+        la penalización acumulada hasta route[k]. El tiempo total de la ruta
+        es times[-1] - start_time + penalties[-1].
+        
+        Args:
+            route: Lista de índices de ciudades en orden de visita
+            
+        Returns:
+            Tupla (times, penalties) con arrays de longitud len(route)
+        """
+        times = np.empty(len(route))
+        penalties = np.empty(len(route))
+        current_time = self.start_time
+        total_penalty = 0.0
+        times[0] = current_time
+        penalties[0] = 0.0
+        
+        for k in range(1, len(route)):
+            current_time, penalty = self.advance(current_time, route[k - 1], route[k])
+            total_penalty += penalty
+            times[k] = current_time
+            penalties[k] = total_penalty
+        
+        return times, penalties
+    
+    def evaluate_from(self, route: np.ndarray, position: int,
+                      times: np.ndarray, penalties: np.ndarray,
+                      sync_position: Optional[int] = None,
+                      sync_offset: int = 0) -> float:
+        """
+        Evaluar una ruta candidata reutilizando el horario prefijo de otra
+        
+        La ruta candidata debe coincidir con la ruta de referencia (la que
+        generó times/penalties) antes de `position` y a partir de
+        `sync_position`. Si en la parte común final la hora coincide con la
+        de referencia, el resto del horario es idéntico y se corta el cálculo.
+        
+        Args:
+            route: Ruta candidata completa
+            position: Primera posición que difiere de la referencia
+            times: Horario prefijo de la ruta de referencia
+            penalties: Penalizaciones acumuladas de la ruta de referencia
+            sync_position: Posición desde la que la candidata vuelve a
+                coincidir con la referencia (default: sin coincidencia)
+            sync_offset: Desplazamiento del sufijo común: route[k] coincide
+                con route_referencia[k - sync_offset] (1 tras una inserción)
+            
+        Returns:
+            Tiempo total de la ruta candidata (viaje + espera + penalización)
+        """
+        n = len(route)
+        if sync_position is None:
+            sync_position = n
+        
+        current_time = times[position - 1]
+        total_penalty = penalties[position - 1]
+        
+        for k in range(position, n):
+            current_time, penalty = self.advance(current_time, route[k - 1], route[k])
+            total_penalty += penalty
+            
+            # Mismo sufijo y misma hora: el resto del horario es el de referencia
+            if k >= sync_position and current_time == times[k - sync_offset]:
+                total_penalty += penalties[-1] - penalties[k - sync_offset]
+                current_time = times[-1]
+                break
+        
+        return current_time - self.start_time + total_penalty
+    
+    def update_schedule(self, route: np.ndarray, times: np.ndarray,
+                        penalties: np.ndarray, position: int,
+                        sync_position: Optional[int] = None) -> None:
+        """
+        Actualizar en sitio el horario prefijo tras modificar la ruta
+        
+        Mismo contrato que evaluate_from: la ruta ya modificada coincide con
+        la anterior antes de `position` y a partir de `sync_position`.
+        
+        Args:
+            route: Ruta modificada completa
+            times: Horario prefijo de la ruta anterior (se actualiza)
+            penalties: Penalizaciones acumuladas de la ruta anterior (se actualiza)
+            position: Primera posición modificada
+            sync_position: Posición desde la que la ruta vuelve a coincidir
+        """
+        n = len(route)
+        if sync_position is None:
+            sync_position = n
+        
+        current_time = times[position - 1]
+        total_penalty = penalties[position - 1]
+        
+        for k in range(position, n):
+            current_time, penalty = self.advance(current_time, route[k - 1], route[k])
+            total_penalty += penalty
+            
+            if k >= sync_position and current_time == times[k]:
+                shift = total_penalty - penalties[k]
+                if shift:
+                    penalties[k:] += shift
+                break
+            
+            times[k] = current_time
+            penalties[k] = total_penalty
+    
     def get_arrival_times(self, route: List[int]) -> List[float]:
         """
         Obtener tiempos de llegada a cada ciudad en la ruta
@@ -169,7 +397,7 @@ class RouteTimeCalculator:
             to_city = route[i + 1]
             
             # Tiempo de viaje
-            travel_time = self.time_matrix[from_city, to_city]
+            travel_time = self.travel_time(current_time, from_city, to_city)
             current_time += travel_time
             
             # Tiempo de espera si llega antes de apertura
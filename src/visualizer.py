@@ -3,12 +3,235 @@ Visualizer Module - Actualizado para TSP-TW
 Visualización de rutas y resultados con tiempos y ventanas
 """
 
-import matplotlib.pyplot as plt
+import hashlib
+import os
 import numpy as np
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, Sequence, Tuple
 import json
+from .convergence_history import ConvergenceHistory
+from .data_loader import iter_polygon_features
+
+
+def _pyplot():
+    """Importar matplotlib.pyplot solo al graficar (evita su costo al importar el módulo)"""
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def simplify_ring(points: np.ndarray, tolerance: float) -> np.ndarray:
+    """
+    Simplificar una polilínea con Douglas-Peucker (iterativo)
+    
+    Args:
+        points: Vértices (m, 2)
+        tolerance: Desviación máxima permitida (en grados)
+        
+    Returns:
+        Vértices conservados, incluidos el primero y el último
+    """
+    keep = np.zeros(len(points), dtype=bool)
+    keep[[0, -1]] = True
+    stack = [(0, len(points) - 1)]
+    
+    while stack:
+        first, last = stack.pop()
+        if last <= first + 1:
+            continue
+        inner = points[first + 1:last] - points[first]
+        direction = points[last] - points[first]
+        length = np.hypot(*direction)
+        if length > 0:
+            deviation = np.abs(direction[0] * inner[:, 1] - direction[1] * inner[:, 0]) / length
+        else:
+            deviation = np.hypot(inner[:, 0], inner[:, 1])  # anillo cerrado
+        farthest = int(np.argmax(deviation))
+        if deviation[farthest] > tolerance:
+            split = first + 1 + farthest
+            keep[split] = True
+            stack.extend([(first, split), (split, last)])
+    
+    return points[keep]
+
+
+def load_basemap(shapefile: str = "data/raw/México_Estados.shp", tolerance: float = 0.02,
+                 cache_dir: str = "data/processed/cache") -> np.ndarray:
+    """
+    Contornos estatales simplificados como un solo array de vértices
+    
+    Los anillos se separan con filas NaN, de modo que todo el mapa base se
+    dibuja con una única línea. El resultado se guarda en un .npz cuya clave
+    incluye tamaño y fecha de modificación del shapefile y la tolerancia.
+    
+    Args:
+        shapefile: Capa de polígonos estatales
+        tolerance: Tolerancia de Douglas-Peucker en grados
+        cache_dir: Directorio de la caché
+        
+    Returns:
+        Array float32 (m, 2) con columnas (lon, lat)
+    """
+    shapefile = Path(shapefile)
+    stat = shapefile.stat()
+    key = hashlib.sha256(f"{shapefile.name}|{stat.st_size}|{stat.st_mtime_ns}|"
+                         f"{float(tolerance)!r}".encode()).hexdigest()[:16]
+    cache_file = Path(cache_dir) / f"mapa_base_{key}.npz"
+    if cache_file.exists():
+        with np.load(cache_file) as cached:
+            return cached['outline']
+    
+    pieces = []
+    for rings, _ in iter_polygon_features(shapefile, fields=()):
+        for ring in rings:
+            pieces.append(simplify_ring(ring, tolerance))
+            pieces.append(np.full((1, 2), np.nan))
+    outline = np.concatenate(pieces).astype(np.float32)
+    
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    temporary = cache_file.with_name(f"{cache_file.stem}.{os.getpid()}.tmp.npz")
+    np.savez(temporary, outline=outline)
+    os.replace(temporary, cache_file)
+    return outline
+
+
+class BatchRouteRenderer:
+    """
+    Renderizador de mapas de rutas sin interfaz gráfica
+    
+    Usa una única figura Agg (sin pyplot) cuyos artistas se crean una vez y
+    se actualizan con set_data en cada ruta; el mapa base simplificado se
+    dibuja una sola vez y las coordenadas se indexan vectorialmente.
+    """
+    
+    def __init__(self, coordinates_df: pd.DataFrame, output_dir: str = "results/graficas",
+                 basemap: Optional[np.ndarray] = None, dpi: int = 100,
+                 figsize: Tuple[float, float] = (10, 8)):
+        """
+        Args:
+            coordinates_df: DataFrame con columnas 'lat' y 'lon'
+            output_dir: Directorio de las imágenes
+            basemap: Contornos de load_basemap (None para omitirlos)
+            dpi: Resolución de salida
+            figsize: Tamaño de la figura en pulgadas
+        """
+        self.lat = coordinates_df['lat'].to_numpy(dtype=float)
+        self.lon = coordinates_df['lon'].to_numpy(dtype=float)
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.basemap = basemap
+        self.dpi = dpi
+        self.figsize = figsize
+        self.figure = None
+    
+    def _setup_figure(self) -> None:
+        """Crear la figura y sus artistas (una vez por proceso)"""
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+        
+        self.figure = Figure(figsize=self.figsize, dpi=self.dpi)
+        FigureCanvasAgg(self.figure)
+        ax = self.figure.add_subplot(1, 1, 1)
+        
+        if self.basemap is not None:
+            ax.plot(self.basemap[:, 0], self.basemap[:, 1], color='0.6', linewidth=0.6)
+        self.route_line, = ax.plot([], [], 'b-', linewidth=1.5, alpha=0.6, label='Ruta')
+        self.stops, = ax.plot([], [], 'ro', markersize=4)
+        self.start, = ax.plot([], [], 'g*', markersize=14, markeredgecolor='black',
+                              label='CDMX (Inicio/Fin)')
+        
+        # Límites fijos: todas las rutas comparten encuadre
+        lon = self.lon if self.basemap is None else np.concatenate([self.lon, self.basemap[:, 0]])
+        lat = self.lat if self.basemap is None else np.concatenate([self.lat, self.basemap[:, 1]])
+        margin = 0.5
+        ax.set_xlim(np.nanmin(lon) - margin, np.nanmax(lon) + margin)
+        ax.set_ylim(np.nanmin(lat) - margin, np.nanmax(lat) + margin)
+        ax.set_aspect('equal', adjustable='datalim')
+        ax.set_xlabel('Longitud')
+        ax.set_ylabel('Latitud')
+        ax.grid(True, alpha=0.3)
+        ax.legend(loc='lower left', fontsize=8)
+        self.axes = ax
+    
+    def render(self, route: np.ndarray, filename: str, title: str = "Ruta TSP-TW",
+               time_hours: Optional[float] = None) -> Path:
+        """
+        Dibujar una ruta y guardarla como PNG
+        
+        Args:
+            route: Orden de ciudades
+            filename: Nombre del archivo en output_dir
+            title: Título de la gráfica
+            time_hours: Tiempo total de la ruta en horas
+            
+        Returns:
+            Ruta del archivo generado
+        """
+        if self.figure is None:
+            self._setup_figure()
+        
+        route = np.asarray(route)
+        closed = np.append(route, route[0])
+        self.route_line.set_data(self.lon[closed], self.lat[closed])
+        self.stops.set_data(self.lon[route], self.lat[route])
+        self.start.set_data(self.lon[route[:1]], self.lat[route[:1]])
+        
+        if time_hours is not None:
+            title += f"\nTiempo total: {time_hours:.2f} horas ({time_hours / 24:.2f} días)"
+        self.axes.set_title(title, fontsize=12, fontweight='bold')
+        
+        output_path = self.output_dir / filename
+        self.figure.savefig(output_path, dpi=self.dpi)
+        return output_path
+    
+    def render_many(self, routes: Sequence[np.ndarray], filenames: Sequence[str],
+                    titles: Optional[Sequence[str]] = None,
+                    times: Optional[Sequence[float]] = None,
+                    processes: int = 1) -> List[Path]:
+        """
+        Dibujar muchas rutas, opcionalmente en un pool de procesos
+        
+        Cada proceso crea su propia figura una sola vez y la reutiliza para
+        su parte de las rutas.
+        
+        Args:
+            routes: Rutas a dibujar
+            filenames: Nombre de archivo de cada ruta
+            titles: Título de cada ruta (default: "Ruta TSP-TW")
+            times: Tiempo total de cada ruta en horas
+            processes: Procesos de trabajo (1 = en este proceso)
+            
+        Returns:
+            Rutas de los archivos generados, en el orden de entrada
+        """
+        titles = titles if titles is not None else ["Ruta TSP-TW"] * len(routes)
+        times = times if times is not None else [None] * len(routes)
+        jobs = [(np.asarray(r), f, t, h) for r, f, t, h in zip(routes, filenames, titles, times)]
+        
+        if processes <= 1:
+            return [self.render(*job) for job in jobs]
+        
+        state = (self.lat, self.lon, str(self.output_dir), self.basemap, self.dpi, self.figsize)
+        chunksize = max(1, len(jobs) // (4 * processes))
+        with ProcessPoolExecutor(processes, initializer=_init_render_worker,
+                                 initargs=(state,)) as pool:
+            return list(pool.map(_render_job, jobs, chunksize=chunksize))
+
+
+# Renderizador de cada proceso del pool (se crea en el inicializador)
+_worker_renderer = None
+
+
+def _init_render_worker(state) -> None:
+    global _worker_renderer
+    lat, lon, output_dir, basemap, dpi, figsize = state
+    _worker_renderer = BatchRouteRenderer(pd.DataFrame({'lat': lat, 'lon': lon}), output_dir,
+                                          basemap=basemap, dpi=dpi, figsize=figsize)
+
+
+def _render_job(job) -> Path:
+    return _worker_renderer.render(*job)
 
 
 class TSPTWVisualizer:
@@ -37,15 +260,13 @@ class TSPTWVisualizer:
             filename: Nombre del archivo para guardar
             time_hours: Tiempo total de la ruta en horas
         """
+        plt = _pyplot()
         plt.figure(figsize=(14, 10))
         
-        # Obtener coordenadas de la ruta
-        lats = [self.coordinates.iloc[city]['lat'] for city in route]
-        lons = [self.coordinates.iloc[city]['lon'] for city in route]
-        
-        # Cerrar el ciclo
-        lats.append(lats[0])
-        lons.append(lons[0])
+        # Obtener coordenadas de la ruta (indexación vectorizada) y cerrar el ciclo
+        closed = np.append(route, route[0])
+        lats = self.coordinates['lat'].to_numpy()[closed]
+        lons = self.coordinates['lon'].to_numpy()[closed]
         
         # Plotear ruta
         plt.plot(lons, lats, 'b-', linewidth=2, alpha=0.6, label='Ruta')
@@ -82,6 +303,33 @@ class TSPTWVisualizer:
         else:
             plt.show()
     
+    def render_routes(self, routes: Sequence[np.ndarray], filenames: Sequence[str],
+                      titles: Optional[Sequence[str]] = None,
+                      times: Optional[Sequence[float]] = None,
+                      processes: int = 1, dpi: int = 100,
+                      states_shapefile: Optional[str] = "data/raw/México_Estados.shp") -> List[Path]:
+        """
+        Generar mapas de muchas rutas en lote (p. ej. una por ejecución)
+        
+        Args:
+            routes: Rutas a dibujar
+            filenames: Nombre de archivo de cada ruta
+            titles: Título de cada ruta
+            times: Tiempo total de cada ruta en horas
+            processes: Procesos de trabajo para el renderizado
+            dpi: Resolución de salida
+            states_shapefile: Capa de estados para el mapa base (None para omitirlo)
+            
+        Returns:
+            Rutas de los archivos generados
+        """
+        basemap = load_basemap(states_shapefile) if states_shapefile else None
+        renderer = BatchRouteRenderer(self.coordinates, str(self.output_dir),
+                                      basemap=basemap, dpi=dpi)
+        paths = renderer.render_many(routes, filenames, titles, times, processes)
+        print(f"✓ {len(paths)} mapas de rutas guardados en: {self.output_dir}")
+        return paths
+    
     def plot_convergence(self, fitness_history: List[float], 
                         title: str = "Convergencia del Algoritmo Genético TSP-TW",
                         filename: Optional[str] = None):
@@ -93,6 +341,7 @@ class TSPTWVisualizer:
             title: Título de la gráfica
             filename: Nombre del archivo para guardar
         """
+        plt = _pyplot()
         plt.figure(figsize=(12, 7))
         
         generations = range(1, len(fitness_history) + 1)
@@ -122,6 +371,7 @@ class TSPTWVisualizer:
             title: Título de la gráfica
             filename: Nombre del archivo para guardar
         """
+        plt = _pyplot()
         plt.figure(figsize=(14, 8))
         
         colors = plt.cm.tab10(np.linspace(0, 1, len(all_fitness_histories)))
@@ -168,6 +418,7 @@ class TSPTWVisualizer:
             title: Título de la gráfica
             filename: Nombre del archivo para guardar
         """
+        plt = _pyplot()
         plt.figure(figsize=(10, 7))
         
         bp = plt.boxplot([all_fitness_values], vert=True, patch_artist=True,
@@ -215,7 +466,7 @@ class TSPTWVisualizer:
         
         # Cargar datos
         stats_file = results_dir / "estadisticas.json"
-        convergence_file = results_dir / "convergencias.csv"
+        convergence_file = results_dir / "convergencias.npz"
         route_file = results_dir / "mejor_ruta.csv"
         
         with open(stats_file, 'r') as f:
@@ -224,12 +475,19 @@ class TSPTWVisualizer:
         stats = data['statistics']
         all_values = data['all_fitness_values']
         
-        convergence_df = pd.read_csv(convergence_file)
+        if convergence_file.exists():
+            convergence = ConvergenceHistory.load(convergence_file)
+        else:
+            # Resultados anteriores: filas CSV por (ejecución, generación)
+            convergence_df = pd.read_csv(results_dir / "convergencias.csv")
+            groups = convergence_df.groupby('run')['best_fitness']
+            convergence = ConvergenceHistory.from_histories(
+                [group.to_numpy() for _, group in groups], run_ids=list(groups.groups))
         route_df = pd.read_csv(route_file)
         
         # 1. Gráfica de convergencia de la mejor ejecución
         best_run = stats['best_run']
-        best_convergence = convergence_df[convergence_df['run'] == best_run]['best_fitness'].tolist()
+        best_convergence = convergence.run(best_run).tolist()
         self.plot_convergence(
             best_convergence,
             title=f"Convergencia - Mejor Ejecución (Run {best_run})",
@@ -237,14 +495,11 @@ class TSPTWVisualizer:
         )
         
         # 2. Comparación de todas las ejecuciones
-        all_histories = []
-        for run in range(1, 11):
-            history = convergence_df[convergence_df['run'] == run]['best_fitness'].tolist()
-            all_histories.append(history)
+        all_histories = [history.tolist() for history in convergence.histories()]
         
         self.plot_multiple_runs(
             all_histories,
-            title="Comparación de 10 Ejecuciones Independientes",
+            title=f"Comparación de {len(convergence)} Ejecuciones Independientes",
             filename="comparacion_10_runs.png"
         )
         
@@ -0,0 +1,178 @@
+"""
+Variable Neighborhood Search Module
+Búsqueda de Vecindario Variable (VNS) con descenso VND que combina los
+mecanismos de mejora existentes del proyecto
+"""
+
+import time
+import numpy as np
+from typing import Callable, List, Optional, Tuple
+from .fitness_function import FitnessFunction
+from .lin_kernighan import LinKernighan
+from .local_search import LocalSearch
+from .operators import GeneticOperators
+
+
+class VariableNeighborhoodSearch:
+    """VNS general: agitación con mutaciones + VND sobre vecindarios crecientes"""
+    
+    SHAKING_METHODS = ['swap', 'inversion', 'scramble']
+    
+    def __init__(self,
+                 time_matrix: np.ndarray,
+                 start_city_index: int = 0,
+                 time_limit: float = 30.0,
+                 max_iterations: int = 1000,
+                 k_max: int = 6,
+                 use_lin_kernighan: bool = True,
+                 start_time: float = 9.0,
+                 penalty_weight: float = 100.0):
+        """
+        Inicializar VNS para TSP-TW
+        
+        Args:
+            time_matrix: Matriz de tiempos de viaje entre ciudades (en horas)
+            start_city_index: Índice de la ciudad de inicio (CDMX)
+            time_limit: Presupuesto de tiempo de reloj en segundos
+            max_iterations: Máximo de iteraciones de agitación + VND
+            k_max: Intensidad máxima de agitación (número de mutaciones)
+            use_lin_kernighan: Si incluir LK como último vecindario del VND
+            start_time: Hora de inicio del viaje (default: 9:00 AM)
+            penalty_weight: Peso de penalización por violación de ventanas
+        """
+        self.time_matrix = time_matrix
+        self.n_cities = len(time_matrix)
+        self.start_city_index = start_city_index
+        self.time_limit = time_limit
+        self.max_iterations = max_iterations
+        self.k_max = k_max
+        
+        # FitnessFunction compartida por todos los vecindarios: cada uno
+        # re-evalúa los movimientos desde la primera posición modificada con
+        # el horario prefijo de su route_calculator
+        self.fitness_func = FitnessFunction(
+            time_matrix=time_matrix,
+            start_city_index=start_city_index,
+            start_time=start_time,
+            penalty_weight=penalty_weight
+        )
+        self.local_search = LocalSearch(time_matrix, fitness_function=self.fitness_func)
+        self.operators = GeneticOperators(mutation_rate=1.0, start_city_index=start_city_index)
+        
+        # Vecindarios del VND en orden creciente de costo; todos reciben el
+        # deadline para cortar su búsqueda al agotar el presupuesto
+        self.neighborhoods: List[Tuple[str, Callable]] = [
+            ('remoción de abruptos', lambda r: self.local_search.abrupt_removal(
+                r, m=5, max_iterations=1, deadline=self._deadline)),
+            ('2-opt con ventanas', lambda r: self.local_search.optimize_time_windows(
+                r, deadline=self._deadline)),
+        ]
+        if use_lin_kernighan:
+            lk = LinKernighan(time_matrix, start_city_index=start_city_index,
+                              fitness_function=self.fitness_func)
+            self.neighborhoods.append(('Lin-Kernighan', lambda r: lk.optimize(r, self._deadline)))
+        
+        self.best_solution = None
+        self.best_fitness = float('inf')
+        self.fitness_history = []
+        self._deadline = None
+    
+    def shake(self, route: np.ndarray, k: int) -> np.ndarray:
+        """
+        Agitación de intensidad k: k mutaciones de GeneticOperators
+        (swap, inversión y mezcla según el nivel)
+        
+        Args:
+            route: Ruta a perturbar
+            k: Intensidad (1..k_max)
+        
+        Returns:
+            Ruta perturbada que empieza en la ciudad de inicio
+        """
+        shaken = route.copy()
+        method = self.SHAKING_METHODS[(k - 1) % len(self.SHAKING_METHODS)]
+        for _ in range(k):
+            shaken = self.operators.mutate(shaken, method=method)
+        return self.fitness_func._ensure_start_end_city(shaken)
+    
+    def variable_neighborhood_descent(self, route: np.ndarray) -> Tuple[np.ndarray, float]:
+        """
+        VND: aplicar vecindarios en orden y volver al primero tras cada mejora
+        
+        Args:
+            route: Ruta inicial
+        
+        Returns:
+            Tupla con (ruta_mejorada, fitness)
+        """
+        route = self.fitness_func._ensure_start_end_city(np.asarray(route))
+        value = self.fitness_func.calculate_fitness(route)
+        k = 0
+        
+        while k < len(self.neighborhoods) and not self._out_of_time():
+            _, neighborhood = self.neighborhoods[k]
+            candidate, candidate_value = neighborhood(route)
+            
+            if candidate_value < value - 1e-9:
+                route, value = candidate, candidate_value
+                k = 0
+            else:
+                k += 1
+        
+        return route, value
+    
+    def solve(self, route: Optional[np.ndarray] = None,
+              verbose: bool = True) -> Tuple[np.ndarray, float, List[float]]:
+        """
+        Ejecutar VNS hasta agotar iteraciones o presupuesto de tiempo
+        
+        Args:
+            route: Ruta inicial (default: aleatoria)
+            verbose: Si mostrar progreso
+        
+        Returns:
+            Tupla con (mejor_ruta, mejor_fitness, historial_fitness)
+        """
+        self._deadline = time.perf_counter() + self.time_limit
+        
+        if route is None:
+            other_cities = [i for i in range(self.n_cities) if i != self.start_city_index]
+            route = np.concatenate([[self.start_city_index], np.random.permutation(other_cities)])
+        
+        if verbose:
+            print(f"\n🔀 Iniciando VNS para TSP-TW")
+            print(f"   Vecindarios VND: {', '.join(name for name, _ in self.neighborhoods)}")
+            print(f"   Presupuesto: {self.time_limit:.1f} s / {self.max_iterations} iteraciones\n")
+        
+        self.best_solution, self.best_fitness = self.variable_neighborhood_descent(route)
+        self.fitness_history.append(self.best_fitness)
+        k = 1
+        
+        for iteration in range(self.max_iterations):
+            if self._out_of_time():
+                break
+            
+            candidate, value = self.variable_neighborhood_descent(
+                self.shake(self.best_solution, k)
+            )
+            
+            if value < self.best_fitness - 1e-9:
+                self.best_solution, self.best_fitness = candidate, value
+                k = 1
+            else:
+                k = k + 1 if k < self.k_max else 1
+            
+            self.fitness_history.append(self.best_fitness)
+            
+            if verbose and (iteration + 1) % 10 == 0:
+                print(f"   Iteración {iteration + 1} - Mejor tiempo: {self.best_fitness:.2f} horas")
+        
+        if verbose:
+            print(f"\n✓ VNS completado")
+            print(f"   Mejor tiempo total: {self.best_fitness:.2f} horas")
+        
+        return self.best_solution, self.best_fitness, self.fitness_history
+    
+    def _out_of_time(self) -> bool:
+        """Verificar si se agotó el presupuesto de tiempo de reloj"""
+        return self._deadline is not None and time.perf_counter() > self._deadline
@@ -4,15 +4,10 @@ Script de prueba rápida del TSP-TW
 Prueba el algoritmo genético con los datos generados
 """
 
-import sys
 import numpy as np
 import pandas as pd
-from pathlib import Path
 
-# Agregar src al path
-sys.path.insert(0, str(Path(__file__).parent / 'src'))
-
-from genetic_algorithm import GeneticAlgorithm
+from src.genetic_algorithm import GeneticAlgorithm
 
 
 def main():
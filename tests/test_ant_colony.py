@@ -0,0 +1,44 @@
+"""
+Tests for ant colony optimization
+"""
+
+import unittest
+import numpy as np
+from src.ant_colony import AntColonyOptimization
+
+
+class TestAntColonyOptimization(unittest.TestCase):
+    """Test cases for AntColonyOptimization"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        rng = np.random.RandomState(4)
+        points = rng.uniform(0, 15, size=(12, 2))
+        self.time_matrix = np.sqrt(((points[:, None, :] - points[None, :, :]) ** 2).sum(-1))
+        np.random.seed(0)
+        self.aco = AntColonyOptimization(self.time_matrix, start_city_index=1,
+                                         n_ants=10, iterations=15)
+    
+    def test_construct_solutions(self):
+        """Test lockstep construction against the scalar evaluator"""
+        routes, fitness = self.aco.construct_solutions()
+        
+        self.assertEqual(routes.shape, (10, 12))
+        for route, value in zip(routes, fitness):
+            self.assertEqual(route[0], 1)
+            self.assertEqual(set(route), set(range(12)))
+            self.assertAlmostEqual(value, self.aco.fitness_func.calculate_fitness(route), places=6)
+    
+    def test_solve(self):
+        """Test full run and MMAS pheromone limits"""
+        best_route, best_fitness, history = self.aco.solve(verbose=False)
+        
+        self.assertAlmostEqual(best_fitness, self.aco.fitness_func.calculate_fitness(best_route), places=6)
+        self.assertEqual(len(history), 15)
+        self.assertLessEqual(history[-1], history[0])
+        self.assertGreaterEqual(self.aco.pheromone.min(), self.aco.tau_min - 1e-12)
+        self.assertLessEqual(self.aco.pheromone.max(), self.aco.tau_max + 1e-12)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+"""
+Tests for the unified command-line entry point
+"""
+
+import contextlib
+import io
+import json
+import tempfile
+import unittest
+import numpy as np
+from pathlib import Path
+from src.cli import main, parse_params, split_stages
+from src.convergence_history import ConvergenceHistory
+
+DATA_DIR = Path(__file__).resolve().parent.parent / 'data'
+
+
+class TestCLI(unittest.TestCase):
+    """Test cases for python -m src"""
+    
+    def test_parse_helpers(self):
+        """Test stage splitting and typed key=value parameters"""
+        self.assertEqual(split_stages(['solve', '--seed', '1', '+', 'analyze', '+']),
+                         [['solve', '--seed', '1'], ['analyze']])
+        self.assertEqual(parse_params(['generations=20', 'mutation_rate=0.05', 'acceptance=rrt']),
+                         {'generations': 20, 'mutation_rate': 0.05, 'acceptance': 'rrt'})
+        with self.assertRaises(ValueError):
+            parse_params(['generations'])
+    
+    def test_pipeline_in_one_process(self):
+        """Test that chained stages share the session and its results directory"""
+        with tempfile.TemporaryDirectory() as tmp:
+            code = main(['--coords', str(DATA_DIR / 'processed' / 'coordenadas_capitales.csv'),
+                         '--cache-dir', tmp, '--results-root', tmp,
+                         'evaluate', '--runs', '2', '--param', 'generations=5',
+                         '--param', 'population_size=10', '+', 'analyze', '--top', '2'])
+            self.assertEqual(code, 0)
+            
+            results_dir = next(Path(tmp).glob('run_*'))
+            with open(results_dir / 'estadisticas.json') as f:
+                data = json.load(f)
+            self.assertEqual(len(data['all_fitness_values']), 2)
+            for name in ('mejor_ruta.csv', 'convergencias.npz', 'resumen_ejecuciones.csv'):
+                self.assertTrue((results_dir / name).exists(), name)
+            self.assertEqual(len(list(Path(tmp).glob('matriz_tiempos_*.npy'))), 1)
+            
+            # Sin --compress-history las convergencias se leen sin copiar
+            history = ConvergenceHistory.load(results_dir / 'convergencias.npz')
+            self.assertIsInstance(history.best, np.memmap)
+            self.assertEqual(len(history), 2)
+    
+    def test_chained_stages_get_own_directories(self):
+        """Test that two stages with the same prefix do not share a results directory"""
+        with tempfile.TemporaryDirectory() as tmp:
+            code = main(['--coords', str(DATA_DIR / 'processed' / 'coordenadas_capitales.csv'),
+                         '--cache-dir', tmp, '--results-root', tmp,
+                         'evaluate', '--runs', '2', '--param', 'generations=3',
+                         '--param', 'population_size=8', '+',
+                         'evaluate', '--runs', '1', '--param', 'generations=3',
+                         '--param', 'population_size=8'])
+            self.assertEqual(code, 0)
+            
+            results_dirs = sorted(Path(tmp).glob('run_*'))
+            self.assertEqual(len(results_dirs), 2)
+            num_runs = []
+            for results_dir in results_dirs:
+                with open(results_dir / 'estadisticas.json') as f:
+                    num_runs.append(len(json.load(f)['all_fitness_values']))
+            self.assertEqual(sorted(num_runs), [1, 2])
+    
+    def test_analyze_without_results(self):
+        """Test that a stage error is reported as a non-zero exit code"""
+        with tempfile.TemporaryDirectory() as tmp:
+            self.assertEqual(main(['analyze', str(Path(tmp) / 'no_existe')]), 1)
+    
+    def test_bad_solver_parameter(self):
+        """Test that an unknown solver parameter is reported, not raised"""
+        with tempfile.TemporaryDirectory() as tmp:
+            code = main(['--coords', str(DATA_DIR / 'processed' / 'coordenadas_capitales.csv'),
+                         '--cache-dir', tmp, '--results-root', tmp,
+                         'solve', '--param', 'no_existe=1'])
+            self.assertEqual(code, 1)
+    
+    def test_global_options_only_in_first_stage(self):
+        """Test that global options in a later stage are rejected instead of ignored"""
+        with contextlib.redirect_stderr(io.StringIO()):
+            with self.assertRaises(SystemExit) as context:
+                main(['solve', '+', '--coords', 'otro.csv', 'analyze'])
+        self.assertEqual(context.exception.code, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+"""
+Tests for columnar convergence-history storage
+"""
+
+import os
+import tempfile
+import unittest
+import numpy as np
+from src.convergence_history import ConvergenceHistory
+
+
+class TestConvergenceHistory(unittest.TestCase):
+    """Test cases for ConvergenceHistory"""
+    
+    def setUp(self):
+        """Set up non-increasing histories of unequal length"""
+        rng = np.random.RandomState(0)
+        self.histories = [np.minimum.accumulate(300 + rng.rand(n) * 50).tolist()
+                          for n in (500, 500, 320)]
+        self.diversity = [rng.rand(len(h)).tolist() for h in self.histories]
+    
+    def test_round_trip_plain_and_delta(self):
+        """Test that both encodings reproduce the float32 histories exactly"""
+        history = ConvergenceHistory.from_histories(self.histories, run_ids=[4, 5, 6],
+                                                    stats={'diversity': self.diversity})
+        self.assertEqual(history.best.shape, (3, 500))
+        self.assertEqual(history.best.dtype, np.float32)
+        self.assertEqual(history.best[2, -1], np.float32(self.histories[2][-1]))
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            sizes = {}
+            for delta in (False, True):
+                path = history.save(os.path.join(tmp, f"conv_{delta}.npz"), delta=delta)
+                sizes[delta] = path.stat().st_size
+                loaded = ConvergenceHistory.load(path)
+                self.assertEqual(isinstance(loaded.best, np.memmap), not delta)
+                np.testing.assert_array_equal(loaded.best, history.best)
+                np.testing.assert_array_equal(loaded.stats['diversity'],
+                                              history.stats['diversity'])
+                np.testing.assert_array_equal(loaded.run(6),
+                                              np.float32(self.histories[2]))
+                self.assertEqual(len(loaded.run(6, 'diversity')), 320)
+            self.assertLess(sizes[True], sizes[False])
+            del loaded
+
+
+if __name__ == '__main__':
+    unittest.main()
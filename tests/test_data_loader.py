@@ -0,0 +1,149 @@
+"""
+Tests for shapefile snapshots and streaming point extraction
+"""
+
+import importlib.util
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from src.data_loader import DataLoader, iter_point_features
+
+DATA_DIR = Path(__file__).resolve().parent.parent / 'data'
+
+
+def write_point_layer(path, points, values):
+    """Write a minimal point shapefile with one numeric POB field (F, 10.2)"""
+    with open(path.with_suffix('.shp'), 'wb') as shp:
+        shp.write(struct.pack('>i20xi', 9994, 50 + 14 * len(points)))
+        shp.write(struct.pack('<ii4d32x', 1000, 1, 0, 0, 0, 0))
+        for number, (lon, lat) in enumerate(points, 1):
+            shp.write(struct.pack('>ii', number, 10) + struct.pack('<i2d', 1, lon, lat))
+    with open(path.with_suffix('.dbf'), 'wb') as dbf:
+        dbf.write(struct.pack('<B3xIHH20x', 3, len(values), 65, 11))
+        dbf.write(struct.pack('<11sc4xBB14x', b'POB', b'F', 10, 2) + b'\r')
+        for value in values:
+            dbf.write(b' ' + (b' ' * 10 if value is None else f"{value:10.2f}".encode()))
+
+
+class TestStreamingExtraction(unittest.TestCase):
+    """Test cases for iter_point_features and DataLoader.extract_points"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.loader = DataLoader(str(DATA_DIR))
+        self.cities = DATA_DIR / 'raw' / 'México_Ciudades.shp'
+        self.capitals = pd.read_csv(DATA_DIR / 'processed' / 'coordenadas_capitales.csv')
+    
+    def test_attribute_filter_matches_capitals(self):
+        """Test that CAPITAL == 'S' plus CDMX reproduces the processed coordinates"""
+        features = list(iter_point_features(self.cities, where={'CAPITAL': 'S'}))
+        features += list(iter_point_features(self.cities, where={'CIUDAD': 'Ciudad de México'}))
+        extracted = pd.DataFrame([(name, state, lat, lon) for lat, lon, (name, state) in features],
+                                 columns=['CIUDAD', 'ESTADO', 'lat', 'lon'])
+        extracted = extracted.sort_values('CIUDAD').reset_index(drop=True)
+        
+        self.assertEqual(list(extracted['CIUDAD']), list(self.capitals['CIUDAD']))
+        np.testing.assert_allclose(extracted[['lat', 'lon']], self.capitals[['lat', 'lon']],
+                                   atol=1e-6)
+    
+    def test_extract_points_to_csv_and_npy(self):
+        """Test bbox and callable filters written straight to CSV and .npy"""
+        bbox = (-105.0, 17.0, -95.0, 22.0)
+        where = {'ESTADO': lambda state: state != 'Jalisco'}
+        expected = [f for f in iter_point_features(self.cities, bbox=bbox)
+                    if f[2][1] != 'Jalisco']
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_file = os.path.join(tmp, 'puntos.csv')
+            count = self.loader.extract_points('México_Ciudades.shp', csv_file, where=where,
+                                               bbox=bbox)
+            points = pd.read_csv(csv_file)
+            self.assertEqual(count, len(expected))
+            self.assertEqual(list(points.columns), ['CIUDAD', 'ESTADO', 'lat', 'lon'])
+            self.assertTrue(points['lon'].between(-105, -95).all())
+            self.assertNotIn('Jalisco', set(points['ESTADO']))
+            
+            npy_file = os.path.join(tmp, 'puntos.npy')
+            self.loader.extract_points('México_Ciudades.shp', npy_file, fields=('CIUDAD',),
+                                       where=where, bbox=bbox)
+            array = np.load(npy_file)
+            self.assertEqual(list(array['CIUDAD']), list(points['CIUDAD']))
+            np.testing.assert_allclose(array['lat'], points['lat'])
+    
+    def test_scalar_filter_on_numeric_field(self):
+        """Test that a scalar filter compares by value and skips blank numbers"""
+        with tempfile.TemporaryDirectory() as tmp:
+            layer = Path(tmp) / 'pob.shp'
+            write_point_layer(layer, [(-99.0, 19.0), (-98.0, 20.0), (-97.0, 21.0)], [5, None, 7.5])
+            features = list(iter_point_features(layer, fields=('POB',), where={'POB': 5}))
+            self.assertEqual(features, [(19.0, -99.0, (5.0,))])
+            self.assertEqual(list(iter_point_features(layer, fields=('POB',), where={'POB': '5'})),
+                             [])
+
+
+
+class TestShapefileSnapshots(unittest.TestCase):
+    """Test cases for the GeoParquet snapshot cache in DataLoader"""
+    
+    def setUp(self):
+        """Copy the state layer into a temporary data directory"""
+        self.tmp = tempfile.TemporaryDirectory()
+        raw = Path(self.tmp.name) / 'raw'
+        raw.mkdir()
+        for source in (DATA_DIR / 'raw').glob('México_Estados.*'):
+            shutil.copy(source, raw / source.name)
+        self.loader = DataLoader(self.tmp.name)
+        self.shapefile = raw / 'México_Estados.shp'
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def test_stale_cleanup_matches_exact_layer(self):
+        """Test that only older snapshots of the same layer are removed"""
+        self.loader.cache_dir.mkdir(parents=True)
+        names = ['México_Estados_0123456789abcdef.parquet',
+                 'México_Estados_2020_0123456789abcdef.parquet',
+                 'México_Estados_notes.parquet']
+        for name in names:
+            (self.loader.cache_dir / name).touch()
+        current = self.loader.snapshot_path(self.shapefile)
+        current.touch()
+        
+        removed = self.loader.remove_stale_snapshots(current)
+        self.assertEqual([path.name for path in removed], names[:1])
+        self.assertEqual(sorted(path.name for path in self.loader.cache_dir.iterdir()),
+                         sorted(names[1:] + [current.name]))
+    
+    @unittest.skipUnless(importlib.util.find_spec('geopandas')
+                         and importlib.util.find_spec('pyarrow'), "geopandas/pyarrow no instalados")
+    def test_snapshot_reuse_regeneration_and_columns(self):
+        """Test reuse on the second load, regeneration after an mtime change and column subsets"""
+        first = self.loader.load_shapefile('México_Estados.shp')
+        snapshot = self.loader.snapshot_path(self.shapefile)
+        self.assertTrue(snapshot.exists())
+        written = snapshot.stat().st_mtime_ns
+        
+        subset = self.loader.load_shapefile('México_Estados.shp', columns=['ESTADO'])
+        self.assertEqual(list(subset.columns), ['ESTADO', 'geometry'])
+        self.assertEqual(list(subset['ESTADO']), list(first['ESTADO']))
+        self.assertEqual(snapshot.stat().st_mtime_ns, written)
+        
+        dbf = self.shapefile.with_suffix('.dbf')
+        os.utime(dbf, ns=(dbf.stat().st_atime_ns, dbf.stat().st_mtime_ns + 10**9))
+        self.loader.load_shapefile('México_Estados.shp')
+        regenerated = self.loader.snapshot_path(self.shapefile)
+        self.assertNotEqual(regenerated, snapshot)
+        self.assertEqual(list(self.loader.cache_dir.glob('*.parquet')), [regenerated])
+        
+        uncached = self.loader.load_shapefile('México_Estados.shp', columns=['ESTADO'],
+                                              use_cache=False)
+        self.assertEqual(list(uncached.columns), ['ESTADO', 'geometry'])
+
+
+if __name__ == '__main__':
+    unittest.main()
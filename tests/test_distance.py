@@ -2,10 +2,15 @@
 Tests for distance calculator
 """
 
+import os
+import tempfile
 import unittest
 import numpy as np
 import pandas as pd
-from src.distance_calculator import DistanceCalculator
+from src.distance_calculator import (CondensedMatrix, DistanceCalculator, ScaledMatrix,
+                                     compact_matrix, haversine_distances, load_cached_matrix,
+                                     load_matrix, matrix_cache_key)
+from src.fitness_function import FitnessFunction
 
 
 class TestDistanceCalculator(unittest.TestCase):
@@ -46,6 +51,151 @@ class TestDistanceCalculator(unittest.TestCase):
         # Verificar diagonal (distancia a sí mismo = 0)
         np.testing.assert_array_almost_equal(np.diag(matrix), np.zeros(3))
     
+    def test_matrix_matches_geopy(self):
+        """Test vectorized ellipsoidal and haversine matrices against geopy"""
+        rng = np.random.RandomState(0)
+        coords = pd.DataFrame({'lat': rng.uniform(14, 33, 9), 'lon': rng.uniform(-118, -86, 9)})
+        calculator = DistanceCalculator(coords)
+        
+        expected = np.array([[calculator.calculate_distance((a.lat, a.lon), (b.lat, b.lon))
+                              for b in coords.itertuples()] for a in coords.itertuples()])
+        
+        ellipsoidal = calculator.build_distance_matrix(method='ellipsoidal', block_size=4)
+        np.testing.assert_allclose(ellipsoidal, expected, atol=1e-6)
+        
+        haversine = calculator.build_distance_matrix(method='haversine')
+        np.testing.assert_allclose(haversine, expected, rtol=5e-3)
+    
+    def test_save_matrix_npy(self):
+        """Test memory-mapped float32/uint16 matrices against the dense matrix"""
+        dense = self.calculator.build_distance_matrix() / 60
+        route = np.array([0, 2, 1])
+        expected = FitnessFunction(dense).calculate_fitness(route)
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            matrix32 = self.calculator.save_matrix_npy(os.path.join(tmp, 't32.npy'), block_size=2)
+            self.assertIsInstance(matrix32, np.memmap)
+            self.assertEqual(matrix32.dtype, np.float32)
+            np.testing.assert_allclose(matrix32, dense, rtol=1e-6)
+            self.assertAlmostEqual(FitnessFunction(matrix32).calculate_fitness(route), expected, places=4)
+            
+            matrix16 = self.calculator.save_matrix_npy(os.path.join(tmp, 't16.npy'), dtype='uint16')
+            self.assertIsInstance(matrix16, ScaledMatrix)
+            np.testing.assert_allclose(matrix16[:, :], dense, atol=1 / 120)
+            
+            distances = load_matrix(os.path.join(tmp, 't16.npy'), kind='distance')
+            self.assertEqual(distances[0, 1], round(dense[0, 1] * 60))
+            del matrix32
+    
+    def test_build_knn_graph(self):
+        """Test sparse k-NN graph against brute-force neighbors and lookups"""
+        rng = np.random.RandomState(1)
+        coords = pd.DataFrame({'lat': rng.uniform(14, 33, 60), 'lon': rng.uniform(-118, -86, 60)})
+        calculator = DistanceCalculator(coords)
+        dense = calculator.build_distance_matrix()
+        graph = calculator.build_knn_graph(k=5)
+        
+        masked = dense.copy()
+        np.fill_diagonal(masked, np.inf)
+        np.testing.assert_array_equal(graph.neighbor_lists(5), np.argsort(masked, axis=1)[:, :5])
+        self.assertEqual(len(graph.indices), 60 * 5)
+        
+        # Arcos candidatos exactos, resto con haversine al vuelo
+        near = graph.neighbor_lists(5)[7]
+        far = np.setdiff1d(np.arange(60), np.append(near, 7))
+        np.testing.assert_allclose(graph[7, near], dense[7, near])
+        self.assertAlmostEqual(graph[7, int(near[0])], dense[7, near[0]], places=9)
+        expected = haversine_distances(coords.lat[7], coords.lon[7], coords.lat[far], coords.lon[far])
+        np.testing.assert_allclose(graph[7, far], expected)
+        self.assertAlmostEqual(graph[7, int(far[0])], expected[0], places=9)
+        self.assertEqual(graph[7, 7], 0.0)
+        
+        hours = graph.with_scale(1 / 60)
+        self.assertAlmostEqual(hours[7, int(near[0])], dense[7, near[0]] / 60, places=9)
+    
+    def test_condensed_matrix(self):
+        """Test condensed storage against the dense matrix through the same indexing"""
+        rng = np.random.RandomState(2)
+        coords = pd.DataFrame({'lat': rng.uniform(14, 33, 9), 'lon': rng.uniform(-118, -86, 9)})
+        calculator = DistanceCalculator(coords)
+        dense = calculator.build_distance_matrix()
+        condensed = calculator.build_condensed_matrix(block_size=4)
+        self.assertEqual(condensed.data.shape, (36,))
+        
+        rows, cols = np.array([0, 3, 8, 5]), np.array([3, 0, 2, 5])
+        self.assertAlmostEqual(condensed[2, 7], dense[2, 7], places=3)
+        self.assertEqual(condensed[4, 4], 0.0)
+        np.testing.assert_allclose(condensed[rows, cols], dense[rows, cols], rtol=1e-6)
+        np.testing.assert_allclose(condensed[np.ix_(rows, cols)], dense[np.ix_(rows, cols)], rtol=1e-6)
+        np.testing.assert_allclose(condensed[rows], dense[rows], rtol=1e-6)
+        np.testing.assert_allclose(condensed[2:5], dense[2:5], rtol=1e-6)
+        np.testing.assert_allclose(np.asarray(condensed), dense, rtol=1e-6)
+        
+        route = np.array([0, 4, 2, 8, 1, 7, 3, 6, 5])
+        hours = condensed.with_scale(1 / 60)
+        self.assertAlmostEqual(FitnessFunction(hours).calculate_fitness(route),
+                               FitnessFunction(dense / 60).calculate_fitness(route), places=4)
+        
+        # Las matrices asimétricas se conservan completas
+        self.assertIsInstance(compact_matrix(dense), CondensedMatrix)
+        asymmetric = dense.copy()
+        asymmetric[0, 1] += 5.0
+        self.assertIs(compact_matrix(asymmetric), asymmetric)
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, 'c16.npy')
+            calculator.save_matrix_npy(filename, dtype='uint16', condensed=True, block_size=4)
+            stored = load_matrix(filename)
+            self.assertIsInstance(stored, CondensedMatrix)
+            np.testing.assert_allclose(stored[rows], dense[rows] / 60, atol=1 / 120)
+            del stored
+    
+    def test_load_cached_matrix(self):
+        """Test content-addressed cache hits, misses and keys"""
+        with tempfile.TemporaryDirectory() as tmp:
+            first = load_cached_matrix(self.test_data, kind='time', avg_speed_kmh=60, cache_dir=tmp)
+            self.assertIsInstance(first, np.memmap)
+            np.testing.assert_allclose(first, self.calculator.build_distance_matrix() / 60)
+            self.assertEqual(len(os.listdir(tmp)), 1)
+            
+            # Mismas entradas: se reutiliza el archivo
+            again = load_cached_matrix(self.test_data, kind='time', avg_speed_kmh=60.0, cache_dir=tmp)
+            self.assertEqual(again.filename, first.filename)
+            
+            # Otra velocidad u otras coordenadas: nueva entrada
+            load_cached_matrix(self.test_data, kind='time', avg_speed_kmh=80, cache_dir=tmp)
+            moved = self.test_data.assign(lat=self.test_data['lat'] + 0.01)
+            self.assertNotEqual(matrix_cache_key(moved), matrix_cache_key(self.test_data))
+            self.assertEqual(matrix_cache_key(self.test_data, kind='distance', avg_speed_kmh=80),
+                             matrix_cache_key(self.test_data, kind='distance', avg_speed_kmh=60))
+            self.assertEqual(len(os.listdir(tmp)), 2)
+            del first, again
+    
+    def test_add_and_remove_points(self):
+        """Test incremental updates against full rebuilds and the cache"""
+        rng = np.random.RandomState(3)
+        coords = pd.DataFrame({'lat': rng.uniform(14, 33, 10), 'lon': rng.uniform(-118, -86, 10)})
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            calculator = DistanceCalculator(coords[:7])
+            calculator.build_distance_matrix()
+            added = calculator.add_points(coords[7:], cache_dir=tmp)
+            np.testing.assert_array_equal(added, [7, 8, 9])
+            expected = DistanceCalculator(coords).build_distance_matrix()
+            np.testing.assert_allclose(calculator.distance_matrix, expected, atol=1e-9)
+            
+            # La caché del nuevo conjunto ya está escrita
+            cached = load_cached_matrix(coords, kind='time', cache_dir=tmp)
+            self.assertEqual(len(os.listdir(tmp)), 2)
+            np.testing.assert_allclose(cached, expected / 60, atol=1e-9)
+            
+            remap = calculator.remove_points([1, 8])
+            np.testing.assert_array_equal(remap, [0, -1, 1, 2, 3, 4, 5, 6, -1, 7])
+            kept = np.flatnonzero(remap >= 0)
+            np.testing.assert_allclose(calculator.distance_matrix, expected[np.ix_(kept, kept)])
+            np.testing.assert_allclose(calculator.coordinates['lat'], coords['lat'].to_numpy()[kept])
+            del cached
+    
     def test_estimate_travel_time(self):
         """Test travel time estimation"""
         distance = 800  # km
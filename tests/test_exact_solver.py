@@ -0,0 +1,61 @@
+"""
+Tests for exact solver
+"""
+
+import unittest
+import itertools
+import numpy as np
+from src.exact_solver import ExactSolver
+from src.fitness_function import FitnessFunction
+
+
+class TestExactSolver(unittest.TestCase):
+    """Test cases for ExactSolver"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        # Matriz de tiempos de prueba (8 ciudades, en horas)
+        rng = np.random.RandomState(5)
+        points = rng.uniform(0, 15, size=(8, 2))
+        self.time_matrix = np.sqrt(((points[:, None, :] - points[None, :, :]) ** 2).sum(-1))
+        self.fitness = FitnessFunction(self.time_matrix, start_city_index=2)
+        self.solver = ExactSolver(self.time_matrix, start_city_index=2)
+    
+    def test_matches_brute_force(self):
+        """Test optimal value against enumeration of all permutations"""
+        route, fitness = self.solver.solve()
+        
+        others = [c for c in range(8) if c != 2]
+        brute_force = min(
+            self.fitness.calculate_fitness(np.array([2] + list(p)))
+            for p in itertools.permutations(others)
+        )
+        
+        self.assertEqual(route[0], 2)
+        self.assertEqual(set(route), set(range(8)))
+        self.assertAlmostEqual(fitness, brute_force, places=6)
+        self.assertAlmostEqual(fitness, self.fitness.calculate_fitness(route), places=6)
+    
+    def test_subset_and_upper_bound(self):
+        """Test solving a sub-instance and pruning with a tight bound"""
+        route, fitness = self.solver.solve(cities=[0, 4, 6])
+        self.assertEqual(route[0], 2)
+        self.assertEqual(set(route), {0, 2, 4, 6})
+        
+        # La cota igual al óptimo no debe eliminar la solución óptima
+        bounded_route, bounded_fitness = self.solver.solve(cities=[0, 4, 6], upper_bound=fitness)
+        self.assertAlmostEqual(bounded_fitness, fitness)
+        
+        # Una cota inferior al óptimo deja la instancia sin solución
+        _, infeasible = self.solver.solve(cities=[0, 4, 6], upper_bound=fitness - 1.0)
+        self.assertEqual(infeasible, float('inf'))
+    
+    def test_rejects_large_instances(self):
+        """Test max_cities guard"""
+        solver = ExactSolver(np.ones((30, 30)), max_cities=20)
+        with self.assertRaises(ValueError):
+            solver.solve()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+"""
+Tests for import-time dependencies (python -X importtime)
+"""
+
+import os
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+# Dependencias pesadas que solo deben cargarse al usar su funcionalidad
+HEAVY_MODULES = ('geopandas', 'geopy', 'matplotlib', 'shapely', 'fiona', 'pyogrio')
+
+PROJECT_MODULES = ['ant_colony', 'data_loader', 'distance_calculator', 'exact_solver',
+                   'fitness_function', 'genetic_algorithm', 'lin_kernighan', 'lns',
+                   'local_search', 'operators', 'road_network', 'simulated_annealing',
+                   'tabu_search', 'time_dependent', 'time_windows', 'visualizer', 'vns']
+
+
+def imported_modules(statement: str) -> dict:
+    """
+    Ejecutar una sentencia en un intérprete nuevo con -X importtime
+    
+    Returns:
+        {módulo: tiempo acumulado en microsegundos}
+    """
+    env = dict(os.environ, PYTHONPATH=str(ROOT_DIR))
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement],
+                            capture_output=True, text=True, env=env, check=True)
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if cumulative.strip().isdigit():
+            modules[name.strip()] = int(cumulative)
+    return modules
+
+
+class TestLazyImports(unittest.TestCase):
+    """Test cases for lazy loading of heavy dependencies"""
+    
+    def test_project_modules_skip_heavy_dependencies(self):
+        """Test that importing every project module loads no geo/plotting library"""
+        modules = imported_modules('import ' + ', '.join(f'src.{m}' for m in PROJECT_MODULES))
+        self.assertIn('src.distance_calculator', modules)
+        heavy = sorted(name for name in modules if name.split('.')[0] in HEAVY_MODULES)
+        self.assertEqual(heavy, [])
+    
+    def test_geodesic_loaded_on_use(self):
+        """Test that geopy is imported only when a geodesic distance is requested"""
+        modules = imported_modules(
+            'import pandas as pd\n'
+            'from src.distance_calculator import DistanceCalculator\n'
+            'DistanceCalculator(pd.DataFrame()).calculate_distance((19.4, -99.1), (25.7, -100.3))'
+        )
+        self.assertIn('geopy', modules)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+"""
+Tests for the synthetic instance generator
+"""
+
+import tempfile
+import unittest
+import numpy as np
+from pathlib import Path
+from src.distance_calculator import haversine_distances, load_matrix
+from src.instance_generator import InstanceGenerator, points_in_rings
+
+DATA_DIR = Path(__file__).resolve().parent.parent / 'data'
+
+
+class TestInstanceGenerator(unittest.TestCase):
+    """Test cases for InstanceGenerator"""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Load the state polygons once"""
+        cls.generator = InstanceGenerator(str(DATA_DIR))
+    
+    def test_points_inside_states_and_reproducible(self):
+        """Test that every stop falls in its state and seeds reproduce instances"""
+        instance = self.generator.generate(300, seed=3, weights='uniform', narrow_fraction=0.3)
+        self.assertEqual(len(instance), 300)
+        self.assertEqual(instance['CIUDAD'].iloc[0], 'Ciudad de México')
+        self.assertLessEqual(np.ptp(instance['ESTADO'].iloc[1:].value_counts()), 1)
+        
+        for state, group in instance.iloc[1:].groupby('ESTADO'):
+            inside = points_in_rings(group['lon'].to_numpy(), group['lat'].to_numpy(),
+                                     self.generator.states[state])
+            self.assertTrue(inside.all(), state)
+        
+        self.assertTrue((instance['cierre'] - instance['apertura'] >= 3.0).all())
+        self.assertTrue(((instance['apertura'] > 9.0) | (instance['cierre'] < 21.0)).any())
+        
+        again = self.generator.generate(300, seed=3, weights='uniform', narrow_fraction=0.3)
+        self.assertTrue(instance.equals(again))
+        other = self.generator.generate(300, seed=4, weights='uniform', narrow_fraction=0.3)
+        self.assertFalse(np.allclose(instance['lat'], other['lat']))
+    
+    def test_clusters_around_capitals(self):
+        """Test that clustered stops stay close to their state capital"""
+        instance = self.generator.generate(200, seed=1, cluster_fraction=1.0, cluster_km=20.0)
+        capitals = np.array([self.generator.capitals[s] for s in instance['ESTADO'].iloc[1:]])
+        distances = haversine_distances(instance['lat'].iloc[1:], instance['lon'].iloc[1:],
+                                        capitals[:, 0], capitals[:, 1])
+        self.assertLess(np.median(distances), 40.0)
+    
+    def test_save_project_formats(self):
+        """Test coordinates CSV and binary matrices"""
+        instance = self.generator.generate(40, seed=2)
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = self.generator.save(instance, 'n40', output_dir=tmp, condensed=True)
+            self.assertTrue(paths['coordinates'].exists())
+            times = load_matrix(str(paths['time']))
+            self.assertEqual(times.shape, (40, 40))
+            self.assertEqual(times[3, 3], 0.0)
+            self.assertAlmostEqual(times[0, 5], times[5, 0])
+            del times
+
+
+if __name__ == '__main__':
+    unittest.main()
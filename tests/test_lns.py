@@ -0,0 +1,61 @@
+"""
+Tests for large neighborhood search
+"""
+
+import unittest
+import numpy as np
+from src.lns import LargeNeighborhoodSearch
+
+
+class TestLargeNeighborhoodSearch(unittest.TestCase):
+    """Test cases for LargeNeighborhoodSearch"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        rng = np.random.RandomState(9)
+        self.coordinates = rng.uniform([15, -110], [30, -88], size=(12, 2))
+        self.time_matrix = rng.uniform(2, 14, size=(12, 12))
+        np.fill_diagonal(self.time_matrix, 0)
+        np.random.seed(0)
+        self.lns = LargeNeighborhoodSearch(self.time_matrix, start_city_index=2, iterations=40,
+                                           coordinates=self.coordinates)
+    
+    def test_insertion_costs(self):
+        """Test slack-based insertion costs against full evaluation"""
+        calculator = self.lns.route_calculator
+        route = np.array([2, 7, 0, 11, 4, 9, 5])
+        cities = np.array([1, 3, 6, 8, 10])
+        base = calculator.evaluate_from(route, 1, *calculator.get_schedule(route))
+        costs = self.lns.insertion_costs(route, cities)
+        
+        for p in range(len(route)):
+            for u, city in enumerate(cities):
+                candidate = np.concatenate([route[:p + 1], [city], route[p + 1:]])
+                expected = self.lns.fitness_func.calculate_fitness(candidate) - base
+                self.assertAlmostEqual(costs[p, u], expected, places=6)
+    
+    def test_ruin_recreate(self):
+        """Test that every ruin operator followed by recreate yields a valid route"""
+        route = np.concatenate([[2], np.random.permutation([c for c in range(12) if c != 2])])
+        for operator in LargeNeighborhoodSearch.RUIN_OPERATORS:
+            partial, removed = self.lns.ruin(route, 4, operator)
+            self.assertEqual(len(removed), 4)
+            self.assertEqual(partial[0], 2)
+            rebuilt = self.lns.recreate(partial, removed)
+            self.assertEqual(rebuilt[0], 2)
+            self.assertEqual(set(rebuilt), set(range(12)))
+    
+    def test_solve(self):
+        """Test run results for both acceptance criteria"""
+        for acceptance in ('rrt', 'sa'):
+            lns = LargeNeighborhoodSearch(self.time_matrix, start_city_index=2, iterations=40,
+                                          acceptance=acceptance)
+            best_route, best_fitness, history = lns.solve(verbose=False)
+            self.assertEqual(best_route[0], 2)
+            self.assertAlmostEqual(best_fitness, lns.fitness_func.calculate_fitness(best_route), places=6)
+            self.assertEqual(len(history), 40)
+            self.assertTrue(all(a >= b for a, b in zip(history, history[1:])))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,165 @@
+"""
+Tests for local search
+"""
+
+import unittest
+import numpy as np
+from src.fitness_function import FitnessFunction
+from src.local_search import LocalSearch
+from src.lin_kernighan import LinKernighan
+
+
+class TestLocalSearchTimeWindows(unittest.TestCase):
+    """Test cases for time-window-aware LocalSearch"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        # Matriz de tiempos simétrica aleatoria (12 ciudades, en horas)
+        rng = np.random.RandomState(7)
+        points = rng.uniform(0, 20, size=(12, 2))
+        self.time_matrix = np.sqrt(((points[:, None, :] - points[None, :, :]) ** 2).sum(-1))
+        self.fitness = FitnessFunction(self.time_matrix, start_city_index=0)
+        self.local_search = LocalSearch(self.time_matrix, fitness_function=self.fitness)
+        self.route = np.concatenate([[0], rng.permutation(np.arange(1, 12))])
+    
+    def test_evaluate_from_matches_full_evaluation(self):
+        """Test prefix-cached evaluation against full schedule evaluation"""
+        calculator = self.fitness.route_calculator
+        times, penalties = calculator.get_schedule(self.route)
+        
+        for i in range(1, 11):
+            for j in range(i + 1, 12):
+                candidate = self.route.copy()
+                candidate[i:j+1] = self.route[i:j+1][::-1]
+                expected = calculator.calculate_route_time(candidate.tolist())[0]
+                result = calculator.evaluate_from(candidate, i, times, penalties, j + 1)
+                self.assertAlmostEqual(result, expected, places=6)
+    
+    def test_optimize_time_windows_never_worsens(self):
+        """Test that only moves improving the TSP-TW objective are accepted"""
+        initial = self.fitness.calculate_fitness(self.route)
+        best_route, best_fitness = self.local_search.optimize_time_windows(self.route)
+        
+        # Sigue siendo una permutación que empieza en la ciudad de inicio
+        self.assertEqual(best_route[0], 0)
+        self.assertEqual(set(best_route), set(range(12)))
+        
+        self.assertLessEqual(best_fitness, initial)
+        self.assertAlmostEqual(best_fitness, self.fitness.calculate_fitness(best_route))
+    
+    def test_abrupt_removal(self):
+        """Test indexed abrupt-removal heuristic"""
+        initial = self.fitness.calculate_fitness(self.route)
+        best_route, best_fitness = self.local_search.abrupt_removal(self.route, m=4)
+        
+        self.assertEqual(best_route[0], 0)
+        self.assertEqual(set(best_route), set(range(12)))
+        self.assertLessEqual(best_fitness, initial)
+        self.assertAlmostEqual(best_fitness, self.fitness.calculate_fitness(best_route))
+        
+        # Las listas cercanas excluyen a la propia ciudad y están ordenadas
+        near = self.local_search.get_near_lists(4)
+        self.assertEqual(near.shape, (12, 4))
+        self.assertFalse(np.any(near == np.arange(12)[:, None]))
+    
+    def test_abrupt_removal_screens_by_travel_delta(self):
+        """Test that the default tolerance skips insertions that lengthen travel"""
+        calculator = self.fitness.route_calculator
+        evaluate_from = calculator.evaluate_from
+        calls = []
+        
+        def counting_evaluate_from(*args, **kwargs):
+            calls.append(1)
+            return evaluate_from(*args, **kwargs)
+        
+        calculator.evaluate_from = counting_evaluate_from
+        try:
+            self.local_search.abrupt_removal(self.route, m=4, max_iterations=1)
+            screened = len(calls)
+            calls.clear()
+            self.local_search.abrupt_removal(self.route, m=4, max_iterations=1,
+                                             screen_tolerance=np.inf)
+        finally:
+            del calculator.evaluate_from
+        
+        self.assertLess(screened, len(calls))
+    
+    def test_requires_fitness_function(self):
+        """Test that the TW mode needs an objective"""
+        with self.assertRaises(ValueError):
+            LocalSearch(self.time_matrix).optimize_time_windows(self.route)
+
+
+
+class TestVectorizedTwoOpt(unittest.TestCase):
+    """Test cases for NumPy 2-opt gain evaluation"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        rng = np.random.RandomState(11)
+        points = rng.uniform(0, 100, size=(40, 2))
+        self.distance_matrix = np.sqrt(((points[:, None, :] - points[None, :, :]) ** 2).sum(-1))
+        self.local_search = LocalSearch(self.distance_matrix)
+        self.route = np.concatenate([[0], rng.permutation(np.arange(1, 40))])
+    
+    def test_gain_matrix_matches_route_distance(self):
+        """Test that each gain equals the distance saved by the reversal"""
+        base = self.local_search.calculate_route_distance(self.route)
+        gains = self.local_search.two_opt_gains(self.route, slice(0, 38))
+        
+        for i, j in [(0, 2), (0, 39), (5, 17), (20, 39)]:
+            new_route = self.route.copy()
+            new_route[i+1:j+1] = self.route[i+1:j+1][::-1]
+            saved = base - self.local_search.calculate_route_distance(new_route)
+            self.assertAlmostEqual(gains[i, j], saved)
+    
+    def test_optimize_vectorized_reaches_two_opt_optimum(self):
+        """Test best-move and multi-move sweeps with chunked gains"""
+        for multi_move in (False, True):
+            best_route, best_distance = self.local_search.optimize_vectorized(
+                self.route, multi_move=multi_move, chunk_size=7
+            )
+            
+            self.assertEqual(best_route[0], 0)
+            self.assertEqual(set(best_route), set(range(40)))
+            self.assertLess(best_distance, self.local_search.calculate_route_distance(self.route))
+            
+            # No queda ningún movimiento 2-opt de mejora
+            gains = self.local_search.two_opt_gains(best_route, slice(0, 38))
+            self.assertLessEqual(gains.max(), 1e-10)
+
+
+class TestLinKernighan(unittest.TestCase):
+    """Test cases for LinKernighan"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        rng = np.random.RandomState(3)
+        points = rng.uniform(0, 100, size=(60, 2))
+        self.time_matrix = np.sqrt(((points[:, None, :] - points[None, :, :]) ** 2).sum(-1))
+        self.route = np.concatenate([[5], rng.permutation(np.delete(np.arange(60), 5))])
+    
+    def test_optimize_improves_travel_time(self):
+        """Test that LK reaches a better permutation keeping the start city"""
+        lk = LinKernighan(self.time_matrix, start_city_index=5)
+        best_route, best_cost = lk.optimize(self.route)
+        
+        self.assertEqual(best_route[0], 5)
+        self.assertEqual(set(best_route), set(range(60)))
+        self.assertLess(best_cost, lk.path_cost(self.route))
+        self.assertAlmostEqual(best_cost, lk.path_cost(best_route))
+    
+    def test_chained_with_time_window_filter(self):
+        """Test that the TW filter never accepts a worse TSP-TW objective"""
+        np.random.seed(0)
+        fitness = FitnessFunction(self.time_matrix / 10, start_city_index=5)
+        lk = LinKernighan(self.time_matrix / 10, start_city_index=5, fitness_function=fitness)
+        best_route, best_value, history = lk.chained_optimize(self.route, max_kicks=20)
+        
+        self.assertLessEqual(best_value, fitness.calculate_fitness(self.route))
+        self.assertAlmostEqual(best_value, fitness.calculate_fitness(best_route))
+        self.assertTrue(all(a >= b for a, b in zip(history, history[1:])))
+
+
+if __name__ == '__main__':
+    unittest.main()
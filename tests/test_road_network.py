@@ -0,0 +1,63 @@
+"""
+Tests for road network travel times
+"""
+
+import unittest
+import numpy as np
+from src.distance_calculator import haversine_distances
+from src.road_network import RoadNetwork, road_time_matrix
+
+
+class TestRoadNetwork(unittest.TestCase):
+    """Test cases for RoadNetwork"""
+    
+    def setUp(self):
+        """Set up test fixtures: a 4x4 street grid plus an isolated road"""
+        self.grid = [np.column_stack([np.linspace(-100, -99.7, 4), np.full(4, 19 + 0.1 * i)])
+                     for i in range(4)]
+        self.grid += [np.column_stack([np.full(4, -100 + 0.1 * i), np.linspace(19, 19.3, 4)])
+                      for i in range(4)]
+        self.island = [np.array([[-90.0, 20.0], [-89.9, 20.0]])]
+        self.network = RoadNetwork.from_polylines(self.grid + self.island, speed_kmh=60)
+    
+    def test_graph_structure(self):
+        """Test that shared vertices are merged into a CSR graph"""
+        self.assertEqual(self.network.n_nodes, 18)
+        degrees = np.diff(self.network.indptr)
+        self.assertEqual(degrees.max(), 4)
+        self.assertEqual(len(self.network.indices), 2 * (24 + 1))
+    
+    def test_shortest_paths_match_dense_reference(self):
+        """Test Dijkstra against Floyd-Warshall on the same graph"""
+        n = self.network.n_nodes
+        dense = np.full((n, n), np.inf)
+        np.fill_diagonal(dense, 0.0)
+        for node in range(n):
+            for edge in range(self.network.indptr[node], self.network.indptr[node + 1]):
+                dense[node, self.network.indices[edge]] = self.network.weights[edge]
+        for k in range(n):
+            dense = np.minimum(dense, dense[:, k:k + 1] + dense[k:k + 1, :])
+        
+        nodes = np.arange(n)
+        np.testing.assert_allclose(self.network.shortest_paths(nodes, nodes), dense, rtol=1e-6)
+        np.testing.assert_allclose(self.network.shortest_paths(nodes, nodes, batch_cells=1),
+                                   dense, rtol=1e-6)
+        np.testing.assert_allclose(self.network._dijkstra_per_source(nodes, nodes), dense,
+                                   rtol=1e-6)
+    
+    def test_road_matrix_with_access_and_fallback(self):
+        """Test snapping, access legs and the great-circle fallback"""
+        lat = np.array([19.0, 19.3, 20.01])
+        lon = np.array([-100.0, -99.7, -89.95])
+        matrix = road_time_matrix(self.network, lat, lon, avg_speed_kmh=60)
+        
+        straight = haversine_distances(lat[:, None], lon[:, None], lat[None], lon[None]) / 60
+        self.assertTrue(np.allclose(np.diag(matrix), 0.0))
+        # En la cuadrícula hay que ir en L, más largo que la línea recta
+        self.assertGreater(matrix[0, 1], straight[0, 1] * 1.3)
+        self.assertAlmostEqual(matrix[0, 2], straight[0, 2])
+        np.testing.assert_allclose(matrix, matrix.T, rtol=1e-6)
+
+
+if __name__ == '__main__':
+    unittest.main()
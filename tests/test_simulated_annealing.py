@@ -0,0 +1,49 @@
+"""
+Tests for parallel tempering simulated annealing
+"""
+
+import unittest
+import numpy as np
+from src.simulated_annealing import ParallelTemperingSA, ReplicaRunner
+
+
+class TestParallelTemperingSA(unittest.TestCase):
+    """Test cases for ParallelTemperingSA"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        rng = np.random.RandomState(2)
+        points = rng.uniform(0, 15, size=(10, 2))
+        self.time_matrix = np.sqrt(((points[:, None, :] - points[None, :, :]) ** 2).sum(-1))
+    
+    def test_replica_energy_matches_fitness(self):
+        """Test that incremental schedule updates keep the energy exact"""
+        sa = ParallelTemperingSA(self.time_matrix, start_city_index=3, n_processes=1)
+        route = sa.initialize_replicas()[0]
+        
+        runner = ReplicaRunner(self.time_matrix)
+        final_route, energy, best_route, best_energy = runner.run(route, 5.0, 300, seed=1)
+        
+        self.assertAlmostEqual(energy, sa.fitness_func.calculate_fitness(final_route), places=6)
+        self.assertAlmostEqual(best_energy, sa.fitness_func.calculate_fitness(best_route), places=6)
+        self.assertEqual(set(final_route), set(range(10)))
+        self.assertEqual(final_route[0], 3)
+    
+    def test_solve(self):
+        """Test serial and multi-process runs"""
+        for n_processes in (1, 2):
+            np.random.seed(0)
+            sa = ParallelTemperingSA(self.time_matrix, start_city_index=3, n_replicas=4,
+                                     iterations=400, exchange_interval=100,
+                                     n_processes=n_processes)
+            best_route, best_fitness, history = sa.solve(verbose=False)
+            
+            self.assertEqual(best_route[0], 3)
+            self.assertEqual(set(best_route), set(range(10)))
+            self.assertAlmostEqual(best_fitness, sa.fitness_func.calculate_fitness(best_route))
+            self.assertEqual(len(history), 4)
+            self.assertLessEqual(history[-1], history[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+"""
+Tests for tabu search
+"""
+
+import unittest
+import numpy as np
+from src.tabu_search import TabuSearch
+
+
+class TestTabuSearch(unittest.TestCase):
+    """Test cases for TabuSearch"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        rng = np.random.RandomState(6)
+        points = rng.uniform(0, 15, size=(12, 2))
+        self.time_matrix = np.sqrt(((points[:, None, :] - points[None, :, :]) ** 2).sum(-1))
+        np.random.seed(0)
+        self.tabu = TabuSearch(self.time_matrix, start_city_index=4, iterations=60, sample_size=5)
+    
+    def test_generate_moves(self):
+        """Test that every candidate move is a valid route with a correct changed range"""
+        route = self.tabu.initial_solution()
+        pos = np.empty(12, dtype=np.int64)
+        pos[route] = np.arange(12)
+        
+        for candidate, first, last in self.tabu.generate_moves(route, pos):
+            self.assertEqual(candidate[0], 4)
+            self.assertEqual(set(candidate), set(range(12)))
+            np.testing.assert_array_equal(candidate[:first], route[:first])
+            np.testing.assert_array_equal(candidate[last+1:], route[last+1:])
+    
+    def test_solve(self):
+        """Test run results, memories and history"""
+        best_route, best_fitness, history = self.tabu.solve(verbose=False)
+        
+        self.assertEqual(best_route[0], 4)
+        self.assertAlmostEqual(best_fitness, self.tabu.fitness_func.calculate_fitness(best_route), places=6)
+        self.assertEqual(len(history), 60)
+        self.assertTrue(all(a >= b for a, b in zip(history, history[1:])))
+        self.assertGreater(self.tabu.frequency.sum(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
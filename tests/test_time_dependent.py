@@ -0,0 +1,85 @@
+"""
+Tests for time-dependent travel times
+"""
+
+import os
+import tempfile
+import unittest
+import numpy as np
+from src.ant_colony import AntColonyOptimization
+from src.exact_solver import ExactSolver
+from src.fitness_function import FitnessFunction
+from src.lns import LargeNeighborhoodSearch
+from src.time_dependent import (TimeDependentTravelTimes, build_time_dependent_matrix,
+                                congestion_profiles, rush_hour_profile)
+
+
+class TestTimeDependentTravelTimes(unittest.TestCase):
+    """Test cases for TimeDependentTravelTimes"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        rng = np.random.RandomState(4)
+        points = rng.uniform(0, 900, size=(8, 2))
+        self.distances = np.sqrt(((points[:, None, :] - points[None, :, :]) ** 2).sum(-1))
+        self.route = np.array([0, 3, 5, 1, 7, 2, 6, 4])
+    
+    def test_constant_profile_matches_static(self):
+        """Test that a flat profile reproduces the static evaluation"""
+        travel_times = build_time_dependent_matrix(self.distances, np.ones(24))
+        static = FitnessFunction(self.distances / 60).calculate_fitness(self.route)
+        dynamic = FitnessFunction(travel_times).calculate_fitness(self.route)
+        self.assertAlmostEqual(static, dynamic, places=3)
+    
+    def test_interpolation_and_fifo(self):
+        """Test piecewise-linear lookup, batch lookup and FIFO after enforcement"""
+        profiles = congestion_profiles(8, {0: rush_hour_profile(factor=0.2)})
+        travel_times = build_time_dependent_matrix(self.distances, profiles)
+        tensor = travel_times.tensor
+        
+        middle = travel_times.travel_time(6.5, 0, 3)
+        self.assertAlmostEqual(middle, (tensor[6, 0, 3] + tensor[7, 0, 3]) / 2, places=5)
+        
+        departures = np.linspace(0, 48, 500)
+        batch = travel_times.travel_time_batch(departures, 0, 3)
+        scalar = [travel_times.travel_time(d, 0, 3) for d in departures]
+        np.testing.assert_allclose(batch, scalar, rtol=1e-6)
+        
+        arrivals = departures[None, :] + travel_times.travel_time_batch(
+            departures[None, :], 0, np.arange(8)[:, None])
+        self.assertTrue((np.diff(arrivals, axis=1) >= -1e-4).all())
+    
+    def test_save_load_memmap(self):
+        """Test float32 memmap storage"""
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, 'td.npy')
+            built = build_time_dependent_matrix(self.distances, rush_hour_profile(), filename=filename)
+            loaded = TimeDependentTravelTimes.load(filename)
+            self.assertIsInstance(loaded.tensor, np.memmap)
+            self.assertEqual(loaded.tensor.dtype, np.float32)
+            self.assertAlmostEqual(FitnessFunction(loaded).calculate_fitness(self.route),
+                                   FitnessFunction(built).calculate_fitness(self.route), places=6)
+            del built, loaded
+    
+    def test_solvers_accept_time_dependent(self):
+        """Test that ACO, exact DP and LNS evaluate routes with departure-time lookups"""
+        profiles = congestion_profiles(8, {0: rush_hour_profile(factor=0.3)})
+        travel_times = build_time_dependent_matrix(self.distances, profiles)
+        fitness = FitnessFunction(travel_times)
+        
+        exact_route, exact_value = ExactSolver(travel_times).solve()
+        self.assertAlmostEqual(exact_value, fitness.calculate_fitness(exact_route), places=4)
+        self.assertAlmostEqual(fitness.calculate_detailed_fitness(exact_route)['total_time'],
+                               exact_value, places=4)
+        
+        np.random.seed(0)
+        aco = AntColonyOptimization(travel_times, n_ants=10, iterations=15)
+        np.random.seed(0)
+        lns = LargeNeighborhoodSearch(travel_times, iterations=60)
+        for route, value, _ in (aco.solve(verbose=False), lns.solve(verbose=False)):
+            self.assertAlmostEqual(value, fitness.calculate_fitness(route), places=4)
+            self.assertGreaterEqual(value, exact_value - 1e-6)
+
+
+if __name__ == '__main__':
+    unittest.main()
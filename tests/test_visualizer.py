@@ -0,0 +1,59 @@
+"""
+Tests for the batch route renderer and cached basemap
+"""
+
+import importlib.util
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from src.visualizer import BatchRouteRenderer, load_basemap, simplify_ring
+
+DATA_DIR = Path(__file__).resolve().parent.parent / 'data'
+
+
+class TestBasemap(unittest.TestCase):
+    """Test cases for basemap simplification and caching"""
+    
+    def test_simplify_ring_within_tolerance(self):
+        """Test that dropped vertices stay within tolerance of the simplified line"""
+        t = np.linspace(0, 2 * np.pi, 400)
+        ring = np.column_stack([np.cos(t) + 0.01 * np.sin(25 * t), np.sin(t)])
+        simplified = simplify_ring(ring, 0.05)
+        
+        self.assertLess(len(simplified), len(ring) // 4)
+        np.testing.assert_array_equal(simplified[[0, -1]], ring[[0, -1]])
+        segments = np.linspace(0, 1, 50)[:, None, None]
+        dense = (simplified[:-1] + segments * (simplified[1:] - simplified[:-1])).reshape(-1, 2)
+        gaps = np.min(np.hypot(*(ring[:, None, :] - dense[None, :, :]).transpose(2, 0, 1)), axis=1)
+        self.assertLess(gaps.max(), 0.06)
+    
+    def test_load_basemap_cached(self):
+        """Test that the simplified outline is written once and reused"""
+        with tempfile.TemporaryDirectory() as tmp:
+            outline = load_basemap(DATA_DIR / 'raw' / 'México_Estados.shp', cache_dir=tmp)
+            self.assertEqual(outline.dtype, np.float32)
+            self.assertTrue(np.isnan(outline[:, 0]).any())
+            self.assertEqual(len(os.listdir(tmp)), 1)
+            
+            again = load_basemap(DATA_DIR / 'raw' / 'México_Estados.shp', cache_dir=tmp)
+            np.testing.assert_array_equal(outline, again)
+            coarse = load_basemap(DATA_DIR / 'raw' / 'México_Estados.shp', tolerance=0.2,
+                                  cache_dir=tmp)
+            self.assertLess(len(coarse), len(outline))
+    
+    @unittest.skipUnless(importlib.util.find_spec('matplotlib'), "matplotlib no instalado")
+    def test_render_many(self):
+        """Test rendering several routes with one reused figure"""
+        coords = pd.read_csv(DATA_DIR / 'processed' / 'coordenadas_capitales.csv')
+        routes = [np.random.RandomState(seed).permutation(len(coords)) for seed in range(3)]
+        with tempfile.TemporaryDirectory() as tmp:
+            renderer = BatchRouteRenderer(coords, tmp, dpi=50)
+            paths = renderer.render_many(routes, [f"ruta_{i}.png" for i in range(3)])
+            self.assertTrue(all(path.exists() for path in paths))
+
+
+if __name__ == '__main__':
+    unittest.main()
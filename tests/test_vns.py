@@ -0,0 +1,58 @@
+"""
+Tests for variable neighborhood search
+"""
+
+import time
+import unittest
+import numpy as np
+from src.vns import VariableNeighborhoodSearch
+
+
+class TestVariableNeighborhoodSearch(unittest.TestCase):
+    """Test cases for VariableNeighborhoodSearch"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        rng = np.random.RandomState(8)
+        points = rng.uniform(0, 15, size=(12, 2))
+        self.time_matrix = np.sqrt(((points[:, None, :] - points[None, :, :]) ** 2).sum(-1))
+        np.random.seed(0)
+        self.vns = VariableNeighborhoodSearch(self.time_matrix, start_city_index=3,
+                                              time_limit=10.0, max_iterations=15)
+    
+    def test_shake(self):
+        """Test that shaking keeps a valid route starting at the start city"""
+        route = np.concatenate([[3], [c for c in range(12) if c != 3]])
+        for k in range(1, self.vns.k_max + 1):
+            shaken = self.vns.shake(route, k)
+            self.assertEqual(shaken[0], 3)
+            self.assertEqual(set(shaken), set(range(12)))
+    
+    def test_solve(self):
+        """Test run results and monotone history"""
+        best_route, best_fitness, history = self.vns.solve(verbose=False)
+        
+        self.assertEqual(best_route[0], 3)
+        self.assertEqual(set(best_route), set(range(12)))
+        self.assertAlmostEqual(best_fitness, self.vns.fitness_func.calculate_fitness(best_route), places=6)
+        self.assertLessEqual(len(history), 16)
+        self.assertTrue(all(a >= b for a, b in zip(history, history[1:])))
+    
+    def test_time_limit(self):
+        """Test that a zero budget stops after the initial descent"""
+        self.vns.time_limit = 0.0
+        _, _, history = self.vns.solve(verbose=False)
+        self.assertEqual(len(history), 1)
+    
+    def test_neighborhoods_stop_at_deadline(self):
+        """Test that every neighborhood returns its input once the deadline passed"""
+        route = np.concatenate([[3], [c for c in range(12) if c != 3]])
+        self.vns._deadline = time.perf_counter() - 1.0
+        for name, neighborhood in self.vns.neighborhoods:
+            candidate, value = neighborhood(route)
+            np.testing.assert_array_equal(candidate, route, err_msg=name)
+            self.assertAlmostEqual(value, self.vns.fitness_func.calculate_fitness(route))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,10 +7,7 @@ import sys
 import pandas as pd
 from pathlib import Path
 
-# Agregar src al path
-sys.path.insert(0, str(Path(__file__).parent / 'src'))
-
-from visualizer import TSPTWVisualizer
+from src.visualizer import TSPTWVisualizer
 
 
 def main():